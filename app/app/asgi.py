@@ -0,0 +1,17 @@
+"""
+ASGI config for app project.
+
+It exposes the ASGI callable serving the real-time change feed at
+/api/twix/events/ as a module-level variable named ``application``. The
+REST API keeps being served through ``app.wsgi``.
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+django.setup()
+
+from core.asgi import application  # noqa: E402,F401
@@ -50,13 +50,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -90,6 +93,33 @@ DATABASES = {
     }
 }
 
+if os.environ.get('DB_HOST'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'NAME': os.environ.get('DB_NAME'),
+        'USER': os.environ.get('DB_USER'),
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # Keep connections open across requests
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # Transaction pooling (pgbouncer) cannot hold server side cursors
+        'DISABLE_SERVER_SIDE_CURSORS': bool(os.environ.get('DB_POOLED')),
+    }
+
+if os.environ.get('DB_HOST') and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=os.environ.get('DB_REPLICA_HOST'),
+        TEST={'MIRROR': 'default'},
+    )
+    REPLICA_DATABASE = 'replica'
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Seconds a persistent connection may idle before being checked on reuse
+DATABASE_HEALTH_CHECK_INTERVAL = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -131,12 +161,57 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
+# Static files are served by whitenoise from STATIC_ROOT
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
 # Declare custom user model
 
 AUTH_USER_MODEL = 'user.User'
 
+# REST FRAMEWORK SETTINGS
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CursorPagination',
+    'PAGE_SIZE': 100,
+}
+
+MAX_PAGE_SIZE = 500
+
+USER_SEARCH_LIMIT = 50
+
+TASK_BATCH_SIZE = 100
+
+GROUP_MEMBER_BATCH_SIZE = 500
+
+SYNC_PAGE_SIZE = 500
+
+# Seconds a transaction logging changes may take to commit, changes logged
+# within are re-read by delta sync & the event stream until they settle
+CHANGE_COMMIT_GRACE = 5
+
+# TOKEN AUTHENTICATION CACHE SETTINGS
+TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'BACKEND': None,
+}
+
+# GROUP SCOPE CACHE SETTINGS
+GROUP_SCOPE_CACHE = {
+    # Alias of a cache shared by every process (e.g. redis or memcached)
+    # keeping scopes across requests, None only caches them per request
+    'BACKEND': None,
+    'TTL': 300,
+}
+
+# REAL-TIME EVENT STREAM SETTINGS
+EVENT_STREAM = {
+    'BROKER': 'core.events.ChangeLogBroker',
+    'KEEPALIVE': 15,
+    'POLL_INTERVAL': 1,
+    'QUEUE_SIZE': 1000,
+}
+
 # FCM DJANGO SETTINGS
 FCM_DJANGO_SETTINGS = {
     'APP_VERBOSE_NAME': 'Cask',
@@ -145,3 +220,27 @@ FCM_DJANGO_SETTINGS = {
                       'NWRPWdZVg3uXnq9U_6jkYZvQLXgJdnY606-JEX2MNIH_H7'
 }
 
+
+# PUSH NOTIFICATION OUTBOX SETTINGS
+NOTIFICATION_SENDER = 'core.notifications.FCMSender'
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_DELAY = 30
+NOTIFICATION_LEASE = 300
+
+# REQUEST METRICS SETTINGS
+METRICS = {
+    # Bearer token required to scrape /metrics, None only opens it in DEBUG
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+    # Requests slower than this many seconds are logged with their SQL,
+    # e.g. METRICS_SLOW_REQUEST_SECONDS=1.0, None disables the logging
+    'SLOW_REQUEST_SECONDS': float(os.environ['METRICS_SLOW_REQUEST_SECONDS'])
+    if os.environ.get('METRICS_SLOW_REQUEST_SECONDS') else None,
+    # Directory shared by worker processes to merge their metrics on scrape,
+    # `serve` uses a temporary one when unset
+    'MULTIPROCESS_DIR': os.environ.get('METRICS_MULTIPROCESS_DIR'),
+    # Seconds a worker waits before writing new metrics to that directory
+    'FLUSH_SECONDS': 1,
+}
+
+# TASK REMINDER SETTINGS
+REMINDER_MAX_DELAY = 3600
@@ -19,6 +19,8 @@ from django.urls import path, include, reverse
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.views import metrics_view
+
 from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter, APIRootView
 
@@ -53,6 +55,7 @@ router = Router()
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include('user.urls')),
     path('api/', include('twix.urls'))
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
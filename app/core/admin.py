@@ -6,3 +6,5 @@ admin.site.register(models.Board)
 admin.site.register(models.Task)
 admin.site.register(models.Group)
 admin.site.register(models.AssignedTask)
+admin.site.register(models.Notification)
+admin.site.register(models.Change)
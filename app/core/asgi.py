@@ -0,0 +1,180 @@
+import asyncio
+import json
+from functools import partial
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from rest_framework import exceptions
+
+from .authentication import CachedTokenAuthentication
+from .events import EventScope, get_broker, get_setting
+
+EVENTS_PATH = '/api/twix/events/'
+
+
+def call_closing(func, *args):
+    """Call blocking database code, releasing its connection afterwards"""
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args):
+    """Run blocking database code in a worker thread"""
+    return await asyncio.get_event_loop().run_in_executor(
+        None, partial(call_closing, func, *args)
+    )
+
+
+def get_header(scope, name):
+    """Return decoded request header or None"""
+    for key, value in scope['headers']:
+        if key.decode('latin1').lower() == name:
+            return value.decode('latin1')
+    return None
+
+
+def authenticate(scope):
+    """Return user of the token in header or `token` query parameter
+
+    Browsers cannot set headers on EventSource requests.
+    """
+    keyword = CachedTokenAuthentication.keyword
+    header = (get_header(scope, 'authorization') or '').split()
+    if len(header) == 2 and header[0] == keyword:
+        key = header[1]
+    else:
+        key = parse_qs(scope['query_string'].decode()).get('token', [None])[0]
+    if not key:
+        raise exceptions.NotAuthenticated()
+    user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+    return user
+
+
+def format_event(change):
+    """Return server-sent event of a change"""
+    lines = []
+    if change.id is not None:
+        lines.append(f'id: {change.id}')
+    lines.append('event: change')
+    lines.append('data: ' + json.dumps({
+        'model': change.model,
+        'id': str(change.object_id),
+        'deleted': change.is_deleted,
+    }))
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+async def respond(send, status, message):
+    """Send a complete plain text response"""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+    })
+    await send({'type': 'http.response.body', 'body': message.encode()})
+
+
+async def wait_for_disconnect(receive):
+    """Return once the client went away"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(scope, receive, send, user):
+    """Stream visible changes until the client disconnects
+
+    Clients reconnecting with Last-Event-ID are replayed missed changes,
+    a `resync` event asks them to fall back to delta sync instead.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        event_scope = await run_sync(EventScope, user)
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        replayed_ids = set()
+        since = get_header(scope, 'last-event-id')
+        if since is not None and since.isdigit():
+            changes, complete = await run_sync(
+                event_scope.replay, int(since),
+                getattr(settings, 'SYNC_PAGE_SIZE', 500)
+            )
+            replayed_ids = {change.id for change in changes}
+            for change in changes:
+                await send({'type': 'http.response.body',
+                            'body': format_event(change), 'more_body': True})
+            if not complete:
+                await send({'type': 'http.response.body',
+                            'body': b'event: resync\ndata: {}\n\n'})
+                return
+
+        get = asyncio.ensure_future(subscription.queue.get())
+        while True:
+            done, _ = await asyncio.wait(
+                {get, disconnect}, timeout=get_setting('KEEPALIVE', 15),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnect in done:
+                get.cancel()
+                return
+            if get not in done:
+                await send({'type': 'http.response.body',
+                            'body': b': keepalive\n\n', 'more_body': True})
+                continue
+
+            change = get.result()
+            if change is None:
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            get = asyncio.ensure_future(subscription.queue.get())
+            if change.id in replayed_ids:
+                continue
+            visible = event_scope.is_visible(change)
+            if event_scope.track(change):
+                await run_sync(event_scope.reload)
+                visible = visible or event_scope.is_visible(change)
+            if visible:
+                await send({'type': 'http.response.body',
+                            'body': format_event(change), 'more_body': True})
+    finally:
+        broker.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+async def lifespan(receive, send):
+    """Acknowledge server startup & shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI application serving the real-time change feed"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['path'] != EVENTS_PATH:
+        return await respond(send, 404, 'Not found.')
+    if scope['method'] != 'GET':
+        return await respond(send, 405, 'Method not allowed.')
+    try:
+        user = await run_sync(authenticate, scope)
+    except exceptions.APIException as error:
+        return await respond(send, error.status_code, str(error.detail))
+    await stream_events(scope, receive, send, user)
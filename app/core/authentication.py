@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+
+
+def get_setting(name, default):
+    """Return token cache setting or its default"""
+    return getattr(settings, 'TOKEN_CACHE', {}).get(name, default)
+
+
+def dump_instance(instance):
+    """Return concrete field values of a model instance"""
+    return tuple(
+        getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+    )
+
+
+def load_instance(model, values):
+    """Build a fresh model instance from dumped field values"""
+    return model.from_db('default', [
+        field.attname for field in model._meta.concrete_fields
+    ], values)
+
+
+class LRUCache:
+    """Thread safe in-process LRU cache with expiring entries"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return cached value or None when missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache value, evicting the least recently used entry if full"""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove cached value"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Remove every cached value"""
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LRUCache(get_setting('MAX_SIZE', 10000), get_setting('TTL', 60))
+
+
+def get_shared_cache():
+    """Return the configured shared cache backend, if any"""
+    backend = get_setting('BACKEND', None)
+    return caches[backend] if backend is not None else None
+
+
+def token_cache_key(key):
+    """Return cache key of a token"""
+    return f'auth-token:{key}'
+
+
+def user_cache_key(user_id):
+    """Return cache key of a user's token"""
+    return f'auth-token-user:{user_id}'
+
+
+def get_cached_credentials(key):
+    """Return cached (user values, token values) of a token key"""
+    entry = local_cache.get(token_cache_key(key))
+    if entry is None:
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            entry = shared_cache.get(token_cache_key(key))
+            if entry is not None:
+                local_cache.set(token_cache_key(key), entry)
+    return entry
+
+
+def cache_credentials(user, token):
+    """Cache user & token of a successful authentication"""
+    entry = (dump_instance(user), dump_instance(token))
+    local_cache.set(token_cache_key(token.key), entry)
+    local_cache.set(user_cache_key(user.pk), token.key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        ttl = get_setting('TTL', 60)
+        shared_cache.set(token_cache_key(token.key), entry, ttl)
+        shared_cache.set(user_cache_key(user.pk), token.key, ttl)
+
+
+def invalidate_token(key):
+    """Drop cached credentials of a token key"""
+    local_cache.delete(token_cache_key(key))
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(token_cache_key(key))
+
+
+def invalidate_user(user_id):
+    """Drop cached credentials of every token of a user"""
+    keys = {local_cache.get(user_cache_key(user_id))}
+    local_cache.delete(user_cache_key(user_id))
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        keys.add(shared_cache.get(user_cache_key(user_id)))
+        shared_cache.delete(user_cache_key(user_id))
+    for key in keys - {None}:
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication skipping the database for recently seen tokens
+
+    Entries are dropped on user & token changes through signals. With a
+    shared backend, other processes only drop their in-process entries
+    once the TTL expires. Misses are read from the primary so a lagging
+    replica is never cached.
+    """
+
+    def load_credentials(self, key):
+        """Return user & token of a key read from the primary"""
+        model = self.get_model()
+        try:
+            token = model.objects.using('default').select_related(
+                'user'
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return token.user, token
+
+    def authenticate_credentials(self, key):
+        """Return user & token from cache or fall back to the database"""
+        entry = get_cached_credentials(key)
+        if entry is None:
+            user, token = self.load_credentials(key)
+            cache_credentials(user, token)
+            return user, token
+
+        user_values, token_values = entry
+        return load_instance(User, user_values), \
+            load_instance(Token, token_values)
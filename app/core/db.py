@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+def check_connections():
+    """Close reused connections that broke while idle
+
+    Persistent connections are only pinged once the health check interval
+    elapsed since their last check, so busy workers skip the round trip.
+    """
+    interval = getattr(settings, 'DATABASE_HEALTH_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        checked_at = getattr(connection, 'health_checked_at', None)
+        if checked_at is not None and now - checked_at < interval:
+            continue
+        if not connection.is_usable():
+            connection.close()
+        connection.health_checked_at = now
+
+
+def warm_up():
+    """Open every configured connection & fill per-process caches
+
+    Loads the content type cache and the field trees of every routed
+    serializer, so first requests skip the introspection.
+    """
+    from django.apps import apps
+    from django.contrib.contenttypes.models import ContentType
+
+    from app.urls import router
+    from .serializers import DynamicModelSerializer
+
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    ContentType.objects.get_for_models(*apps.get_models())
+
+    for _, viewset, _ in router.registry:
+        serializer_class = getattr(viewset, 'serializer_class', None)
+        if serializer_class is not None and issubclass(
+            serializer_class, DynamicModelSerializer
+        ):
+            serializer_class().fields
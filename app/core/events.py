@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Board, Change
+from .scope import get_group_scope, load_group_scope
+
+logger = logging.getLogger(__name__)
+
+
+def get_setting(name, default):
+    """Return event stream setting or its default"""
+    return getattr(settings, 'EVENT_STREAM', {}).get(name, default)
+
+
+class Subscription:
+    """Bounded queue of changes consumed by one subscriber's event loop
+
+    A subscriber falling too far behind receives None and is expected to
+    reconnect, catching up from the change log.
+    """
+
+    def __init__(self, loop, max_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_size)
+
+    def put(self, changes):
+        """Enqueue changes from any thread"""
+        self.loop.call_soon_threadsafe(self.put_nowait, changes)
+
+    def put_nowait(self, changes):
+        """Enqueue changes, closing the subscription on overflow"""
+        for change in changes:
+            try:
+                self.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                return
+
+
+class LocalBroker:
+    """In-process broker fanning out recorded changes to subscribers"""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        """Return a new subscription bound to the running event loop"""
+        subscription = Subscription(
+            asyncio.get_event_loop(), get_setting('QUEUE_SIZE', 1000)
+        )
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering changes to a subscription"""
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def deliver(self, changes):
+        """Hand changes to every subscription"""
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.put(changes)
+
+    def publish(self, changes):
+        """Publish committed changes"""
+        self.deliver(changes)
+
+
+class ChangeLogBroker(LocalBroker):
+    """Broker tailing the change log, shared by every process writing it
+
+    Changes published by other processes reach subscribers within the
+    poll interval, a single thread polls on behalf of all subscribers.
+    Ids follow inserts rather than commits, so changes above the settled
+    id are re-read until they settle & delivered once.
+    """
+
+    def __init__(self):
+        super(ChangeLogBroker, self).__init__()
+        self.thread = None
+        self.last_id = None
+        self.settled_id = None
+        self.delivered_ids = set()
+
+    def publish(self, changes):
+        """Changes reach subscribers through the change log"""
+
+    def subscribe(self):
+        """Return a new subscription, starting the poller if needed"""
+        subscription = super(ChangeLogBroker, self).subscribe()
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        return subscription
+
+    def poll(self):
+        """Deliver changes committed since the last poll"""
+        if self.last_id is None:
+            self.last_id = Change.objects.order_by('-id').values_list(
+                'id', flat=True
+            ).first() or 0
+            self.settled_id = Change.objects.settled_id(self.last_id)
+            self.delivered_ids = set(Change.objects.filter(
+                id__gt=self.settled_id, id__lte=self.last_id
+            ).values_list('id', flat=True))
+        changes = [
+            change for change in Change.objects.filter(
+                id__gt=self.settled_id, id__lte=self.last_id
+            ).order_by('id') if change.id not in self.delivered_ids
+        ] + list(Change.objects.filter(
+            id__gt=self.last_id
+        ).order_by('id')[:get_setting('QUEUE_SIZE', 1000)])
+        if changes:
+            self.last_id = max(self.last_id, changes[-1].id)
+            self.delivered_ids.update(change.id for change in changes)
+            self.deliver(changes)
+        self.settled_id = max(self.settled_id,
+                              Change.objects.settled_id(self.last_id))
+        self.delivered_ids = {
+            change_id for change_id in self.delivered_ids
+            if change_id > self.settled_id
+        }
+        return len(changes)
+
+    def run(self):
+        """Poll the change log forever"""
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Polling change log failed')
+            finally:
+                close_old_connections()
+            time.sleep(get_setting('POLL_INTERVAL', 1))
+
+
+broker = None
+
+
+def get_broker():
+    """Return the configured broker of this process"""
+    global broker
+    if broker is None:
+        broker = import_string(
+            get_setting('BROKER', 'core.events.ChangeLogBroker')
+        )()
+    return broker
+
+
+class EventScope:
+    """Changes visible to a user, shared by delta sync & event streams
+
+    Boards and tasks of own boards, tasks and groups within the user's
+    group scope, tombstones of groups the user was removed from and
+    assigned tasks of the user or of administered groups.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.board_ids = set(Board.objects.filter(
+            user=user
+        ).values_list('id', flat=True))
+        self.group_scope = get_group_scope(user)
+
+    def get_rules(self):
+        """Return (field, ids) pairs of which one must match, per model"""
+        user_ids = {self.user.pk}
+        return {
+            'board': [('owner_id', user_ids)],
+            'task': [('board_id', self.board_ids),
+                     ('group_id', self.group_scope.group_ids)],
+            'group': [('group_id', self.group_scope.group_ids),
+                      ('owner_id', user_ids)],
+            'assignedtask': [('owner_id', user_ids),
+                             ('group_id', self.group_scope.admin_ids)],
+        }
+
+    def get_filter(self):
+        """Return filter of visible changes"""
+        visible = Q()
+        for model, rules in self.get_rules().items():
+            matches = Q()
+            for field, ids in rules:
+                matches |= Q(**{f'{field}__in': ids})
+            visible |= Q(model=model) & matches
+        return visible
+
+    def is_visible(self, change):
+        """Return whether the user may see a change"""
+        return any(
+            getattr(change, field) in ids
+            for field, ids in self.get_rules().get(change.model, [])
+        )
+
+    def track(self, change):
+        """Follow boards created & deleted by the user
+
+        Return whether the group scope has to be reloaded.
+        """
+        if change.model == 'board' and change.owner_id == self.user.pk:
+            if change.is_deleted:
+                self.board_ids.discard(change.object_id)
+            else:
+                self.board_ids.add(change.object_id)
+        return change.model == 'group'
+
+    def reload(self):
+        """Reload group scope after group or membership changes
+
+        Changes are visible under the scope before or after the reload, so
+        members see being added to & removed from a group. Scopes are read
+        from the primary, as cached ones may miss changes of other processes.
+        """
+        self.group_scope = load_group_scope(self.user.pk)
+
+    def replay(self, since, limit):
+        """Return visible changes after a sync token & whether complete
+
+        Changes logged just before the token are replayed again, as lower
+        ids may still have been committing when it was issued.
+        """
+        changes = list(Change.objects.filter(
+            id__gt=Change.objects.settled_id(since)
+        ).order_by('id')[:limit + 1])
+        visible = []
+        for change in changes[:limit]:
+            is_visible = self.is_visible(change)
+            if self.track(change):
+                self.reload()
+                is_visible = is_visible or self.is_visible(change)
+            if is_visible:
+                visible.append(change)
+        return visible, len(changes) <= limit
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from rest_framework import filters, serializers
+
+
+class QueryParamFilter(filters.BaseFilterBackend):
+    """Filter by query parameters declared on the view
+
+    `filter_fields` maps query parameters to a queryset lookup and the
+    serializer field parsing its value.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """Apply every given filter, rejecting unparsable values"""
+        lookups, errors = {}, {}
+        for param, (lookup, field) in getattr(
+            view, 'filter_fields', {}
+        ).items():
+            if param not in request.query_params:
+                continue
+            try:
+                lookups[lookup] = field.run_validation(
+                    request.query_params[param]
+                )
+            except serializers.ValidationError as error:
+                errors[param] = error.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return queryset.filter(**lookups)
+
+
+class NullsLastOrderingFilter(filters.OrderingFilter):
+    """Ordering usable with cursor pagination on nullable fields
+
+    Cursors cannot point at null positions, so nullable date & time fields
+    are ordered through a non-null annotation placing missing values last
+    in either direction. Ties are broken by primary key.
+    """
+    null_positions = (
+        (models.DateTimeField, datetime.min.replace(tzinfo=timezone.utc),
+         datetime.max.replace(tzinfo=timezone.utc)),
+        (models.DateField, date.min, date.max),
+    )
+
+    def get_null_fields(self, queryset, view):
+        """Return nullable orderable fields with their null positions"""
+        null_fields = {}
+        for name in getattr(view, 'ordering_fields', ()):
+            field = queryset.model._meta.get_field(name)
+            if not field.null:
+                continue
+            for field_class, first, last in self.null_positions:
+                if isinstance(field, field_class):
+                    null_fields[name] = tuple(
+                        models.Value(position, output_field=field_class())
+                        for position in (first, last)
+                    )
+                    break
+        return null_fields
+
+    def get_ordering(self, request, queryset, view):
+        """Return ordering on annotations of nullable fields"""
+        null_fields = self.get_null_fields(queryset, view)
+        ordering = [
+            f'{term}_position' if term.lstrip('-') in null_fields else term
+            for term in super(NullsLastOrderingFilter, self).get_ordering(
+                request, queryset, view
+            )
+        ]
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering.append('id')
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        """Annotate positions of ordered nullable fields & order"""
+        null_fields = self.get_null_fields(queryset, view)
+        annotations = {}
+        for term in super(NullsLastOrderingFilter, self).get_ordering(
+            request, queryset, view
+        ):
+            name = term.lstrip('-')
+            if name in null_fields:
+                first, last = null_fields[name]
+                annotations[f'{name}_position'] = Coalesce(
+                    name, first if term.startswith('-') else last
+                )
+        return queryset.annotate(**annotations).order_by(
+            *self.get_ordering(request, queryset, view)
+        )
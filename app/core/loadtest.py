@@ -0,0 +1,285 @@
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.urls import reverse
+
+from .models import User, Group
+
+DEFAULT_MIX = {
+    'login': 1,
+    'list_tasks': 6,
+    'toggle_assigned_task': 3,
+    'add_group_member': 1,
+}
+
+
+def parse_mix(value):
+    """Return scenario weights of a 'name=weight,...' string"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown scenario {name}!')
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('Mix needs a positive weight!')
+    return mix
+
+
+def percentile(durations, fraction):
+    """Return nearest rank percentile of sorted durations"""
+    if not durations:
+        return 0
+    return durations[max(math.ceil(fraction * len(durations)) - 1, 0)]
+
+
+class Stats:
+    """Thread safe latency & error record per route"""
+
+    def __init__(self):
+        self.durations = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, route, duration, ok=True):
+        """Record one request of a route"""
+        with self.lock:
+            self.durations.setdefault(route, []).append(duration)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def finish(self):
+        """Stop the throughput clock"""
+        self.finished = time.perf_counter()
+
+    def report(self):
+        """Return count, errors, throughput & percentiles of every route"""
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        report = {}
+        with self.lock:
+            for route, durations in sorted(self.durations.items()):
+                durations = sorted(durations)
+                report[route] = {
+                    'requests': len(durations),
+                    'errors': self.errors.get(route, 0),
+                    'requests_per_second': round(len(durations) / elapsed, 1),
+                    'p50_ms': round(percentile(durations, 0.5) * 1000, 1),
+                    'p95_ms': round(percentile(durations, 0.95) * 1000, 1),
+                    'p99_ms': round(percentile(durations, 0.99) * 1000, 1),
+                }
+        return report
+
+
+class Client:
+    """JSON API client of one synthetic mobile user"""
+
+    def __init__(self, base_url, stats, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+
+    def request(self, route, method, path, data=None):
+        """Send a request, record its latency and return decoded body"""
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        body = None if data is None else json.dumps(data).encode()
+        request = Request(self.base_url + path, body, headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                content = response.read()
+        except OSError:
+            # HTTP, connection & timeout errors
+            self.stats.record(route, time.perf_counter() - start, ok=False)
+            return None
+        self.stats.record(route, time.perf_counter() - start)
+        return json.loads(content) if content else {}
+
+    def login(self, email, password):
+        """Obtain a token through AuthTokenViewSet"""
+        data = self.request('login', 'POST', reverse('user:auth-token'),
+                            {'email': email, 'password': password})
+        if data:
+            self.token = data['token']
+        return self.token
+
+
+class LoadTest:
+    """Seeds a group of synthetic users and replays a mix of their traffic
+
+    Users are created through UserManager.create_user, so the command must
+    use the database of the server under test. Boards, tasks, the group
+    and its members are created through the API.
+    """
+    password = 'loadtest-password'
+
+    def __init__(self, base_url, users=20, spare_users=20, tasks=100,
+                 assigned_tasks=20, mix=None, stats=None):
+        self.base_url = base_url
+        self.user_count = max(users, 1)
+        self.spare_user_count = spare_users
+        self.task_count = tasks
+        self.assigned_task_count = assigned_tasks
+        self.mix = mix or DEFAULT_MIX
+        self.stats = stats or Stats()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.users = []
+        self.spare_users = []
+        self.group_id = None
+
+    @property
+    def email_prefix(self):
+        """Prefix of emails of users seeded by this run"""
+        return f'loadtest-{self.run_id}-'
+
+    def create_users(self, count, kind):
+        """Create users directly through UserManager"""
+        return [
+            User.objects.create_user(
+                email=f'{self.email_prefix}{kind}{index}@twix.com',
+                password=self.password, name=f'Load Test {kind} {index}'
+            ) for index in range(count)
+        ]
+
+    def client(self, user=None):
+        """Return a client, logged in as the given user"""
+        client = Client(self.base_url, self.stats)
+        if user is not None:
+            client.login(user.email, self.password)
+        return client
+
+    def create_tasks(self, client, user, count, **fields):
+        """Create a board of tasks of user through the batch API"""
+        board = client.request('seed', 'POST', reverse('twix:board-view'),
+                               {'name': 'Load Test', 'user': str(user.id)})
+        if board is None:
+            raise RuntimeError(f'Could not seed through {self.base_url}!')
+        batch_size = getattr(settings, 'TASK_BATCH_SIZE', 100)
+        for start in range(0, count, batch_size):
+            created = client.request(
+                'seed', 'POST', reverse('twix:task-batch'), {
+                    'create': [
+                        dict(name=f'Task {index}', is_done=False,
+                             board_id=board['id'], **fields)
+                        for index in range(start,
+                                           min(start + batch_size, count))
+                    ],
+                }
+            )
+            if created is None:
+                raise RuntimeError(f'Could not seed through {self.base_url}!')
+
+    def seed(self):
+        """Create users with their own tasks and a group of all of them
+
+        The group admin assigns tasks to the whole group.
+        """
+        self.users = self.create_users(self.user_count, 'user')
+        self.spare_users = self.create_users(self.spare_user_count, 'spare')
+        admin = self.admin = self.client(self.users[0])
+
+        group = admin.request('seed', 'POST', reverse('twix:group-view'), {
+            'name': 'Load Test', 'admin_id': str(self.users[0].id)
+        })
+        if group is None:
+            raise RuntimeError(f'Could not seed through {self.base_url}!')
+        self.group_id = group['id']
+        batch_size = getattr(settings, 'GROUP_MEMBER_BATCH_SIZE', 500)
+        for start in range(0, len(self.users), batch_size):
+            admin.request('seed', 'POST',
+                          reverse('twix:group-members', args=[self.group_id]),
+                          {'add': [str(user.id) for user in
+                                   self.users[start:start + batch_size]]})
+        self.create_tasks(admin, self.users[0], self.assigned_task_count,
+                          group_id=self.group_id, is_assigned=True)
+
+        for user in self.users:
+            personal = Group.objects.get(admin=user, name='Personal')
+            self.create_tasks(self.client(user), user, self.task_count,
+                              group_id=str(personal.id))
+
+    def cleanup(self):
+        """Delete seeded users with their boards, tasks & group"""
+        User.objects.filter(email__startswith=self.email_prefix).delete()
+
+    def list_tasks(self, client, state):
+        """List the first page of own tasks"""
+        client.request('list_tasks', 'GET', reverse('twix:task-view'))
+
+    def toggle_assigned_task(self, client, state):
+        """Flip is_done of an own assigned task, listing them the first time"""
+        if 'assigned' not in state:
+            data = client.request('list_assigned_tasks', 'GET',
+                                  reverse('twix:task-assign-view'))
+            state['assigned'] = {
+                item['id']: item['is_done']
+                for item in (data or {}).get('results', [])
+                if item['user']['id'] == str(state['user'].id)
+            }
+        if not state['assigned']:
+            return
+        assigned_id = random.choice(list(state['assigned']))
+        is_done = not state['assigned'][assigned_id]
+        if client.request(
+            'toggle_assigned_task', 'PATCH',
+            reverse('twix:task-assign-detail', args=[assigned_id]),
+            {'is_done': is_done}
+        ) is not None:
+            state['assigned'][assigned_id] = is_done
+
+    def add_group_member(self, client, state):
+        """Add a spare user to the group as its admin"""
+        if not self.spare_users:
+            return
+        self.admin.request(
+            'add_group_member', 'POST',
+            reverse('twix:group-add', args=[self.group_id]),
+            {'user': str(random.choice(self.spare_users).id)}
+        )
+
+    def login(self, client, state):
+        """Obtain a new token"""
+        client.login(state['user'].email, self.password)
+
+    def work(self, index, deadline, requests):
+        """Replay the traffic mix of one user until time or requests run out"""
+        user = self.users[index % len(self.users)]
+        client = self.client(user)
+        state = {'user': user}
+        names = [name for name, weight in self.mix.items() if weight > 0]
+        weights = [self.mix[name] for name in names]
+        sent = 0
+        while time.perf_counter() < deadline and (
+                requests is None or sent < requests):
+            getattr(self, random.choices(names, weights)[0])(client, state)
+            sent += 1
+
+    def run(self, workers=10, duration=30, requests=None):
+        """Run concurrent workers and return the per route report
+
+        Requests, if given, limits the scenarios each worker replays.
+        """
+        self.stats = self.admin.stats = Stats()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=self.work,
+                             args=(index, deadline, requests), daemon=True)
+            for index in range(max(workers, 1))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats.finish()
+        return self.stats.report()
@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+from django.db.models import Max, Q
+
+from core.models import Change
+
+
+class Command(BaseCommand):
+    """Django command to compact the delta sync change log"""
+
+    help = "Deletes change log entries superseded by a later change"
+
+    def handle(self, *args, **options):
+        """Command logic
+
+        Group tombstones of removed members only supersede each other, per
+        member, as other members never see them. Task changes only supersede
+        each other within one board & group scope, so tombstones left in the
+        scope a task moved out of are kept for its former viewers.
+        """
+        removals = Q(model='group', group_id=None)
+        deleted = 0
+        for changes, fields in (
+            (Change.objects.exclude(removals).exclude(model='task'), ()),
+            (Change.objects.filter(removals), ('owner_id', )),
+            (Change.objects.filter(model='task'), ('board_id', 'group_id')),
+        ):
+            latest = changes.values('model', 'object_id', *fields).annotate(
+                latest_id=Max('id')
+            ).values('latest_id')
+            count, _ = changes.exclude(id__in=latest).delete()
+            deleted += count
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} superseded change(s) deleted!'
+        ))
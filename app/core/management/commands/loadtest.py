@@ -0,0 +1,84 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from core.loadtest import LoadTest, DEFAULT_MIX, parse_mix
+
+
+class Command(BaseCommand):
+    """Django command to measure capacity with synthetic client traffic
+
+    Run it against a server using the same database, seeded users are
+    created directly and deleted afterwards unless --keep is given.
+    """
+
+    help = "Replays synthetic mobile client traffic against a server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000',
+                            help="Base URL of the server under test")
+        parser.add_argument('--workers', type=int, default=10,
+                            help="Number of concurrent clients")
+        parser.add_argument('--duration', type=float, default=30,
+                            help="Seconds to replay traffic for")
+        parser.add_argument('--requests', type=int, default=None,
+                            help="Requests each client sends at most")
+        parser.add_argument('--users', type=int, default=20,
+                            help="Users seeded into the group")
+        parser.add_argument('--spare-users', type=int, default=20,
+                            help="Users available to add to the group")
+        parser.add_argument('--tasks', type=int, default=100,
+                            help="Tasks seeded per user")
+        parser.add_argument('--assigned-tasks', type=int, default=20,
+                            help="Tasks assigned to the group")
+        parser.add_argument('--mix', default=','.join(
+            f'{name}={weight}' for name, weight in DEFAULT_MIX.items()
+        ), help="Scenario weights as name=weight,...")
+        parser.add_argument('--output', default=None,
+                            help="Path to write the JSON report to")
+        parser.add_argument('--keep', action='store_true',
+                            help="Keep seeded users & tasks")
+
+    def write_report(self, report):
+        """Print a table of per route latency & throughput"""
+        columns = ('requests', 'errors', 'requests_per_second', 'p50_ms',
+                   'p95_ms', 'p99_ms')
+        self.stdout.write(f"{'route':<24}" + ''.join(
+            f'{column:>20}' for column in columns
+        ))
+        for route, stats in report.items():
+            self.stdout.write(f'{route:<24}' + ''.join(
+                f'{stats[column]:>20}' for column in columns
+            ))
+
+    def handle(self, *args, **options):
+        """Command logic"""
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        load_test = LoadTest(
+            options['url'], users=options['users'],
+            spare_users=options['spare_users'], tasks=options['tasks'],
+            assigned_tasks=options['assigned_tasks'], mix=mix
+        )
+        self.stdout.write(f"Seeding {options['users']} user(s)...")
+        try:
+            load_test.seed()
+            self.stdout.write(
+                f"Replaying traffic with {options['workers']} worker(s)..."
+            )
+            report = load_test.run(options['workers'], options['duration'],
+                                   options['requests'])
+        except RuntimeError as error:
+            raise CommandError(error)
+        finally:
+            if not options['keep']:
+                load_test.cleanup()
+
+        self.write_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS('Load test finished!'))
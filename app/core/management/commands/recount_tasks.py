@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+
+from core.models import Board, Group
+
+
+class Command(BaseCommand):
+    """Django command to repair denormalized task counters"""
+
+    help = "Recomputes task counters of every board and group"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Boards or groups recounted per query")
+
+    def handle(self, *args, **options):
+        """Command logic"""
+        batch_size = max(options['batch_size'], 1)
+        for model in (Board, Group):
+            pks = list(model.objects.order_by('pk').values_list(
+                'pk', flat=True
+            ))
+            for start in range(0, len(pks), batch_size):
+                model.objects.recount(pks[start:start + batch_size])
+            self.stdout.write(
+                f'{len(pks)} {model._meta.verbose_name_plural} recounted'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Task counters recounted!'))
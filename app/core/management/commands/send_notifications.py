@@ -0,0 +1,56 @@
+import threading
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from core.notifications import dispatch, get_sender
+
+
+class Command(BaseCommand):
+    """Django command to drain the push notification outbox"""
+
+    help = "Sends pending push notifications using a pool of workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of concurrent worker threads")
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Notifications claimed per batch")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds to sleep when the outbox is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the outbox is drained")
+
+    def work(self, batch_size, interval, once):
+        """Worker loop"""
+        sender = get_sender()
+        try:
+            while True:
+                if not dispatch(sender, batch_size):
+                    if once:
+                        break
+                    time.sleep(interval)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        """Command logic"""
+        workers = max(options['workers'], 1)
+        work_args = (options['batch_size'], options['interval'],
+                     options['once'])
+        self.stdout.write(f"Sending notifications with {workers} worker(s)...")
+
+        if workers == 1:
+            self.work(*work_args)
+        else:
+            threads = [
+                threading.Thread(target=self.work, args=work_args, daemon=True)
+                for _ in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS('Outbox drained!'))
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from core.reminders import fire_reminders
+
+
+class Command(BaseCommand):
+    """Django command to fire due task reminders"""
+
+    help = "Enqueues push notifications of due task reminders"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of concurrent worker threads")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Reminders claimed per batch")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when no reminder is due")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no reminder is due")
+
+    def work(self, batch_size, interval, once):
+        """Worker loop"""
+        try:
+            while True:
+                if not fire_reminders(batch_size):
+                    if once:
+                        break
+                    time.sleep(interval)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        """Command logic"""
+        workers = max(options['workers'], 1)
+        work_args = (options['batch_size'], options['interval'],
+                     options['once'])
+        self.stdout.write(f"Firing reminders with {workers} worker(s)...")
+
+        if workers == 1:
+            self.work(*work_args)
+        else:
+            threads = [
+                threading.Thread(target=self.work, args=work_args, daemon=True)
+                for _ in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS('Reminders fired!'))
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core import metrics
+
+
+def get_default_workers():
+    """Return WEB_CONCURRENCY or the worker count gunicorn recommends"""
+    return int(os.environ.get(
+        'WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1
+    ))
+
+
+def flush_metrics(server, worker):
+    """Write metrics of an exiting worker, see gunicorn worker_exit"""
+    metrics.flush()
+
+
+class Command(BaseCommand):
+    """Django command to serve the API with a pool of worker processes
+
+    Send SIGHUP to reload workers gracefully and SIGTERM to drain them.
+    Workers share a temporary metrics directory unless one is configured.
+    """
+
+    help = "Serves app.wsgi with gunicorn"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default='0.0.0.0:8000',
+                            help="Address to listen on")
+        parser.add_argument('--workers', type=int,
+                            default=get_default_workers(),
+                            help="Number of worker processes")
+        parser.add_argument('--threads', type=int, default=1,
+                            help="Number of threads per worker")
+        parser.add_argument('--timeout', type=int, default=30,
+                            help="Seconds before silent workers are restarted")
+        parser.add_argument('--graceful-timeout', type=int, default=30,
+                            help="Seconds workers get to finish on reload")
+        parser.add_argument('--max-requests', type=int, default=0,
+                            help="Requests after which workers are recycled")
+        parser.add_argument('--no-preload', action='store_true',
+                            help="Load the application in every worker")
+        parser.add_argument('--no-warm-up', action='store_true',
+                            help="Skip filling caches before serving")
+
+    def get_options(self, options):
+        """Return gunicorn settings of command options"""
+        return {
+            'bind': options['bind'],
+            'workers': max(options['workers'], 1),
+            'threads': max(options['threads'], 1),
+            'worker_class': 'gthread' if options['threads'] > 1 else 'sync',
+            'timeout': options['timeout'],
+            'graceful_timeout': options['graceful_timeout'],
+            'max_requests': options['max_requests'],
+            'max_requests_jitter': options['max_requests'] // 10,
+            'preload_app': not options['no_preload'],
+            'accesslog': '-',
+            'worker_exit': flush_metrics,
+        }
+
+    def handle(self, *args, **options):
+        """Command logic"""
+        from core.server import Application
+
+        metrics_settings = settings.METRICS
+        directory = None
+        if metrics_settings.get('MULTIPROCESS_DIR') is None:
+            directory = tempfile.mkdtemp(prefix='metrics-')
+            settings.METRICS = dict(metrics_settings,
+                                    MULTIPROCESS_DIR=directory)
+        try:
+            Application(self.get_options(options),
+                        warm_up=not options['no_warm_up']).run()
+        finally:
+            if directory is not None:
+                settings.METRICS = metrics_settings
+                shutil.rmtree(directory, ignore_errors=True)
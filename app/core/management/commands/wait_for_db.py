@@ -1,21 +1,63 @@
+import sys
 import time
 
 from django.db import connections
-from django.db.utils import OperationalError
+from django.db.utils import DatabaseError, OperationalError
 from django.core.management import BaseCommand
 
+from core.db import warm_up
+
+EXIT_UNAVAILABLE = 3
+EXIT_WARM_UP_FAILED = 4
+
 
 class Command(BaseCommand):
-    """Django command to pause execution until database is available"""
+    """Django command to pause execution until database is available
+
+    Exits with EXIT_UNAVAILABLE when the timeout expires and with
+    EXIT_WARM_UP_FAILED when warming up fails.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default',
+                            help="Database alias to wait for")
+        parser.add_argument('--timeout', type=float, default=60.0,
+                            help="Seconds to wait before giving up")
+        parser.add_argument('--max-delay', type=float, default=5.0,
+                            help="Longest pause between attempts")
+        parser.add_argument('--warm-up', action='store_true',
+                            help="Open every connection & fill caches")
+
+    def is_available(self, database):
+        """Run a query on the database"""
+        with connections[database].cursor() as cursor:
+            cursor.execute('SELECT 1')
 
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options['timeout']
+        delay = 0.1
+        while True:
             try:
-                db_conn = connections['default']
+                self.is_available(options['database'])
+                break
             except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stderr.write("Database unavailable, giving up!")
+                    sys.exit(EXIT_UNAVAILABLE)
+                delay = min(delay * 2, options['max_delay'], remaining)
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.1f} seconds..."
+                )
+                time.sleep(delay)
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
+
+        if options['warm_up']:
+            try:
+                warm_up()
+            except DatabaseError as error:
+                self.stderr.write(f"Warming up failed: {error}")
+                sys.exit(EXIT_WARM_UP_FAILED)
+            self.stdout.write(self.style.SUCCESS('Warmed up!'))
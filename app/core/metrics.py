@@ -0,0 +1,283 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def get_setting(name, default):
+    """Return metrics setting or its default"""
+    return getattr(settings, 'METRICS', {}).get(name, default)
+
+
+class Histogram:
+    """Thread safe histogram with labels, rendered in Prometheus format"""
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record a value for the given label values"""
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        """Drop every recorded value"""
+        with self.lock:
+            self.series.clear()
+
+    def snapshot(self):
+        """Return a copy of every series"""
+        with self.lock:
+            return {
+                key: [list(counts), total, count]
+                for key, (counts, total, count) in self.series.items()
+            }
+
+    def format_labels(self, key, **extra):
+        """Return Prometheus label set of a series"""
+        pairs = list(zip(self.labels, key)) + list(extra.items())
+        return '{' + ','.join(
+            '{}="{}"'.format(name, value.replace('\\', '\\\\').replace(
+                '"', '\\"'
+            ))
+            for name, value in pairs
+        ) + '}'
+
+    def render(self, series=None):
+        """Return the histogram in Prometheus text exposition format
+
+        Renders the given series, merged from every worker, or its own.
+        """
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        if series is None:
+            series = self.snapshot()
+        series = sorted(
+            (key, counts, total, count)
+            for key, (counts, total, count) in series.items()
+        )
+        for key, counts, total, count in series:
+            for bound, value in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket'
+                             f'{self.format_labels(key, le=str(bound))} '
+                             f'{value}')
+            lines.append(f'{self.name}_bucket'
+                         f'{self.format_labels(key, le="+Inf")} {count}')
+            lines.append(f'{self.name}_sum{self.format_labels(key)} {total}')
+            lines.append(f'{self.name}_count{self.format_labels(key)} '
+                         f'{count}')
+        return '\n'.join(lines)
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Request latency in seconds.',
+    ('method', 'route', 'status'), DEFAULT_BUCKETS
+)
+request_queries = Histogram(
+    'http_request_db_queries', 'Database queries per request.',
+    ('method', 'route'), COUNT_BUCKETS
+)
+request_db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Database time per request.',
+    ('method', 'route'), DEFAULT_BUCKETS
+)
+request_serializer_duration = Histogram(
+    'http_request_serializer_duration_seconds',
+    'Serialization time per request.', ('method', 'route'), DEFAULT_BUCKETS
+)
+response_size = Histogram(
+    'http_response_size_bytes', 'Response body size in bytes.',
+    ('method', 'route'), SIZE_BUCKETS
+)
+
+HISTOGRAMS = (request_duration, request_queries, request_db_duration,
+              request_serializer_duration, response_size)
+
+
+flush_timer = None
+flush_lock = threading.Lock()
+write_lock = threading.Lock()
+process_names = {}
+
+
+def get_path(directory):
+    """Return the file of this process in the multiprocess directory
+
+    Names are unique per process start, a recycled worker reusing a pid
+    does not overwrite the counts of the exited one.
+    """
+    pid = os.getpid()
+    name = process_names.get(pid)
+    if name is None:
+        name = process_names[pid] = f'{pid}-{time.time_ns()}.json'
+    return os.path.join(directory, name)
+
+
+def flush():
+    """Write series of this process to the multiprocess directory"""
+    global flush_timer
+    directory = get_setting('MULTIPROCESS_DIR', None)
+    with flush_lock:
+        if flush_timer is not None:
+            flush_timer.cancel()
+            flush_timer = None
+    if directory is None:
+        return
+    data = {
+        histogram.name: [
+            [list(key), *series]
+            for key, series in histogram.snapshot().items()
+        ]
+        for histogram in HISTOGRAMS
+    }
+    path = get_path(directory)
+    with write_lock:
+        try:
+            with open(f'{path}.tmp', 'w') as file:
+                json.dump(data, file)
+            os.replace(f'{path}.tmp', path)
+        except FileNotFoundError:
+            # Removed by `serve` while workers were shutting down
+            pass
+
+
+def schedule_flush():
+    """Flush series within `FLUSH_SECONDS` unless a flush is pending
+
+    Only applies with a multiprocess directory, so requests only pay for
+    writing their process' series once per interval.
+    """
+    global flush_timer
+    if get_setting('MULTIPROCESS_DIR', None) is None:
+        return
+    with flush_lock:
+        if flush_timer is not None:
+            return
+        flush_timer = threading.Timer(get_setting('FLUSH_SECONDS', 1), flush)
+        flush_timer.daemon = True
+        flush_timer.start()
+
+
+def collect(directory):
+    """Return series of every process' file merged per histogram
+
+    Files of exited workers are kept, so their counts are never lost.
+    """
+    merged = {histogram.name: {} for histogram in HISTOGRAMS}
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for histogram_name, series in data.items():
+            target = merged.get(histogram_name)
+            if target is None:
+                continue
+            for key, counts, total, count in series:
+                key = tuple(key)
+                current = target.get(key)
+                if current is None:
+                    target[key] = [counts, total, count]
+                    continue
+                current[0] = [a + b for a, b in zip(current[0], counts)]
+                current[1] += total
+                current[2] += count
+    return merged
+
+
+def render():
+    """Return every metric in Prometheus text exposition format
+
+    With a `MULTIPROCESS_DIR`, series of every worker sharing it are merged
+    so any worker can be scraped.
+    """
+    directory = get_setting('MULTIPROCESS_DIR', None)
+    if directory is None:
+        return '\n'.join(
+            histogram.render() for histogram in HISTOGRAMS
+        ) + '\n'
+    flush()
+    merged = collect(directory)
+    return '\n'.join(
+        histogram.render(merged[histogram.name]) for histogram in HISTOGRAMS
+    ) + '\n'
+
+
+class RequestMetrics:
+    """Database & serialization cost of the current request"""
+
+    def __init__(self, keep_statements=False):
+        self.queries = 0
+        self.db_duration = 0
+        self.serializer_duration = 0
+        self.serializing = False
+        self.statements = [] if keep_statements else None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Time every query, see connection.execute_wrapper"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.db_duration += duration
+            if self.statements is not None:
+                self.statements.append((sql, duration))
+
+    def describe_statements(self, limit=5):
+        """Return slowest & most repeated statements for logging"""
+        if not self.statements:
+            return ''
+        slowest = sorted(self.statements, key=lambda statement: -statement[1])
+        repeated = Counter(sql for sql, _ in self.statements).most_common(1)
+        lines = [f'{duration * 1000:.1f}ms {sql}'
+                 for sql, duration in slowest[:limit]]
+        if repeated and repeated[0][1] > 1:
+            lines.append(f'repeated {repeated[0][1]} times: {repeated[0][0]}')
+        return '\n'.join(lines)
+
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+def measure_serialization(func, *args):
+    """Call func, adding its duration to the request's serializer time
+
+    Nested calls are only measured by the outermost one.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or metrics.serializing:
+        return func(*args)
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        metrics.serializer_duration += time.perf_counter() - start
+        metrics.serializing = False
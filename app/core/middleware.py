@@ -0,0 +1,78 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from . import metrics
+from .routers import use_replica
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaMiddleware:
+    """Allow reads of safe requests to be served by the read replica"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = use_replica.set(request.method in ('GET', 'HEAD', 'OPTIONS'))
+        try:
+            return self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+
+class MetricsMiddleware:
+    """Record latency, database & serialization cost per route
+
+    Streamed responses are measured until their first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        slow_seconds = metrics.get_setting('SLOW_REQUEST_SECONDS', None)
+        request_metrics = metrics.RequestMetrics(
+            keep_statements=slow_seconds is not None
+        )
+        token = metrics.current_metrics.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        request_metrics.execute_wrapper
+                    ))
+                response = self.get_response(request)
+        finally:
+            metrics.current_metrics.reset(token)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        labels = {
+            'method': request.method,
+            'route': match.view_name if match else 'unmatched',
+        }
+        metrics.request_duration.observe(duration, status=response.status_code,
+                                         **labels)
+        metrics.request_queries.observe(request_metrics.queries, **labels)
+        metrics.request_db_duration.observe(request_metrics.db_duration,
+                                            **labels)
+        metrics.request_serializer_duration.observe(
+            request_metrics.serializer_duration, **labels
+        )
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), **labels)
+        metrics.schedule_flush()
+
+        if slow_seconds is not None and duration >= slow_seconds:
+            logger.warning(
+                'Slow request %s %s took %.3fs with %d queries (%.3fs)\n%s',
+                request.method, request.get_full_path(), duration,
+                request_metrics.queries, request_metrics.db_duration,
+                request_metrics.describe_statements()
+            )
+        return response
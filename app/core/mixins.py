@@ -0,0 +1,252 @@
+import hashlib
+from collections import OrderedDict
+
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, \
+    patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import NDJSONRenderer, NormalizedJSONRenderer
+from .serializers import Normalizer, get_query_plan
+
+
+class QueryPlanMixin:
+    """Eager load every relation rendered by the serializer"""
+    _query_plans = {}
+
+    def get_query_plan(self):
+        """Return cached query plan of the serializer class"""
+        serializer_class = self.get_serializer_class()
+        if serializer_class not in self._query_plans:
+            self._query_plans[serializer_class] = get_query_plan(
+                self.get_serializer()
+            )
+        return self._query_plans[serializer_class]
+
+    def get_queryset(self):
+        """Apply query plan to queryset"""
+        select_lookups, prefetch_lookups = self.get_query_plan()
+        queryset = super(QueryPlanMixin, self).get_queryset()
+        if select_lookups:
+            queryset = queryset.select_related(*select_lookups)
+        if prefetch_lookups:
+            queryset = queryset.prefetch_related(*prefetch_lookups)
+        return queryset
+
+
+class StreamingListMixin:
+    """Stream list responses row by row for large exports
+
+    Streaming is selected with `?stream=1` for a JSON array or by accepting
+    `application/x-ndjson` for newline delimited JSON. Rows are streamed
+    in primary key chunks, so requested orderings are rejected.
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        NDJSONRenderer,
+    ]
+    stream_chunk_size = 500
+
+    def wants_stream(self, request):
+        """Whether the client asked for a streamed response
+
+        Normalized responses side-load objects after every row, so they
+        are paginated instead.
+        """
+        if isinstance(request.accepted_renderer, NormalizedJSONRenderer):
+            return False
+        return isinstance(request.accepted_renderer, NDJSONRenderer) or \
+            request.query_params.get('stream') in ('1', 'true')
+
+    def iterate_queryset(self, queryset):
+        """Yield rows in primary key chunks, keeping eager loading"""
+        queryset = queryset.order_by('pk')
+        chunk = list(queryset[:self.stream_chunk_size])
+        while chunk:
+            yield from chunk
+            if len(chunk) < self.stream_chunk_size:
+                break
+            chunk = list(queryset.filter(
+                pk__gt=chunk[-1].pk
+            )[:self.stream_chunk_size])
+
+    def stream(self, queryset, ndjson):
+        """Yield encoded rows as a JSON array or newline delimited JSON"""
+        serializer = self.get_serializer()
+        renderer = JSONRenderer()
+        separator = b'\n' if ndjson else b','
+        if not ndjson:
+            yield b'['
+        for index, instance in enumerate(self.iterate_queryset(queryset)):
+            if index and not ndjson:
+                yield separator
+            yield renderer.render(serializer.to_representation(instance))
+            if ndjson:
+                yield separator
+        if not ndjson:
+            yield b']'
+
+    def list(self, request, *args, **kwargs):
+        """Stream the queryset when asked, paginate otherwise"""
+        if not self.wants_stream(request):
+            return super(StreamingListMixin, self).list(
+                request, *args, **kwargs
+            )
+        for backend in self.filter_backends:
+            param = getattr(backend, 'ordering_param', None)
+            if param and request.query_params.get(param):
+                raise ValidationError({param: [
+                    'Streamed lists cannot be ordered!'
+                ]})
+        ndjson = isinstance(request.accepted_renderer, NDJSONRenderer)
+        return StreamingHttpResponse(
+            self.stream(self.filter_queryset(self.get_queryset()), ndjson),
+            content_type=NDJSONRenderer.media_type if ndjson
+            else JSONRenderer.media_type
+        )
+
+
+class NormalizedResponseMixin:
+    """Side-load nested objects when asked for the normalized format
+
+    Accepting `application/vnd.twix.normalized+json` or `?format=normalized`
+    renders rows under `data` with nested objects replaced by their keys,
+    every nested object is rendered once into `included` by type & key.
+    """
+
+    def get_renderers(self):
+        """Offer the normalized renderer besides the view's own"""
+        return super(NormalizedResponseMixin, self).get_renderers() + [
+            NormalizedJSONRenderer(),
+        ]
+
+    def initial(self, request, *args, **kwargs):
+        """Start collecting nested objects for the normalized format"""
+        super(NormalizedResponseMixin, self).initial(request, *args, **kwargs)
+        self.normalizer = None
+        if isinstance(request.accepted_renderer, NormalizedJSONRenderer):
+            self.normalizer = Normalizer()
+
+    def get_serializer_context(self):
+        """Pass the normalizer to serializers"""
+        context = super(NormalizedResponseMixin, self).get_serializer_context()
+        if getattr(self, 'normalizer', None) is not None:
+            context['normalizer'] = self.normalizer
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Move rows under `data` next to the included objects"""
+        normalizer = getattr(self, 'normalizer', None)
+        data = getattr(response, 'data', None)
+        if normalizer is not None and isinstance(data, dict) and \
+                status.is_success(response.status_code):
+            for name, objects in data.pop('included', {}).items():
+                normalizer.included.setdefault(name, {}).update(objects)
+            if 'results' in data:
+                response.data = OrderedDict(
+                    (key, value) for key, value in data.items()
+                    if key != 'results'
+                )
+                response.data['data'] = data['results']
+            else:
+                response.data = OrderedDict(data=data)
+            response.data['included'] = normalizer.included
+        response = super(NormalizedResponseMixin, self).finalize_response(
+            request, response, *args, **kwargs
+        )
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class ConditionalMixin:
+    """Answer conditional GET requests before serializing
+
+    Validators are built from `updated_at` of the object and of every
+    related object joined by the query plan. Lists only get an ETag from
+    the row count and the latest `updated_at` within scope, as deletes
+    never move a timestamp forward. Representations negotiated by media
+    type get their own validators.
+    """
+
+    def get_version_lookups(self):
+        """Return lookups of every updated_at rendered by the serializer"""
+        model = self.get_queryset().model
+        lookups = ['updated_at']
+        select_lookups, _ = self.get_query_plan()
+        for lookup in select_lookups:
+            related_model = model
+            for name in lookup.split('__'):
+                related_model = related_model._meta.get_field(
+                    name
+                ).related_model
+            if any(field.name == 'updated_at'
+                   for field in related_model._meta.concrete_fields):
+                lookups.append(f'{lookup}__updated_at')
+        return lookups
+
+    def get_validators(self, *parts, versions):
+        """Return ETag & Last-Modified timestamp of versions"""
+        versions = [version for version in versions if version is not None]
+        etag = hashlib.md5(
+            repr((*parts, *versions)).encode()
+        ).hexdigest()
+        last_modified = int(max(versions).timestamp()) if versions else None
+        return quote_etag(etag), last_modified
+
+    def conditional_response(self, request, etag, last_modified, handler):
+        """Return 304 when validators match, handler response otherwise"""
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """List with validators from an aggregate of the scope"""
+        versions = {
+            f'version_{index}': Max(lookup)
+            for index, lookup in enumerate(self.get_version_lookups())
+        }
+        aggregates = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count('pk'), **versions
+        )
+        etag, _ = self.get_validators(
+            request.user.pk, request.get_full_path(),
+            request.accepted_media_type, aggregates['count'],
+            versions=[aggregates[version] for version in versions]
+        )
+        return self.conditional_response(
+            request, etag, None,
+            lambda: super(ConditionalMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve with validators from the object and its relations"""
+        instance = self.get_object()
+        versions = []
+        for lookup in self.get_version_lookups():
+            value = instance
+            for name in lookup.split('__'):
+                value = getattr(value, name, None) if value else None
+            versions.append(value)
+        etag, last_modified = self.get_validators(
+            instance._meta.label, instance.pk, request.get_full_path(),
+            request.accepted_media_type, versions=versions
+        )
+        return self.conditional_response(
+            request, etag, last_modified,
+            lambda: Response(self.get_serializer(instance).data,
+                             status=status.HTTP_200_OK)
+        )
@@ -1,12 +1,37 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
 from uuid import uuid4
 
+from django.conf import settings
 from django.db import models
 from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
 
-from fcm_django.models import FCMDevice
+
+# Boards being deleted whose task tombstones were logged in bulk
+deleted_board_ids = ContextVar('deleted_board_ids', default=frozenset())
+
+
+@contextmanager
+def deleting_boards():
+    """Forget boards marked by delete signals once the delete ends
+
+    Marks of a delete rolled back between its pre_delete & post_delete
+    signals would otherwise hide tombstones of later task deletes.
+    """
+    token = deleted_board_ids.set(deleted_board_ids.get())
+    try:
+        yield
+    finally:
+        deleted_board_ids.reset(token)
 
 
 class UserManager(BaseUserManager):
@@ -58,6 +83,80 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def delete(self, using=None, keep_parents=False):
+        with deleting_boards():
+            return super(User, self).delete(using=using,
+                                            keep_parents=keep_parents)
+
+
+COUNTER_FIELDS = ('task_count', 'done_count', 'assigned_open_count')
+
+
+class CounterManager(models.Manager):
+    """Manager for models with denormalized task counters
+
+    Tasks are counted through `task_lookup` and open assigned tasks through
+    `assignment_lookup`, both relative to this model.
+    """
+    task_lookup = None
+    assignment_lookup = None
+
+    def adjust(self, deltas):
+        """Apply {pk: {counter: delta}} with F() expressions
+
+        Objects sharing the same deltas are updated by one query. Returns
+        the changed objects to log for delta sync.
+        """
+        pks_by_deltas = defaultdict(list)
+        for pk, counters in deltas.items():
+            key = tuple(sorted(
+                (field, delta) for field, delta in counters.items() if delta
+            ))
+            if pk is not None and key:
+                pks_by_deltas[key].append(pk)
+        now = timezone.now()
+        for key, pks in pks_by_deltas.items():
+            self.filter(pk__in=pks).update(updated_at=now, **{
+                field: F(field) + delta for field, delta in key
+            })
+        if not pks_by_deltas:
+            return []
+        return list(self.filter(pk__in=[
+            pk for pks in pks_by_deltas.values() for pk in pks
+        ]))
+
+    def count_of(self, queryset, lookup):
+        """Return correlated count of queryset rows pointing at the object"""
+        return Coalesce(Subquery(queryset.filter(**{
+            lookup: OuterRef('pk')
+        }).order_by().values(lookup).annotate(
+            count=Count('pk')
+        ).values('count')), 0)
+
+    def recount(self, pks=None):
+        """Recompute counters of given or all objects, logging them"""
+        queryset = self.all() if pks is None else self.filter(pk__in=pks)
+        tasks = Task.objects.all()
+        updated = queryset.update(
+            task_count=self.count_of(tasks, self.task_lookup),
+            done_count=self.count_of(tasks.filter(is_done=True),
+                                     self.task_lookup),
+            assigned_open_count=self.count_of(
+                AssignedTask.objects.filter(is_done=False),
+                self.assignment_lookup
+            ),
+            updated_at=timezone.now()
+        )
+        if updated:
+            Change.objects.record(queryset)
+        return updated
+
+
+class BoardManager(CounterManager):
+    """Manager for Board model"""
+    task_lookup = 'board'
+    assignment_lookup = 'task__board'
+
 
 class Board(models.Model):
     """Board model"""
@@ -66,6 +165,12 @@ class Board(models.Model):
     is_personal = models.BooleanField(default=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True,
                              null=True)
+    task_count = models.IntegerField(default=0, editable=False)
+    done_count = models.IntegerField(default=0, editable=False)
+    assigned_open_count = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BoardManager()
 
     class Meta:
         app_label = 'twix'
@@ -74,6 +179,69 @@ class Board(models.Model):
     def __str__(self):
         return self.name
 
+    def delete(self, using=None, keep_parents=False):
+        with deleting_boards():
+            return super(Board, self).delete(using=using,
+                                             keep_parents=keep_parents)
+
+
+class CounterDeltas:
+    """Counter changes of boards & groups, applied together"""
+
+    def __init__(self):
+        self.boards = defaultdict(Counter)
+        self.groups = defaultdict(Counter)
+
+    def add_task(self, board_id, group_id, is_done, count=1):
+        """Count tasks in, or out with a negative count"""
+        for deltas, pk in ((self.boards, board_id), (self.groups, group_id)):
+            deltas[pk]['task_count'] += count
+            if is_done:
+                deltas[pk]['done_count'] += count
+
+    def add_assignment(self, board_id, group_id, count=1):
+        """Count open assigned tasks in, or out with a negative count"""
+        self.boards[board_id]['assigned_open_count'] += count
+        self.groups[group_id]['assigned_open_count'] += count
+
+    def apply(self):
+        """Update counters with F() expressions, logging changed objects"""
+        changed = Board.objects.adjust(self.boards) + \
+            Group.objects.adjust(self.groups)
+        if changed:
+            Change.objects.record(changed)
+
+
+class TaskManager(models.Manager):
+    """Manager for Task model"""
+
+    def lock_counted(self, tasks):
+        """Lock rows of stored tasks, reloading their counted state
+
+        Counter deltas are then computed from the locked rows, so concurrent
+        changes of the same task are counted once. Returns tasks whose row
+        still exists, the others are counted as new.
+        """
+        tasks = [task for task in tasks if task.pk is not None]
+        rows = {
+            pk: row for pk, *row in self.select_for_update().filter(
+                pk__in=[task.pk for task in tasks]
+            ).values_list('pk', 'board_id', 'group_id', 'is_done',
+                          'is_assigned')
+        }
+        stored = []
+        for task in tasks:
+            row = rows.get(task.pk)
+            if row is None:
+                task._loaded_counted = None
+                task._loaded_assignment = (False, None)
+                continue
+            board_id, group_id, is_done, is_assigned = row
+            task._loaded_counted = (board_id, group_id, is_done)
+            task._loaded_assignment = (is_assigned, group_id)
+            stored.append(task)
+        return stored
+
 
 class Task(models.Model):
     """Task model"""
@@ -87,45 +255,204 @@ class Task(models.Model):
     notes = models.TextField(blank=True, null=True)
     group = models.ForeignKey('Group', on_delete=models.SET_NULL, null=True,
                               blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    reminder_sent_at = models.DateTimeField(blank=True, null=True,
+                                            editable=False)
+
+    objects = TaskManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded assignment & reminder to detect changes on save"""
+        instance = super(Task, cls).from_db(db, field_names, values)
+        instance._loaded_assignment = (instance.is_assigned,
+                                       instance.group_id)
+        instance._loaded_remind_me = instance.__dict__.get('remind_me')
+        instance._loaded_counted = tuple(
+            instance.__dict__.get(field)
+            for field in ('board_id', 'group_id', 'is_done')
+        )
+        return instance
+
+    @property
+    def assignment_changed(self):
+        """Whether is_assigned or group changed since loaded"""
+        loaded = getattr(self, '_loaded_assignment', (False, None))
+        return loaded != (self.is_assigned, self.group_id)
+
+    @property
+    def reminder_changed(self):
+        """Whether remind_me changed since loaded"""
+        return getattr(self, '_loaded_remind_me', None) != self.remind_me
+
+    @property
+    def moved_from(self):
+        """Board & group ids loaded, if the task moved out of them"""
+        loaded = getattr(self, '_loaded_counted', None)
+        if loaded is not None and loaded[:2] != (self.board_id,
+                                                 self.group_id):
+            return loaded[:2]
+        return None
+
+    def count_changes(self, deltas):
+        """Add counter changes since loaded to deltas"""
+        loaded = getattr(self, '_loaded_counted', None)
+        current = (self.board_id, self.group_id, self.is_done)
+        if loaded == current:
+            return
+        if loaded is not None:
+            deltas.add_task(*loaded, count=-1)
+        deltas.add_task(*current)
+        self._loaded_counted = current
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
-        super(Task, self).save(force_insert=force_insert,
-                               force_update=force_update, using=using,
-                               update_fields=update_fields)
+        if self.reminder_changed:
+            self.reminder_sent_at = None
+            self._loaded_remind_me = self.remind_me
+        with transaction.atomic():
+            if not self._state.adding:
+                Task.objects.lock_counted([self])
+            super(Task, self).save(force_insert=force_insert,
+                                   force_update=force_update, using=using,
+                                   update_fields=update_fields)
+            deltas = CounterDeltas()
+            AssignedTask.objects.count_moves([self], deltas)
+            self.count_changes(deltas)
+            if self.assignment_changed:
+                assignments = AssignedTask.objects.reconcile([self], deltas)
+                Notification.objects.enqueue_assignments(assignments)
+                self._loaded_assignment = (self.is_assigned, self.group_id)
+            deltas.apply()
+
+    def delete(self, using=None, keep_parents=False):
         with transaction.atomic():
-            if self.is_assigned:
-                for user in self.group.users.all():
-                    AssignedTask.objects.get_or_create(
-                        user=user, task=self, group=self.group
-                    )
-                    device = FCMDevice.objects.filter(
-                        user=user
-                    ).first()
-                    device.send_message(
-                        title='Cask',
-                        body='You have been assigned a new task by '
-                             f'{self.group.admin.name}!'
-                    )
-            else:
-                for user in self.group.users.all():
-                    assigned_task_exists = AssignedTask.objects.filter(
-                        user=user, task=self, group=self.group
-                    ).exists()
-                    if assigned_task_exists:
-                        assigned_task = AssignedTask.objects.filter(
-                            user=user, task=self, group=self.group
-                        ).first()
-                        assigned_task.delete()
+            deltas = CounterDeltas()
+            if Task.objects.lock_counted([self]):
+                deltas.add_task(*self._loaded_counted, count=-1)
+                AssignedTask.objects.count_open([self.pk], deltas, -1)
+            deleted = super(Task, self).delete(using=using,
+                                               keep_parents=keep_parents)
+            deltas.apply()
+        return deleted
 
     class Meta:
         app_label = 'twix'
         default_related_name = 'tasks'
+        indexes = [
+            models.Index(fields=['board', 'is_done', 'due_date'],
+                         name='task_board_due_idx'),
+            models.Index(fields=['board', 'remind_me'],
+                         name='task_board_remind_idx'),
+            models.Index(fields=['group', 'is_done'],
+                         name='task_group_done_idx'),
+            models.Index(fields=['remind_me'], name='task_reminder_due_idx',
+                         condition=models.Q(remind_me__isnull=False,
+                                            reminder_sent_at__isnull=True)),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class AssignedTaskManager(models.Manager):
+    """Manager for AssignedTask model"""
+
+    def count_open(self, task_ids, deltas, sign=1):
+        """Add open assigned tasks of given tasks to deltas"""
+        for board_id, group_id, count in self.filter(
+            task_id__in=task_ids, is_done=False
+        ).order_by().values_list('task__board_id', 'group_id').annotate(
+            count=Count('pk')
+        ):
+            deltas.add_assignment(board_id, group_id, sign * count)
+
+    def count_moves(self, tasks, deltas):
+        """Move open assigned tasks of tasks moved to another board
+
+        Expects tasks before their counted state is updated.
+        """
+        moved = {
+            task.pk: task for task in tasks
+            if (getattr(task, '_loaded_counted', None) or (None, ))[0]
+            not in (None, task.board_id)
+        }
+        if not moved:
+            return
+        for task_id, group_id, count in self.filter(
+            task_id__in=moved, is_done=False
+        ).order_by().values_list('task_id', 'group_id').annotate(
+            count=Count('pk')
+        ):
+            task = moved[task_id]
+            deltas.add_assignment(task._loaded_counted[0], group_id, -count)
+            deltas.add_assignment(task.board_id, group_id, count)
+
+    def reconcile(self, tasks, deltas=None):
+        """Sync assigned tasks of given tasks with their group members
+
+        Counter changes are added to deltas if given, applied otherwise.
+        Returns (task_id, group_id, user_id) of newly created assignments.
+        """
+        apply = deltas is None
+        deltas = CounterDeltas() if apply else deltas
+        boards = {task.pk: task.board_id for task in tasks}
+        assigned = [
+            task for task in tasks if task.is_assigned and task.group_id
+        ]
+
+        members = defaultdict(set)
+        if assigned:
+            for group_id, user_id in Group.users.through.objects.filter(
+                group_id__in={task.group_id for task in assigned}
+            ).values_list('group_id', 'user_id'):
+                members[group_id].add(user_id)
+
+        desired = {
+            (task.id, task.group_id, user_id)
+            for task in assigned for user_id in members[task.group_id]
+        }
+        existing = {
+            (task_id, group_id, user_id): (assigned_task_id, is_done)
+            for assigned_task_id, task_id, group_id, user_id, is_done
+            in self.filter(task__in=tasks).values_list(
+                'id', 'task_id', 'group_id', 'user_id', 'is_done'
+            )
+        }
+
+        stale = [
+            self.model(id=assigned_task_id, task_id=task_id,
+                       group_id=group_id, user_id=user_id, is_done=is_done)
+            for (task_id, group_id, user_id), (assigned_task_id, is_done)
+            in existing.items() if (task_id, group_id, user_id) not in desired
+        ]
+        if stale:
+            self.filter(id__in=[
+                assigned_task.id for assigned_task in stale
+            ]).delete()
+            Change.objects.record(stale, deleted=True)
+            for assigned_task in stale:
+                if not assigned_task.is_done:
+                    deltas.add_assignment(boards[assigned_task.task_id],
+                                          assigned_task.group_id, -1)
+
+        missing = desired - existing.keys()
+        if missing:
+            created = [
+                self.model(task_id=task_id, group_id=group_id,
+                           user_id=user_id)
+                for task_id, group_id, user_id in missing
+            ]
+            self.bulk_create(created, ignore_conflicts=True)
+            Change.objects.record(created)
+            for task_id, group_id, _ in missing:
+                deltas.add_assignment(boards[task_id], group_id)
+
+        if apply:
+            deltas.apply()
+        return missing
+
+
 class AssignedTask(models.Model):
     """Assigned Task model"""
     id = models.UUIDField(default=uuid4, primary_key=True, editable=False)
@@ -133,15 +460,44 @@ class AssignedTask(models.Model):
     group = models.ForeignKey('Group', on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     is_done = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AssignedTaskManager()
+
+    def save(self, *args, **kwargs):
+        """Count is_done changes against the locked row"""
+        with transaction.atomic():
+            loaded = None
+            if not self._state.adding:
+                loaded = AssignedTask.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('is_done', flat=True).first()
+            super(AssignedTask, self).save(*args, **kwargs)
+            if loaded is None and not self.is_done or \
+                    loaded is not None and loaded != self.is_done:
+                deltas = CounterDeltas()
+                deltas.add_assignment(self.task.board_id, self.group_id,
+                                      -1 if self.is_done else 1)
+                deltas.apply()
 
     class Meta:
         app_label = 'twix'
         default_related_name = 'assigned_tasks'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user'],
+                                    name='unique_assigned_task'),
+        ]
 
     def __str__(self):
         return f'{self.task.name} to {self.group.name}'
 
 
+class GroupManager(CounterManager):
+    """Manager for Group model"""
+    task_lookup = 'group'
+    assignment_lookup = 'group'
+
+
 class Group(models.Model):
     """Group model"""
     id = models.UUIDField(primary_key=True, default=uuid4, editable=True)
@@ -149,6 +505,19 @@ class Group(models.Model):
     admin = models.ForeignKey(User, related_name='admin',
                               on_delete=models.CASCADE)
     users = models.ManyToManyField(User)
+    task_count = models.IntegerField(default=0, editable=False)
+    done_count = models.IntegerField(default=0, editable=False)
+    assigned_open_count = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GroupManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded admin to detect changes on save"""
+        instance = super(Group, cls).from_db(db, field_names, values)
+        instance._loaded_admin_id = instance.__dict__.get('admin_id')
+        return instance
 
     class Meta:
         app_label = 'twix'
@@ -156,3 +525,187 @@ class Group(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class NotificationManager(models.Manager):
+    """Manager for Notification model"""
+
+    def enqueue(self, user_ids, title, body):
+        """Write pending notifications for given users to the outbox"""
+        return self.bulk_create([
+            self.model(user_id=user_id, title=title, body=body)
+            for user_id in user_ids
+        ])
+
+    def enqueue_assignments(self, assignments):
+        """Write notifications for (task_id, group_id, user_id) assignments"""
+        if not assignments:
+            return []
+        admin_names = dict(Group.objects.filter(
+            id__in={group_id for _, group_id, _ in assignments}
+        ).values_list('id', 'admin__name'))
+        return self.bulk_create([
+            self.model(
+                user_id=user_id,
+                title='Cask',
+                body='You have been assigned a new task by '
+                     f'{admin_names[group_id]}!'
+            )
+            for _, group_id, user_id in assignments
+        ])
+
+    def enqueue_reminders(self, reminders):
+        """Write notifications for (task name, user_id) reminders"""
+        return self.bulk_create([
+            self.model(user_id=user_id, title='Cask',
+                       body=f'Reminder: {name}')
+            for name, user_id in reminders
+        ])
+
+
+class Notification(models.Model):
+    """Push notification outbox model"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES,
+                              default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    objects = NotificationManager()
+
+    class Meta:
+        app_label = 'twix'
+        default_related_name = 'notifications'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} to {self.user.email}'
+
+
+changes_recorded = Signal(providing_args=['changes'])
+
+
+class ChangeManager(models.Manager):
+    """Manager for Change model"""
+    SCOPE_FIELDS = {
+        'board': {'owner_id': 'user_id', 'board_id': 'id'},
+        'task': {'board_id': 'board_id', 'group_id': 'group_id'},
+        'group': {'owner_id': 'admin_id', 'group_id': 'id'},
+        'assignedtask': {'owner_id': 'user_id', 'group_id': 'group_id'},
+    }
+
+    def record(self, instances, deleted=False):
+        """Append changes of given board, task, group & assigned task"""
+        changes = self.bulk_create([
+            self.model(
+                model=instance._meta.model_name,
+                object_id=instance.pk,
+                is_deleted=deleted,
+                **{
+                    field: getattr(instance, attr)
+                    for field, attr in self.SCOPE_FIELDS[
+                        instance._meta.model_name
+                    ].items()
+                }
+            )
+            for instance in instances
+        ])
+        changes_recorded.send(sender=self.model, changes=changes)
+        return changes
+
+    def record_removals(self, memberships):
+        """Append group tombstones of (group id, user id) removed members
+
+        They carry no group id, so only the removed member sees them.
+        """
+        changes = self.bulk_create([
+            self.model(model='group', object_id=group_id, is_deleted=True,
+                       owner_id=user_id)
+            for group_id, user_id in memberships
+        ])
+        if changes:
+            changes_recorded.send(sender=self.model, changes=changes)
+        return changes
+
+    def record_moves(self, tasks):
+        """Append tombstones of tasks in the board & group they moved out of
+
+        Logged before the tasks' own changes, so viewers of both scopes end
+        with the task while viewers of the old scope only see it deleted.
+        """
+        changes = self.bulk_create([
+            self.model(model='task', object_id=task.pk, is_deleted=True,
+                       board_id=board_id, group_id=group_id)
+            for task, (board_id, group_id) in tasks
+        ])
+        if changes:
+            changes_recorded.send(sender=self.model, changes=changes)
+        return changes
+
+    def settled_id(self, until):
+        """Return the highest id up to `until` no change can commit below
+
+        Ids are taken on insert but seen on commit, so changes logged within
+        `CHANGE_COMMIT_GRACE` seconds may still be joined by lower ids.
+        """
+        cutoff = timezone.now() - timedelta(
+            seconds=getattr(settings, 'CHANGE_COMMIT_GRACE', 5)
+        )
+        return self.filter(
+            id__lte=until, created_at__lt=cutoff
+        ).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+class Change(models.Model):
+    """Change log model, its id is the sync token
+
+    Scope ids are kept on the change itself so tombstones can be filtered
+    after the object is gone. Group tombstones without a group id tell
+    their owner about being removed from the group.
+    """
+    MODEL_CHOICES = (
+        ('board', 'Board'),
+        ('task', 'Task'),
+        ('group', 'Group'),
+        ('assignedtask', 'Assigned Task'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=12, choices=MODEL_CHOICES)
+    object_id = models.UUIDField()
+    is_deleted = models.BooleanField(default=False)
+    owner_id = models.UUIDField(blank=True, null=True)
+    board_id = models.UUIDField(blank=True, null=True)
+    group_id = models.UUIDField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = ChangeManager()
+
+    class Meta:
+        app_label = 'twix'
+        default_related_name = 'changes'
+        indexes = [
+            models.Index(fields=['model', 'object_id'],
+                         name='change_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} at {self.id}'
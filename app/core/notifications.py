@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from fcm_django.fcm import fcm_send_bulk_message
+from fcm_django.models import FCMDevice
+
+from .models import Notification
+
+
+def get_setting(name, default):
+    """Return notification setting or its default"""
+    return getattr(settings, f'NOTIFICATION_{name}', default)
+
+
+def get_sender():
+    """Return an instance of the configured notification sender"""
+    return import_string(
+        get_setting('SENDER', 'core.notifications.FCMSender')
+    )()
+
+
+class BaseSender:
+    """Base class for notification senders"""
+
+    def send(self, notifications):
+        """Deliver notifications, return errors keyed by notification id
+
+        Notifications missing from the returned dict count as delivered.
+        """
+        raise NotImplementedError
+
+
+class FCMSender(BaseSender):
+    """Sender delivering notifications through FCM"""
+
+    def send(self, notifications):
+        """Send one multicast message per distinct title & body"""
+        messages = defaultdict(list)
+        for notification in notifications:
+            messages[(notification.title, notification.body)].append(
+                notification
+            )
+
+        errors = {}
+        for (title, body), batch in messages.items():
+            devices = list(FCMDevice.objects.filter(
+                user_id__in={notification.user_id for notification in batch},
+                active=True
+            ).values_list('registration_id', 'user_id'))
+            if not devices:
+                continue
+
+            registration_ids = [device[0] for device in devices]
+            try:
+                result = fcm_send_bulk_message(
+                    registration_ids=registration_ids, title=title, body=body
+                )
+            except Exception as exc:
+                for notification in batch:
+                    errors[notification.id] = str(exc)
+                continue
+
+            FCMDevice.objects.all()._deactivate_devices_with_error_results(
+                registration_ids, result['results']
+            )
+
+            failed = defaultdict(list)
+            delivered = set()
+            for (_, user_id), item in zip(devices, result['results']):
+                if 'error' in item:
+                    failed[user_id].append(item['error'])
+                else:
+                    delivered.add(user_id)
+            for notification in batch:
+                if notification.user_id in failed and \
+                        notification.user_id not in delivered:
+                    errors[notification.id] = ', '.join(
+                        failed[notification.user_id]
+                    )
+        return errors
+
+
+class LocalSender(BaseSender):
+    """Sender keeping notifications in memory, used for testing"""
+    outbox = []
+    error = None
+
+    def send(self, notifications):
+        """Record notifications or fail all of them with error"""
+        if self.error is not None:
+            return {
+                notification.id: self.error for notification in notifications
+            }
+        self.outbox.extend(notifications)
+        return {}
+
+
+def claim(batch_size):
+    """Lease a batch of due notifications to the calling worker"""
+    now = timezone.now()
+    lease = timedelta(seconds=get_setting('LEASE', 300))
+    with transaction.atomic():
+        notifications = list(Notification.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            status=Notification.PENDING,
+            next_attempt_at__lte=now
+        ).order_by('next_attempt_at')[:batch_size])
+        Notification.objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).update(next_attempt_at=now + lease)
+    return notifications
+
+
+def dispatch(sender=None, batch_size=100):
+    """Send one batch from the outbox, return number of processed rows"""
+    sender = sender or get_sender()
+    notifications = claim(batch_size)
+    if not notifications:
+        return 0
+
+    try:
+        errors = sender.send(notifications)
+    except Exception as exc:
+        errors = {notification.id: str(exc) for notification in notifications}
+
+    now = timezone.now()
+    Notification.objects.filter(
+        id__in=[
+            notification.id for notification in notifications
+            if notification.id not in errors
+        ]
+    ).update(status=Notification.SENT, sent_at=now, last_error=None,
+             attempts=F('attempts') + 1)
+
+    failed = [
+        notification for notification in notifications
+        if notification.id in errors
+    ]
+    max_attempts = get_setting('MAX_ATTEMPTS', 5)
+    retry_delay = get_setting('RETRY_DELAY', 30)
+    for notification in failed:
+        notification.attempts += 1
+        notification.last_error = errors[notification.id]
+        if notification.attempts >= max_attempts:
+            notification.status = Notification.FAILED
+        else:
+            notification.next_attempt_at = now + timedelta(
+                seconds=retry_delay * 2 ** (notification.attempts - 1)
+            )
+    Notification.objects.bulk_update(
+        failed, ['attempts', 'last_error', 'status', 'next_attempt_at']
+    )
+
+    return len(notifications)
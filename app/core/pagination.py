@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from rest_framework import pagination
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Keyset pagination ordered by primary key"""
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 500)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task, AssignedTask, Notification
+
+
+def fire_reminders(batch_size=100):
+    """Enqueue notifications of one batch of due reminders
+
+    Due tasks are claimed with row locks skipping those held by other
+    workers and marked fired in the same transaction as their outbox rows,
+    so every reminder is enqueued once. Reminders overdue by more than
+    REMINDER_MAX_DELAY seconds are marked fired without notifying.
+    Returns number of claimed reminders.
+    """
+    now = timezone.now()
+    max_delay = timedelta(seconds=getattr(settings, 'REMINDER_MAX_DELAY',
+                                          3600))
+    with transaction.atomic():
+        tasks = list(Task.objects.select_for_update(
+            skip_locked=True, of=('self', )
+        ).filter(
+            remind_me__lte=now,
+            reminder_sent_at__isnull=True
+        ).order_by('remind_me').values_list(
+            'id', 'name', 'remind_me', 'is_assigned', 'board__user_id'
+        )[:batch_size])
+        if not tasks:
+            return 0
+
+        due = [task for task in tasks if task[2] >= now - max_delay]
+        recipients = {
+            task_id: {user_id} if user_id else set()
+            for task_id, _, _, _, user_id in due
+        }
+        for task_id, user_id in AssignedTask.objects.filter(task_id__in=[
+            task_id for task_id, _, _, is_assigned, _ in due if is_assigned
+        ]).values_list('task_id', 'user_id'):
+            recipients[task_id].add(user_id)
+
+        Notification.objects.enqueue_reminders([
+            (name, user_id)
+            for task_id, name, _, _, _ in due
+            for user_id in recipients[task_id]
+        ])
+        Task.objects.filter(
+            id__in=[task[0] for task in tasks]
+        ).update(reminder_sent_at=now)
+    return len(tasks)
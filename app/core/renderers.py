@@ -0,0 +1,25 @@
+from rest_framework import renderers
+
+
+class NDJSONRenderer(renderers.JSONRenderer):
+    """Renderer for newline delimited JSON"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render each list item on its own line"""
+        if not isinstance(data, list):
+            data = [data]
+        return b''.join(
+            super(NDJSONRenderer, self).render(item) + b'\n' for item in data
+        )
+
+
+class NormalizedJSONRenderer(renderers.JSONRenderer):
+    """Renderer for responses with nested objects side-loaded by id
+
+    Views reshape data into `data` & `included` before rendering, see
+    NormalizedResponseMixin.
+    """
+    media_type = 'application/vnd.twix.normalized+json'
+    format = 'normalized'
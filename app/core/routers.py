@@ -0,0 +1,36 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+use_replica = ContextVar('use_replica', default=False)
+
+
+class ReplicaRouter:
+    """Route reads of read-only requests to the replica if configured
+
+    Reads inside transactions stay on the primary to see their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Return replica alias for reads of read-only requests"""
+        replica = getattr(settings, 'REPLICA_DATABASE', None)
+        if replica is None or not use_replica.get():
+            return None
+        if connections['default'].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        """Always write to the primary"""
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Replica holds the same objects as the primary"""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Only migrate the primary"""
+        if db == getattr(settings, 'REPLICA_DATABASE', None):
+            return False
+        return None
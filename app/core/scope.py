@@ -0,0 +1,111 @@
+from collections import namedtuple
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .models import Group
+
+
+class GroupScope(namedtuple('GroupScope', ['member_ids', 'admin_ids'])):
+    """Ids of groups a user belongs to and administers"""
+
+    @property
+    def group_ids(self):
+        """Ids of every group in scope"""
+        return self.member_ids | self.admin_ids
+
+
+def get_setting(name, default):
+    """Return group scope cache setting or its default"""
+    return getattr(settings, 'GROUP_SCOPE_CACHE', {}).get(name, default)
+
+
+# Scopes loaded within the current request, None outside of requests
+request_scopes = ContextVar('request_scopes', default=None)
+
+
+def start_request():
+    """Cache scopes loaded from now on until the request finishes"""
+    request_scopes.set({})
+
+
+def finish_request():
+    """Forget scopes loaded by the finished request"""
+    request_scopes.set(None)
+
+
+def get_cache():
+    """Return shared cache backend holding group scopes, if any
+
+    Invalidations only reach caches shared by every process, so
+    per-process backends are refused.
+    """
+    backend = get_setting('BACKEND', None)
+    if backend is None:
+        return None
+    cache = caches[backend]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            'GROUP_SCOPE_CACHE needs a cache shared by every process!'
+        )
+    return cache
+
+
+def scope_cache_key(user_id):
+    """Return cache key of a user's group scope"""
+    return f'group-scope:{user_id}'
+
+
+def load_group_scope(user_id):
+    """Return group scope of a user read from the primary"""
+    return GroupScope(
+        member_ids=frozenset(Group.users.through.objects.using(
+            'default'
+        ).filter(user_id=user_id).values_list('group_id', flat=True)),
+        admin_ids=frozenset(Group.objects.using('default').filter(
+            admin_id=user_id
+        ).values_list('id', flat=True))
+    )
+
+
+def get_group_scope(user):
+    """Return group scope of a user, cached for the current request
+
+    Scopes are only kept across requests by a shared GROUP_SCOPE_CACHE
+    backend. Misses are read from the primary so a lagging replica is
+    never cached.
+    """
+    scopes = request_scopes.get()
+    if scopes is not None and user.pk in scopes:
+        return scopes[user.pk]
+    cache = get_cache()
+    scope = cache.get(scope_cache_key(user.pk)) if cache is not None \
+        else None
+    if scope is None:
+        scope = load_group_scope(user.pk)
+        if cache is not None:
+            cache.set(scope_cache_key(user.pk), scope,
+                      get_setting('TTL', 300))
+    if scopes is not None:
+        scopes[user.pk] = scope
+    return scope
+
+
+def invalidate_group_scope(user_ids):
+    """Drop cached group scopes now and once the transaction commits"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    scopes = request_scopes.get()
+    if scopes is not None:
+        for user_id in user_ids:
+            scopes.pop(user_id, None)
+    cache = get_cache()
+    if cache is None or not user_ids:
+        return
+    keys = [scope_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,8 +1,45 @@
+import copy
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+from django.db.models import prefetch_related_objects
+from django.utils.functional import cached_property
+
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+from .metrics import measure_serialization
+
+
+def copy_field(field):
+    """Return an unbound copy of a cached field
+
+    Plain fields are copied shallowly, fields owning other fields are
+    rebuilt since their children are bound to them. Validators keep per
+    request state, like `UniqueValidator.set_context`, so writable fields
+    get their own copies.
+    """
+    if isinstance(field, serializers.BaseSerializer) or \
+            hasattr(field, 'child') or hasattr(field, 'child_relation'):
+        return copy.deepcopy(field)
+    copied = copy.copy(field)
+    if not field.read_only:
+        copied.validators = [
+            copy.copy(validator) for validator in field.validators
+        ]
+    return copied
 
 
 class DynamicModelSerializer(serializers.ModelSerializer):
-    """Allows to specify fields to be included"""
+    """Allows to specify fields to be included
+
+    Field trees are built once per serializer class & field selection and
+    copied for every instance. Rows are rendered through a plan compiled
+    once per instance, reading plain model fields directly.
+    """
+    _field_trees = {}
 
     def __init__(self, *args, **kwargs):
         """Logic for specifying fields"""
@@ -11,12 +48,231 @@ class DynamicModelSerializer(serializers.ModelSerializer):
 
         super(DynamicModelSerializer, self).__init__(*args, **kwargs)
 
+        self.selection = (None, None)
         if bool(fields) != bool(exclude):
-            if fields is not None:
-                allowed = set(fields)
-                existing = set(self.fields)
-                for field in existing - allowed:
-                    self.fields.pop(field)
+            self.selection = (
+                tuple(fields) if fields is not None else None,
+                tuple(exclude) if exclude is not None else None
+            )
+
+    def get_fields(self):
+        """Return a copy of the cached field tree of this selection"""
+        key = (type(self), self.selection)
+        fields = self._field_trees.get(key)
+        if fields is None:
+            fields = super(DynamicModelSerializer, self).get_fields()
+            allowed, exclude = self.selection
+            if allowed is not None:
+                for field in set(fields) - set(allowed):
+                    fields.pop(field)
             elif exclude is not None:
                 for field in exclude:
-                    self.fields.pop(field)
+                    fields.pop(field)
+            self._field_trees[key] = fields
+        return OrderedDict(
+            (name, copy_field(field)) for name, field in fields.items()
+        )
+
+    @cached_property
+    def representation_plan(self):
+        """Return readable fields with attribute names to read directly
+
+        Only non-relational model fields and nested serializers of forward
+        relations are read directly, related fields keep their own lookup.
+        """
+        model = self.Meta.model
+        plan = []
+        for field in self._readable_fields:
+            attribute = None
+            if len(field.source_attrs) == 1 and not isinstance(
+                field, (serializers.RelatedField, serializers.ManyRelatedField)
+            ):
+                try:
+                    model_field = model._meta.get_field(field.source)
+                except FieldDoesNotExist:
+                    model_field = None
+                if model_field is not None and model_field.concrete:
+                    attribute = field.source
+            plan.append((field, attribute))
+        return plan
+
+    @cached_property
+    def field_names(self):
+        """Return names of readable fields"""
+        return frozenset(field.field_name for field, _ in
+                         self.representation_plan)
+
+    def to_representation(self, instance):
+        """Render instance, measured by request metrics"""
+        return measure_serialization(self.represent, instance)
+
+    def represent(self, instance):
+        """Render instance through the compiled plan"""
+        if not isinstance(instance, self.Meta.model):
+            return super(DynamicModelSerializer, self).to_representation(
+                instance
+            )
+
+        normalizer = self.context.get('normalizer')
+        ret = OrderedDict()
+        for field, attribute in self.representation_plan:
+            if normalizer is not None and normalizer.is_nested(field):
+                ret[field.field_name] = normalizer.include_field(field,
+                                                                 instance)
+                continue
+            if attribute is not None:
+                value = getattr(instance, attribute)
+            else:
+                try:
+                    value = field.get_attribute(instance)
+                except SkipField:
+                    continue
+                if isinstance(value, PKOnlyObject):
+                    ret[field.field_name] = None if value.pk is None \
+                        else field.to_representation(value)
+                    continue
+            ret[field.field_name] = None if value is None \
+                else field.to_representation(value)
+        return ret
+
+
+class Normalizer:
+    """Collects nested objects of a response, each rendered once
+
+    Nested model serializers render the primary key of their object, the
+    object itself is rendered into `included` keyed by type & primary key.
+    """
+
+    def __init__(self):
+        self.included = OrderedDict()
+        self.types = {}
+
+    def is_nested(self, field):
+        """Whether field renders nested objects to side-load"""
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        return isinstance(field, DynamicModelSerializer)
+
+    def get_type(self, serializer):
+        """Return plural snake case name of the serialized model"""
+        model = serializer.Meta.model
+        if model not in self.types:
+            self.types[model] = str(
+                model._meta.verbose_name_plural
+            ).replace(' ', '_')
+        return self.types[model]
+
+    def include_field(self, field, instance):
+        """Side-load objects of a nested field, returning their keys"""
+        try:
+            value = field.get_attribute(instance)
+        except SkipField:
+            return None
+        if value is None:
+            return None
+        if isinstance(field, serializers.ListSerializer):
+            if isinstance(value, models.Manager):
+                value = value.all()
+            return [self.include(field.child, item) for item in value]
+        return self.include(field, value)
+
+    def include(self, serializer, instance):
+        """Render instance into included once, returning its key"""
+        objects = self.included.setdefault(self.get_type(serializer), {})
+        key = str(instance.pk)
+        rendered = objects.get(key)
+        if rendered is None:
+            # Registered before rendering to stop cycles
+            objects[key] = rendered = OrderedDict()
+            rendered.update(serializer.represent(instance))
+        elif not serializer.field_names <= rendered.keys():
+            rendered.update(serializer.represent(instance))
+        return key
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolving objects preloaded into the context
+
+    Batch endpoints load every referenced object in one query and pass them
+    as `preloaded` context, mapping model to objects keyed by pk.
+    """
+
+    def to_internal_value(self, data):
+        """Look up preloaded objects before querying"""
+        preloaded = self.context.get('preloaded', {}).get(
+            self.get_queryset().model
+        )
+        if preloaded is None:
+            return super(
+                PreloadedPrimaryKeyRelatedField, self
+            ).to_internal_value(data)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (ValidationError, TypeError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[pk]
+
+
+def get_query_plan(serializer, prefix='', prefetch=False):
+    """Return select_related & prefetch_related lookups for serializer
+
+    Walks the readable nested serializers of the field tree, joining to-one
+    relations and prefetching to-many relations and everything below them.
+    """
+    select_lookups, prefetch_lookups = [], []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        lookup = prefix + field.source.replace('.', '__')
+
+        if isinstance(field, serializers.ListSerializer):
+            prefetch_lookups.append(lookup)
+            child_select, child_prefetch = get_query_plan(
+                field.child, f'{lookup}__', prefetch=True
+            )
+            prefetch_lookups += child_select + child_prefetch
+        elif isinstance(field, serializers.BaseSerializer):
+            if prefetch:
+                prefetch_lookups.append(lookup)
+            else:
+                select_lookups.append(lookup)
+            child_select, child_prefetch = get_query_plan(
+                field, f'{lookup}__', prefetch=prefetch
+            )
+            select_lookups += child_select
+            prefetch_lookups += child_prefetch
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch_lookups.append(lookup)
+
+    return select_lookups, prefetch_lookups
+
+
+def apply_query_plan(queryset, serializer):
+    """Eager load every relation rendered by serializer"""
+    select_lookups, prefetch_lookups = get_query_plan(serializer)
+    if select_lookups:
+        queryset = queryset.select_related(*select_lookups)
+    if prefetch_lookups:
+        queryset = queryset.prefetch_related(*prefetch_lookups)
+    return queryset
+
+
+def prefetch_query_plan(instances, serializer):
+    """Eager load every relation rendered by serializer onto instances
+
+    Saved instances hold related objects loaded by different queries, so
+    prefetched relations are dropped and loaded for all of them together.
+    """
+    select_lookups, prefetch_lookups = get_query_plan(serializer)
+    related = list(instances)
+    for lookup in [''] + select_lookups:
+        objects = related
+        for name in filter(None, lookup.split('__')):
+            objects = [getattr(obj, name) for obj in objects
+                       if obj is not None]
+        for obj in objects:
+            if obj is not None:
+                obj.__dict__.pop('_prefetched_objects_cache', None)
+    prefetch_related_objects(related, *select_lookups, *prefetch_lookups)
@@ -0,0 +1,32 @@
+from django.db import connections
+
+from gunicorn.app.base import BaseApplication
+
+
+class Application(BaseApplication):
+    """Gunicorn application serving app.wsgi from a pool of workers
+
+    With preloading, Django is loaded & warmed up once in the arbiter and
+    shared copy-on-write with forked workers. Connections opened while
+    warming up are closed before forking so no worker inherits them.
+    """
+
+    def __init__(self, options, warm_up=False):
+        self.options = options
+        self.warm_up = warm_up
+        super(Application, self).__init__()
+
+    def load_config(self):
+        """Apply command line options to gunicorn config"""
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Load the WSGI application"""
+        from app.wsgi import application
+        from .db import warm_up
+
+        if self.warm_up:
+            warm_up()
+            connections.close_all()
+        return application
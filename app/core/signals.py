@@ -0,0 +1,279 @@
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete, \
+    pre_delete, m2m_changed
+from django.core.signals import request_started, request_finished
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user
+from .db import check_connections
+from .events import get_broker
+from .models import User, Board, Task, Group, AssignedTask, Change, \
+    changes_recorded, deleted_board_ids
+from .scope import invalidate_group_scope, start_request, finish_request
+
+
+@receiver(request_started)
+def check_database_connections(sender, **kwargs):
+    """Drop broken persistent connections before handling a request"""
+    check_connections()
+
+
+@receiver(request_started)
+def start_request_scopes(sender, **kwargs):
+    """Cache group scopes for the duration of a request"""
+    start_request()
+
+
+@receiver(request_finished)
+def finish_request_scopes(sender, **kwargs):
+    """Forget group scopes of the finished request"""
+    finish_request()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """Drop cached credentials on deactivation or password change"""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_tokens(sender, instance, **kwargs):
+    """Drop cached credentials of deleted users"""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_rotated_token(sender, instance, **kwargs):
+    """Drop cached credentials of rotated tokens"""
+    invalidate_token(instance.key)
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_saved_group_scope(sender, instance, **kwargs):
+    """Drop group scopes of new and previous admin"""
+    invalidate_group_scope({
+        instance.admin_id, getattr(instance, '_loaded_admin_id', None)
+    })
+    instance._loaded_admin_id = instance.admin_id
+
+
+@receiver(pre_delete, sender=Group)
+def collect_deleted_group_scope(sender, instance, **kwargs):
+    """Remember members of a group before its memberships are deleted"""
+    instance._scope_user_ids = {
+        instance.admin_id,
+        *Group.users.through.objects.filter(
+            group_id=instance.pk
+        ).values_list('user_id', flat=True)
+    }
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_deleted_group_scope(sender, instance, **kwargs):
+    """Drop group scopes of admin and members of a deleted group"""
+    invalidate_group_scope(getattr(instance, '_scope_user_ids', set()))
+
+
+@receiver(m2m_changed, sender=Group.users.through)
+def invalidate_member_group_scope(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    """Drop group scopes of added & removed members"""
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_group_scope({instance.pk})
+    elif action == 'pre_clear':
+        instance._scope_user_ids = set(sender.objects.filter(
+            group_id=instance.pk
+        ).values_list('user_id', flat=True))
+    elif action == 'post_clear':
+        invalidate_group_scope(getattr(instance, '_scope_user_ids', set()))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_group_scope(pk_set)
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=AssignedTask)
+def record_saved_change(sender, instance, **kwargs):
+    """Log saved objects for delta sync, moved tasks first leave a tombstone"""
+    if sender is Task and instance.moved_from is not None:
+        Change.objects.record_moves([(instance, instance.moved_from)])
+    Change.objects.record([instance])
+
+
+@receiver(post_delete, sender=Board)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Group)
+def record_deleted_change(sender, instance, **kwargs):
+    """Log deleted objects as tombstones for delta sync
+
+    Assigned tasks deleted through cascades are implied by the tombstone of
+    their task or group, reconciliation logs its own deletes in bulk. Tasks
+    deleted with their board were logged before the cascade. Members of
+    deleted groups get their own tombstones.
+    """
+    if sender is Task and instance.board_id in deleted_board_ids.get():
+        return
+    if sender is Board:
+        deleted_board_ids.set(deleted_board_ids.get() - {instance.pk})
+    Change.objects.record([instance], deleted=True)
+    if sender is Group:
+        Change.objects.record_removals(
+            (instance.pk, user_id)
+            for user_id in getattr(instance, '_scope_user_ids', set())
+            if user_id != instance.admin_id
+        )
+
+
+@receiver(pre_delete, sender=Board)
+def record_cascaded_task_changes(sender, instance, **kwargs):
+    """Log tombstones of a deleted board's tasks in one insert"""
+    Change.objects.record(Task.objects.filter(board_id=instance.pk),
+                          deleted=True)
+    deleted_board_ids.set(deleted_board_ids.get() | {instance.pk})
+
+
+@receiver(pre_delete, sender=Board)
+def collect_deleted_board_counters(sender, instance, **kwargs):
+    """Remember groups counting tasks of a deleted board"""
+    instance._counted_group_ids = set(Task.objects.filter(
+        board_id=instance.pk, group_id__isnull=False
+    ).values_list('group_id', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Group)
+def record_ungrouped_task_tombstones(sender, instance, **kwargs):
+    """Log tombstones of a deleted group's tasks in the group's scope"""
+    tasks = list(Task.objects.filter(group_id=instance.pk))
+    Change.objects.record_moves(
+        (task, (task.board_id, instance.pk)) for task in tasks
+    )
+    instance._ungrouped_task_ids = [task.pk for task in tasks]
+
+
+@receiver(post_delete, sender=Group)
+def record_ungrouped_task_changes(sender, instance, **kwargs):
+    """Log tasks left without group once the deletion nulled it
+
+    Tasks are reloaded, as the deletion may have cascaded to their board.
+    """
+    task_ids = getattr(instance, '_ungrouped_task_ids', None)
+    if task_ids:
+        tasks = Task.objects.filter(id__in=task_ids)
+        tasks.update(updated_at=timezone.now())
+        Change.objects.record(tasks)
+
+
+@receiver(pre_delete, sender=Group)
+def collect_deleted_group_counters(sender, instance, **kwargs):
+    """Remember boards counting assigned tasks of a deleted group"""
+    instance._counted_board_ids = set(AssignedTask.objects.filter(
+        group_id=instance.pk
+    ).values_list('task__board_id', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=User)
+def collect_deleted_user_counters(sender, instance, **kwargs):
+    """Remember boards & groups counting assigned tasks of a deleted user"""
+    assignments = AssignedTask.objects.filter(user_id=instance.pk)
+    instance._counted_board_ids = set(assignments.values_list(
+        'task__board_id', flat=True
+    ).distinct())
+    instance._counted_group_ids = set(assignments.values_list(
+        'group_id', flat=True
+    ).distinct())
+
+
+@receiver(post_delete, sender=Board)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def recount_cascaded_counters(sender, instance, **kwargs):
+    """Recount boards & groups whose tasks were deleted by cascade"""
+    board_ids = getattr(instance, '_counted_board_ids', None)
+    if board_ids:
+        Board.objects.recount(board_ids)
+    group_ids = getattr(instance, '_counted_group_ids', None)
+    if group_ids:
+        Group.objects.recount(group_ids)
+
+
+@receiver(m2m_changed, sender=Group.users.through)
+def record_member_change(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Touch & log groups whose members changed for delta sync
+
+    Removed members other than the admin get a tombstone of the group.
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_group_ids = set(sender.objects.filter(
+            user_id=instance.pk
+        ).values_list('group_id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_group_ids', set())
+        groups = list(Group.objects.filter(id__in=pk_set))
+    else:
+        groups = [instance]
+    Group.objects.filter(
+        id__in=[group.pk for group in groups]
+    ).update(updated_at=timezone.now())
+    Change.objects.record(groups)
+
+    if action == 'post_add':
+        return
+    if reverse:
+        removed = [(group.pk, instance.pk) for group in groups
+                   if group.admin_id != instance.pk]
+    else:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_scope_user_ids', set())
+        removed = [(instance.pk, user_id) for user_id in pk_set
+                   if user_id != instance.admin_id]
+    Change.objects.record_removals(removed)
+
+
+@receiver(pre_save, sender=User)
+def collect_renamed_user(sender, instance, update_fields=None, **kwargs):
+    """Flag users whose nested name or email is about to change"""
+    instance._renamed = False
+    if instance._state.adding or (
+        update_fields is not None
+        and not {'name', 'email'} & set(update_fields)
+    ):
+        return
+    stored = User.objects.filter(pk=instance.pk).values('name', 'email')
+    instance._renamed = any(
+        (row['name'], row['email']) != (instance.name, instance.email)
+        for row in stored
+    )
+
+
+@receiver(post_save, sender=User)
+def record_renamed_user_groups(sender, instance, created, **kwargs):
+    """Touch & log groups rendering a renamed member or admin"""
+    if created or not getattr(instance, '_renamed', False):
+        return
+    groups = list(Group.objects.filter(
+        Q(users=instance) | Q(admin=instance)
+    ).distinct())
+    Group.objects.filter(
+        id__in=[group.pk for group in groups]
+    ).update(updated_at=timezone.now())
+    Change.objects.record(groups)
+
+
+@receiver(changes_recorded, sender=Change)
+def publish_recorded_changes(sender, changes, **kwargs):
+    """Publish changes to event stream subscribers once committed"""
+    transaction.on_commit(lambda: get_broker().publish(changes))
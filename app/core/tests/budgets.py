@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+# Path of the JSON file latency & throughput numbers are written to
+BASELINE_PATH = os.environ.get('QUERY_BUDGET_BASELINE')
+BASELINE_REPEAT = 20
+
+
+class QueryBudgetTestCase(TestCase):
+    """Route query budgets asserted on realistic data sizes
+
+    Seeds a user owning boards with thousands of tasks, a group of 500
+    members and assigned tasks fanned out to all of them, so queries issued
+    per row or per member blow the budgets. Set QUERY_BUDGET_BASELINE to a
+    path to record latency & throughput of every route there.
+    """
+    member_count = 500
+    task_count = 2000
+    assigned_task_count = 3
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        password = make_password('password')
+        cls.members = User.objects.bulk_create([
+            User(email=f'member{index}@twix.com', name=f'Member {index}',
+                 password=password)
+            for index in range(cls.member_count - 1)
+        ])
+        cls.group = Group.objects.create(name='Team', admin=cls.user)
+        cls.group.users.add(cls.user, *cls.members)
+        cls.board = Board.objects.create(name='Board', user=cls.user)
+        Task.objects.bulk_create([
+            Task(name=f'Task {index}', is_done=index % 2 == 0,
+                 board=cls.board, group=cls.group)
+            for index in range(cls.task_count)
+        ])
+        cls.assigned_tasks = [
+            Task.objects.create(name=f'Assigned {index}', is_done=False,
+                                board=cls.board, group=cls.group,
+                                is_assigned=True)
+            for index in range(cls.assigned_task_count)
+        ]
+        cls.task = cls.assigned_tasks[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        super(QueryBudgetTestCase, cls).tearDownClass()
+        if BASELINE_PATH and cls.results:
+            baseline = {}
+            if os.path.exists(BASELINE_PATH):
+                with open(BASELINE_PATH) as baseline_file:
+                    baseline = json.load(baseline_file)
+            baseline.update(cls.results)
+            with open(BASELINE_PATH, 'w') as baseline_file:
+                json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, url, data=None):
+        return getattr(self.client, method.lower())(url, data, format='json')
+
+    def assertBudget(self, method, url, budget, data=None, status=200):
+        """Assert a request stays within its query budget
+
+        Safe requests are repeated to record latency when a baseline path
+        is configured.
+        """
+        with self.assertNumQueries(budget):
+            start = time.perf_counter()
+            response = self.request(method, url, data)
+            duration = time.perf_counter() - start
+        self.assertEqual(response.status_code, status, response.content)
+
+        durations = [duration]
+        if BASELINE_PATH and method == 'GET':
+            for _ in range(BASELINE_REPEAT):
+                start = time.perf_counter()
+                self.request(method, url, data)
+                durations.append(time.perf_counter() - start)
+        mean = sum(durations) / len(durations)
+        self.results[f'{self.__class__.__name__}.{self._testMethodName}'] = {
+            'method': method,
+            'queries': budget,
+            'mean_ms': round(mean * 1000, 3),
+            'requests_per_second': round(1 / mean, 1),
+        }
+        return response
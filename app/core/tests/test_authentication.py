@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.authentication import CachedTokenAuthentication, local_cache
+from core.models import User
+from core.routers import use_replica
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        local_cache.clear()
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def test_cached_token_skips_database(self):
+        """Test a recently seen token is authenticated without queries"""
+        with self.assertNumQueries(1):
+            self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(token.key, self.token.key)
+
+    @override_settings(REPLICA_DATABASE='replica')
+    def test_credentials_are_read_from_primary(self):
+        """Test cache misses never read a possibly lagging replica"""
+        token = use_replica.set(True)
+        try:
+            with patch.object(connection, 'in_atomic_block', False):
+                user, _ = self.authentication.authenticate_credentials(
+                    self.token.key
+                )
+        finally:
+            use_replica.reset(token)
+
+        self.assertEqual(user, self.user)
+
+    def test_cached_user_is_not_shared(self):
+        """Test every authentication gets its own user instance"""
+        self.authentication.authenticate_credentials(self.token.key)
+        first, _ = self.authentication.authenticate_credentials(
+            self.token.key
+        )
+        first.name = 'Changed'
+        second, _ = self.authentication.authenticate_credentials(
+            self.token.key
+        )
+
+        self.assertEqual(second.name, 'User')
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user invalidates the cached token"""
+        self.authentication.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_rotated_token_is_rejected(self):
+        """Test deleting a token invalidates the cached token"""
+        self.authentication.authenticate_credentials(self.token.key)
+
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_password_change_invalidates_cache(self):
+        """Test changing password through the API drops the cached user"""
+        self.client.patch(
+            reverse('user:user-view'), {'password': 'new-password'},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+        with self.assertNumQueries(1):
+            user, _ = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+        self.assertTrue(user.check_password('new-password'))
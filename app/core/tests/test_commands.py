@@ -1,13 +1,14 @@
 import os
 import shutil
 
+from django.conf import settings
 from django.test import TestCase
 
 from django.core.management import call_command
 from django.db.utils import OperationalError
 
 from unittest import skip
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 
 class CommandTests(TestCase):
@@ -15,7 +16,7 @@ class CommandTests(TestCase):
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
+            gi.return_value = MagicMock()
             call_command('wait_for_db')
 
             self.assertEqual(gi.call_count, 1)
@@ -24,11 +25,59 @@ class CommandTests(TestCase):
     def test_wait_for_db(self, ts):
         """Test waiting for db"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
+            gi.side_effect = [OperationalError] * 5 + [MagicMock()]
             call_command('wait_for_db')
 
             self.assertEqual(gi.call_count, 6)
 
+    def test_wait_for_db_queries(self):
+        """Test waiting for db runs a query instead of trusting the handler"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            call_command('wait_for_db')
+
+            cursor = gi.return_value.cursor.return_value.__enter__
+            cursor.return_value.execute.assert_called_once_with('SELECT 1')
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test giving up exits with a distinct status"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi, \
+                patch('time.monotonic', side_effect=[0, 1, 2, 11]):
+            gi.side_effect = OperationalError
+            with self.assertRaises(SystemExit) as exit:
+                call_command('wait_for_db', '--timeout', '10')
+
+            self.assertEqual(exit.exception.code, 3)
+            self.assertEqual([call[0][0] for call in ts.call_args_list],
+                             [0.2, 0.4])
+
+    def test_wait_for_db_warm_up(self):
+        """Test warming up opens connections & fills caches"""
+        with patch('core.management.commands.wait_for_db.warm_up') as wu:
+            call_command('wait_for_db', '--warm-up')
+
+            wu.assert_called_once_with()
+
+    def test_serve(self):
+        """Test serving preloads a threaded gunicorn worker pool"""
+        directories = []
+        with self.settings(METRICS={}), \
+                patch('core.server.Application') as application:
+            application.return_value.run.side_effect = lambda: \
+                directories.append(settings.METRICS['MULTIPROCESS_DIR'])
+            call_command('serve', '--workers', '3', '--threads', '4',
+                         '--max-requests', '1000')
+            self.assertEqual(settings.METRICS, {})
+
+        options = application.call_args[0][0]
+        self.assertEqual(options['workers'], 3)
+        self.assertEqual(options['worker_class'], 'gthread')
+        self.assertEqual(options['max_requests_jitter'], 100)
+        self.assertTrue(options['preload_app'])
+        self.assertEqual(application.call_args[1], {'warm_up': True})
+        application.return_value.run.assert_called_once_with()
+        self.assertFalse(os.path.exists(directories[0]))
+
     @skip("Permission Errors on Travis")
     def test_template_startapp(self):
         """Test creating customized app"""
@@ -0,0 +1,178 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task, AssignedTask, Change
+
+TASK_BATCH_URL = reverse('twix:task-batch')
+
+
+class CounterTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user, self.member)
+
+    def create_task(self, board=None, **kwargs):
+        kwargs.setdefault('is_done', False)
+        return Task.objects.create(name='Task', board=board or self.board,
+                                   group=self.group, **kwargs)
+
+    def assertCounters(self, obj, task_count, done_count,
+                       assigned_open_count):
+        """Assert counters of a board or group, and that they are exact"""
+        obj.refresh_from_db()
+        self.assertEqual(
+            (obj.task_count, obj.done_count, obj.assigned_open_count),
+            (task_count, done_count, assigned_open_count)
+        )
+        type(obj).objects.recount([obj.pk])
+        obj.refresh_from_db()
+        self.assertEqual(
+            (obj.task_count, obj.done_count, obj.assigned_open_count),
+            (task_count, done_count, assigned_open_count)
+        )
+
+    def test_task_save_and_delete(self):
+        """Test counters follow created, completed & deleted tasks"""
+        task = self.create_task()
+        self.create_task(is_done=True)
+        self.assertCounters(self.board, 2, 1, 0)
+        self.assertCounters(self.group, 2, 1, 0)
+
+        task = Task.objects.get(id=task.id)
+        task.is_done = True
+        task.save()
+        self.assertCounters(self.board, 2, 2, 0)
+
+        task.delete()
+        self.assertCounters(self.board, 1, 1, 0)
+        self.assertCounters(self.group, 1, 1, 0)
+
+    def test_task_moves(self):
+        """Test counters follow tasks moved across boards & groups"""
+        other_board = Board.objects.create(name='Other', user=self.user)
+        other_group = Group.objects.create(name='Other', admin=self.user)
+        other_group.users.add(self.user)
+        task = Task.objects.get(id=self.create_task(is_assigned=True).id)
+
+        task.board = other_board
+        task.group = other_group
+        task.save()
+
+        self.assertCounters(self.board, 0, 0, 0)
+        self.assertCounters(self.group, 0, 0, 0)
+        self.assertCounters(other_board, 1, 0, 1)
+        self.assertCounters(other_group, 1, 0, 1)
+
+    def test_stale_saves_count_once(self):
+        """Test saves of stale copies count against the stored row"""
+        task = self.create_task(is_assigned=True)
+        first, second = Task.objects.get(id=task.id), \
+            Task.objects.get(id=task.id)
+        for copy in (first, second):
+            copy.is_done = True
+            copy.save()
+        self.assertCounters(self.board, 1, 1, 2)
+
+        assigned = AssignedTask.objects.get(task=task, user=self.member)
+        first, second = AssignedTask.objects.get(id=assigned.id), \
+            AssignedTask.objects.get(id=assigned.id)
+        for copy in (first, second):
+            copy.is_done = True
+            copy.save()
+        self.assertCounters(self.board, 1, 1, 1)
+
+        first, second = Task.objects.get(id=task.id), \
+            Task.objects.get(id=task.id)
+        first.delete()
+        second.delete()
+        self.assertCounters(self.board, 0, 0, 0)
+
+    def test_counter_changes_are_logged(self):
+        """Test boards & groups with new counters are logged for sync"""
+        last_id = Change.objects.order_by('-id').first().id
+
+        self.create_task()
+
+        self.assertEqual(
+            set(Change.objects.filter(id__gt=last_id).values_list(
+                'model', 'object_id'
+            )),
+            {('task', Task.objects.get().id),
+             ('board', self.board.id), ('group', self.group.id)}
+        )
+
+    def test_assigned_tasks(self):
+        """Test open assigned tasks follow assignment & completion"""
+        task = Task.objects.get(id=self.create_task(is_assigned=True).id)
+        self.assertCounters(self.board, 1, 0, 2)
+        self.assertCounters(self.group, 1, 0, 2)
+
+        assigned_task = AssignedTask.objects.get(task=task, user=self.member)
+        assigned_task.is_done = True
+        assigned_task.save()
+        self.assertCounters(self.board, 1, 0, 1)
+
+        task.is_assigned = False
+        task.save()
+        self.assertCounters(self.board, 1, 0, 0)
+        self.assertCounters(self.group, 1, 0, 0)
+
+    def test_batch(self):
+        """Test batch creates, updates & deletes maintain counters"""
+        tasks = [self.create_task(is_assigned=True) for _ in range(2)]
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(TASK_BATCH_URL, {
+            'create': [{'name': 'New', 'is_done': True,
+                        'board_id': str(self.board.id),
+                        'group_id': str(self.group.id)}],
+            'update': [{'id': str(tasks[0].id), 'is_done': True}],
+            'delete': [str(tasks[1].id)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.board, 2, 2, 2)
+        self.assertCounters(self.group, 2, 2, 2)
+
+    def test_cascades(self):
+        """Test deleting boards, groups & users recounts the survivors"""
+        other_board = Board.objects.create(name='Other', user=self.member)
+        self.create_task(is_assigned=True)
+        self.create_task(board=other_board, is_assigned=True)
+
+        self.board.delete()
+        self.assertCounters(self.group, 1, 0, 2)
+
+        self.member.delete()
+        self.assertCounters(self.group, 0, 0, 0)
+
+    def test_group_delete(self):
+        """Test deleting a group drops its open assigned tasks"""
+        self.create_task(is_assigned=True)
+
+        self.group.delete()
+
+        self.assertCounters(self.board, 1, 0, 0)
+
+    def test_recount_command(self):
+        """Test command repairs drifted counters"""
+        self.create_task(is_done=True, is_assigned=True)
+        Board.objects.update(task_count=10, done_count=-1)
+        Group.objects.update(assigned_open_count=0)
+
+        call_command('recount_tasks', '--batch-size', '1')
+
+        self.assertCounters(self.board, 1, 1, 2)
+        self.assertCounters(self.group, 1, 1, 2)
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from core.db import check_connections, warm_up
+from core.models import Board
+from core.routers import ReplicaRouter, use_replica
+from core.serializers import DynamicModelSerializer
+from twix.serializers import TaskSerializer
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_of_safe_requests_use_replica(self):
+        """Test reads are routed to the replica within read requests"""
+        token = use_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Board), 'replica')
+        finally:
+            use_replica.reset(token)
+
+        self.assertIsNone(self.router.db_for_read(Board))
+        self.assertIsNone(self.router.db_for_write(Board))
+
+    def test_transactions_read_primary(self):
+        """Test reads inside transactions stay on the primary"""
+        token = use_replica.set(True)
+        try:
+            with patch.object(connection, 'in_atomic_block', True):
+                self.assertIsNone(self.router.db_for_read(Board))
+        finally:
+            use_replica.reset(token)
+
+    def test_replica_is_not_migrated(self):
+        """Test migrations only run on the primary"""
+        self.assertFalse(self.router.allow_migrate('replica', 'twix'))
+        self.assertIsNone(self.router.allow_migrate('default', 'twix'))
+
+
+class HealthCheckTests(TestCase):
+
+    def test_broken_connections_are_closed(self):
+        """Test unusable idle connections are closed before reuse"""
+        connection.ensure_connection()
+        with patch.object(connection, 'in_atomic_block', False), \
+                patch.object(connection, 'is_usable', return_value=False), \
+                patch.object(connection, 'close') as close:
+            connection.health_checked_at = None
+            check_connections()
+            check_connections()
+
+        close.assert_called_once_with()
+
+    def test_connections_in_transaction_are_skipped(self):
+        """Test connections inside transactions are never pinged"""
+        with transaction.atomic(), \
+                patch.object(connection, 'is_usable') as is_usable:
+            connection.health_checked_at = None
+            check_connections()
+
+        is_usable.assert_not_called()
+
+
+class WarmUpTests(TestCase):
+
+    def test_warm_up_fills_caches(self):
+        """Test warming up builds serializer field trees"""
+        DynamicModelSerializer._field_trees.clear()
+
+        warm_up()
+
+        self.assertIn((TaskSerializer, (None, None)),
+                      DynamicModelSerializer._field_trees)
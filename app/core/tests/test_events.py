@@ -0,0 +1,253 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+
+from core import events
+from core.asgi import application, EVENTS_PATH
+from core.events import EventScope
+from core.models import User, Board, Group, Task, Change
+
+
+@override_settings(EVENT_STREAM={'BROKER': 'core.events.LocalBroker',
+                                 'KEEPALIVE': 0.05},
+                   CHANGE_COMMIT_GRACE=0)
+class EventStreamTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        events.broker = None
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.outsider = User.objects.create_user(
+            email='outsider@twix.com', password='password', name='Outsider'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, self.member)
+        self.board = Board.objects.create(name='Board', user=self.admin)
+
+    def tearDown(self):
+        events.broker = None
+
+    def stream(self, user, action=None, headers=()):
+        """Run the stream of a user around an action, return its messages"""
+        token = Token.objects.create(user=user)
+        messages = []
+        received = asyncio.Queue()
+
+        async def receive():
+            return await received.get()
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            scope = {
+                'type': 'http', 'method': 'GET', 'path': EVENTS_PATH,
+                'query_string': f'token={token.key}'.encode(),
+                'headers': list(headers),
+            }
+            app = asyncio.ensure_future(application(scope, receive, send))
+            while not messages:
+                await asyncio.sleep(0.01)
+            if action is not None:
+                await asyncio.get_event_loop().run_in_executor(None, action)
+            await asyncio.sleep(0.2)
+            await received.put({'type': 'http.disconnect'})
+            await app
+
+        asyncio.run(run())
+        return messages
+
+    def get_events(self, messages):
+        """Return data of change events among messages"""
+        return [
+            json.loads(line[len('data: '):])
+            for message in messages[1:]
+            for line in message['body'].decode().splitlines()
+            if line.startswith('data: ')
+        ]
+
+    def create_task(self):
+        return Task.objects.create(name='Task', is_done=False,
+                                   board=self.board, group=self.group)
+
+    def test_stream_requires_token(self):
+        """Test unauthenticated requests are refused"""
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(application({
+            'type': 'http', 'method': 'GET', 'path': EVENTS_PATH,
+            'query_string': b'', 'headers': [],
+        }, None, send))
+
+        self.assertEqual(messages[0]['status'], 401)
+
+    def test_stream_pushes_group_changes(self):
+        """Test members receive task changes of their groups"""
+        task = {}
+
+        def action():
+            task['id'] = str(self.create_task().id)
+
+        messages = self.stream(self.member, action)
+
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn({'model': 'task', 'id': task['id'], 'deleted': False},
+                      self.get_events(messages))
+
+    def test_stream_filters_by_scope(self):
+        """Test changes outside the group scope are not pushed"""
+        messages = self.stream(self.outsider, self.create_task)
+
+        self.assertEqual(self.get_events(messages), [])
+
+    def test_stream_follows_membership(self):
+        """Test users added to a group receive its changes"""
+        def action():
+            self.group.users.add(self.outsider)
+            # In memory sqlite fails reads racing writes on the same table
+            time.sleep(0.1)
+            self.create_task()
+
+        messages = self.stream(self.outsider, action)
+
+        self.assertEqual(
+            [event['model'] for event in self.get_events(messages)],
+            ['group', 'task', 'group']
+        )
+
+    def test_stream_replays_missed_changes(self):
+        """Test reconnecting with Last-Event-ID replays missed changes"""
+        last_id = Change.objects.order_by('-id').first().id
+        task = self.create_task()
+
+        messages = self.stream(self.member, headers=[
+            (b'last-event-id', str(last_id).encode())
+        ])
+
+        self.assertEqual(self.get_events(messages), [
+            {'model': 'task', 'id': str(task.id), 'deleted': False},
+            {'model': 'group', 'id': str(self.group.id), 'deleted': False},
+        ])
+
+
+class EventScopeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, self.member)
+        self.board = Board.objects.create(name='Board', user=self.admin)
+        Task.objects.create(name='Task', is_done=False, board=self.board,
+                            group=self.group, is_assigned=True)
+
+    def get_visible_changes(self, user):
+        scope = EventScope(user)
+        return [
+            change for change in Change.objects.all()
+            if scope.is_visible(change)
+        ]
+
+    def test_admin_scope(self):
+        """Test admins see their boards, groups & all assigned tasks"""
+        changes = self.get_visible_changes(self.admin)
+
+        self.assertEqual({change.model for change in changes},
+                         {'board', 'task', 'group', 'assignedtask'})
+        self.assertEqual(len([
+            change for change in changes if change.model == 'assignedtask'
+        ]), 2)
+
+    def test_member_scope(self):
+        """Test members only see their own assigned tasks"""
+        changes = self.get_visible_changes(self.member)
+
+        self.assertEqual({change.model for change in changes},
+                         {'task', 'group', 'assignedtask'})
+        self.assertEqual({
+            change.owner_id for change in changes
+            if change.model == 'assignedtask'
+        }, {self.member.id})
+
+    def test_reload_bypasses_cached_scope(self):
+        """Test reloading reads membership changed by other processes"""
+        outsider = User.objects.create_user(
+            email='outsider@twix.com', password='password', name='Outsider'
+        )
+        scope = EventScope(outsider)
+        with patch('core.scope.get_cache') as get_cache:
+            get_cache.return_value.get.return_value = scope.group_scope
+            self.group.users.add(outsider)
+
+            scope.reload()
+
+        self.assertIn(self.group.id, scope.group_scope.group_ids)
+
+    def test_filter_matches_is_visible(self):
+        """Test delta sync & event streams share one visibility rule"""
+        self.group.users.remove(self.member)
+        for user in (self.admin, self.member):
+            scope = EventScope(user)
+            self.assertEqual(
+                set(Change.objects.filter(scope.get_filter())),
+                set(self.get_visible_changes(user))
+            )
+
+
+class ChangeLogBrokerTests(TestCase):
+
+    def test_poll_delivers_new_changes(self):
+        """Test polling hands over changes appended since the last poll"""
+        broker = events.ChangeLogBroker()
+        delivered = []
+        broker.deliver = delivered.extend
+        broker.poll()
+
+        admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        board = Board.objects.create(name='Board', user=admin)
+
+        self.assertEqual(broker.poll(), Change.objects.count())
+        self.assertEqual(delivered[-1].object_id, board.id)
+        self.assertEqual(broker.poll(), 0)
+
+    def test_poll_delivers_late_commits_once(self):
+        """Test changes committed after a higher id are delivered once"""
+        broker = events.ChangeLogBroker()
+        delivered = []
+        broker.deliver = delivered.extend
+        broker.poll()
+        admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        board = Board.objects.create(name='Board', user=admin)
+        late = Change.objects.get(object_id=board.id)
+        late.delete()
+        Board.objects.create(name='Other', user=admin)
+        broker.poll()
+
+        late.save(force_insert=True)
+
+        self.assertEqual(broker.poll(), 1)
+        self.assertEqual(delivered[-1].id, late.id)
+        self.assertEqual(broker.poll(), 0)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from core.loadtest import LoadTest, parse_mix, percentile
+from core.models import User, AssignedTask, Group
+
+
+class LoadTestHelperTests(SimpleTestCase):
+
+    def test_percentile(self):
+        """Test nearest rank percentiles"""
+        durations = list(range(1, 101))
+
+        self.assertEqual(percentile(durations, 0.5), 50)
+        self.assertEqual(percentile(durations, 0.95), 95)
+        self.assertEqual(percentile(durations, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0)
+
+    def test_parse_mix(self):
+        """Test scenario weights are parsed and validated"""
+        self.assertEqual(parse_mix('list_tasks=3,login'),
+                         {'list_tasks': 3, 'login': 1})
+        with self.assertRaises(ValueError):
+            parse_mix('unknown=1')
+
+
+class LoadTestTests(LiveServerTestCase):
+
+    def test_seed_and_replay(self):
+        """Test seeding through the API and reporting every route"""
+        load_test = LoadTest(self.live_server_url, users=3, spare_users=2,
+                             tasks=5, assigned_tasks=2)
+        load_test.seed()
+
+        group = Group.objects.get(id=load_test.group_id)
+        self.assertEqual(group.users.count(), 3)
+        self.assertEqual(AssignedTask.objects.filter(
+            group=group, is_done=False
+        ).count(), 6)
+
+        report = load_test.run(workers=1, duration=30, requests=40)
+
+        self.assertLessEqual(
+            set(report),
+            {'login', 'list_tasks', 'list_assigned_tasks',
+             'toggle_assigned_task', 'add_group_member'}
+        )
+        for stats in report.values():
+            self.assertEqual(stats['errors'], 0, report)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+        load_test.cleanup()
+        self.assertFalse(User.objects.exists())
+
+    def test_toggle_assigned_task(self):
+        """Test the toggle scenario flips one own assigned task"""
+        load_test = LoadTest(self.live_server_url, users=2, spare_users=0,
+                             tasks=1, assigned_tasks=2,
+                             mix={'toggle_assigned_task': 1})
+        load_test.seed()
+        user = load_test.users[0]
+        self.assertFalse(AssignedTask.objects.filter(
+            user=user, is_done=True
+        ).exists())
+
+        report = load_test.run(workers=1, duration=30, requests=1)
+
+        self.assertEqual(
+            set(report),
+            {'login', 'list_assigned_tasks', 'toggle_assigned_task'}
+        )
+        for stats in report.values():
+            self.assertEqual(stats['errors'], 0, report)
+        self.assertEqual(AssignedTask.objects.filter(
+            user=user, is_done=True
+        ).count(), 1)
+
+        load_test.cleanup()
+
+    def test_loadtest_command(self):
+        """Test command prints the report and removes seeded data"""
+        out = StringIO()
+
+        call_command('loadtest', '--url', self.live_server_url,
+                     '--workers', '1', '--requests', '5', '--users', '2',
+                     '--tasks', '2', '--mix', 'list_tasks', stdout=out)
+
+        self.assertIn('list_tasks', out.getvalue())
+        self.assertFalse(User.objects.exists())
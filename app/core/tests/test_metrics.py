@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+METRICS_URL = reverse('metrics')
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        board = Board.objects.create(name='Board', user=self.user)
+        group = Group.objects.create(name='Team', admin=self.user)
+        Task.objects.create(name='Task', is_done=False, board=board,
+                            group=group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_series(self, histogram, **labels):
+        key = tuple(str(labels[label]) for label in histogram.labels)
+        return histogram.series[key]
+
+    def test_request_is_recorded_per_route(self):
+        """Test latency, queries, serializer time & size are recorded"""
+        response = self.client.get(TASK_VIEW_URL)
+
+        labels = {'method': 'GET', 'route': 'twix:task-view'}
+        self.assertEqual(self.get_series(metrics.request_duration,
+                                         status=200, **labels)[2], 1)
+        self.assertEqual(
+            self.get_series(metrics.request_queries, **labels)[1], 3
+        )
+        self.assertGreater(
+            self.get_series(metrics.request_serializer_duration,
+                            **labels)[1], 0
+        )
+        self.assertEqual(
+            self.get_series(metrics.response_size, **labels)[1],
+            len(response.content)
+        )
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint(self):
+        """Test metrics are exposed in Prometheus text format"""
+        self.client.get(TASK_VIEW_URL)
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram',
+                      content)
+        self.assertIn(
+            'http_request_db_queries_bucket{method="GET",'
+            'route="twix:task-view",le="5"} 1', content
+        )
+        self.assertIn(
+            'http_request_db_queries_count{method="GET",'
+            'route="twix:task-view"} 1', content
+        )
+
+    def test_metrics_are_merged_across_workers(self):
+        """Test scrapes merge series of every worker sharing a directory"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counts = [0] * len(metrics.COUNT_BUCKETS)
+        counts[2:] = [1] * (len(counts) - 2)
+        with open(os.path.join(directory, '1-0.json'), 'w') as file:
+            json.dump({metrics.request_queries.name: [
+                [['GET', 'twix:task-view'], counts, 3, 1]
+            ]}, file)
+
+        with self.settings(DEBUG=True, METRICS={'MULTIPROCESS_DIR': directory,
+                                                'FLUSH_SECONDS': 60}):
+            self.client.get(TASK_VIEW_URL)
+            content = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn(
+            'http_request_db_queries_count{method="GET",'
+            'route="twix:task-view"} 2', content
+        )
+        self.assertIn(
+            'http_request_db_queries_sum{method="GET",'
+            'route="twix:task-view"} 6', content
+        )
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+    @override_settings(METRICS={'TOKEN': 'secret'})
+    def test_metrics_token(self):
+        """Test metrics require the configured token"""
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+        response = self.client.get(METRICS_URL,
+                                   HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_need_token_outside_debug(self):
+        """Test metrics are not exposed without a token in production"""
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+    @override_settings(METRICS={'SLOW_REQUEST_SECONDS': 0})
+    def test_slow_requests_are_logged(self):
+        """Test slow requests are logged with their statements"""
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.client.get(TASK_VIEW_URL)
+
+        self.assertIn('with 3 queries', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
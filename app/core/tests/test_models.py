@@ -1,3 +1,83 @@
-# from .. import models
+from django.test import TestCase
 
-# Model tests file placeholder
+from core.models import User, Board, Group, Task, AssignedTask, \
+    Notification
+
+
+class TaskAssignmentTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.members = [
+            User.objects.create_user(
+                email=f'member{index}@twix.com', password='password',
+                name=f'Member {index}'
+            )
+            for index in range(5)
+        ]
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, *self.members)
+        self.board = Board.objects.create(name='Board', user=self.admin)
+
+    def create_task(self, **kwargs):
+        kwargs.setdefault('is_assigned', True)
+        return Task.objects.create(
+            name='Task', is_done=False, board=self.board, group=self.group,
+            **kwargs
+        )
+
+    def test_assigning_task_creates_assigned_tasks(self):
+        """Test assigning a task fans out to every group member"""
+        task = self.create_task()
+
+        self.assertEqual(
+            set(task.assigned_tasks.values_list('user', flat=True)),
+            {self.admin.id, *(member.id for member in self.members)}
+        )
+        self.assertEqual(Notification.objects.count(), 6)
+
+    def test_unassigning_task_removes_assigned_tasks(self):
+        """Test unassigning a task deletes its assigned tasks"""
+        task = self.create_task()
+        task = Task.objects.get(id=task.id)
+
+        task.is_assigned = False
+        task.save()
+
+        self.assertFalse(AssignedTask.objects.filter(task=task).exists())
+
+    def test_changing_group_moves_assigned_tasks(self):
+        """Test changing group reassigns to the new group members"""
+        task = self.create_task()
+        other_group = Group.objects.create(name='Other', admin=self.admin)
+        other_group.users.add(self.members[0])
+
+        task.group = other_group
+        task.save()
+
+        self.assertEqual(
+            list(task.assigned_tasks.values_list('user', 'group')),
+            [(self.members[0].id, other_group.id)]
+        )
+
+    def test_save_without_assignment_change_skips_fan_out(self):
+        """Test saving unrelated fields does not touch assigned tasks"""
+        task = self.create_task()
+        task = Task.objects.get(id=task.id)
+
+        task.name = 'Renamed'
+        with self.assertNumQueries(5):
+            task.save()
+
+    def test_fan_out_query_count_is_constant(self):
+        """Test fan-out does not issue queries per group member"""
+        task = self.create_task(is_assigned=False)
+        task = Task.objects.get(id=task.id)
+
+        task.is_assigned = True
+        with self.assertNumQueries(16):
+            task.save()
+
+        self.assertEqual(task.assigned_tasks.count(), 6)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import User, Board, Group, Task, Notification
+from core.notifications import LocalSender, dispatch
+
+
+@override_settings(NOTIFICATION_SENDER='core.notifications.LocalSender',
+                   NOTIFICATION_MAX_ATTEMPTS=2,
+                   NOTIFICATION_RETRY_DELAY=10)
+class NotificationTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, self.member)
+        self.board = Board.objects.create(name='Board', user=self.admin)
+        LocalSender.outbox = []
+        LocalSender.error = None
+
+    def create_assigned_task(self):
+        return Task.objects.create(
+            name='Task', is_done=False, board=self.board, group=self.group,
+            is_assigned=True
+        )
+
+    def test_assigning_task_enqueues_notifications(self):
+        """Test assigning a task writes outbox rows instead of sending"""
+        self.create_assigned_task()
+
+        notifications = Notification.objects.all()
+        self.assertEqual(notifications.count(), 2)
+        self.assertEqual(
+            set(notifications.values_list('user', flat=True)),
+            {self.admin.id, self.member.id}
+        )
+        self.assertTrue(all(
+            notification.status == Notification.PENDING
+            for notification in notifications
+        ))
+        self.assertEqual(LocalSender.outbox, [])
+
+    def test_dispatch_marks_sent(self):
+        """Test dispatching delivers and records status"""
+        self.create_assigned_task()
+
+        self.assertEqual(dispatch(batch_size=10), 2)
+
+        self.assertEqual(len(LocalSender.outbox), 2)
+        self.assertFalse(Notification.objects.exclude(
+            status=Notification.SENT
+        ).exists())
+        self.assertEqual(dispatch(batch_size=10), 0)
+
+    def test_dispatch_retries_with_backoff(self):
+        """Test failed deliveries are retried and finally marked failed"""
+        self.create_assigned_task()
+        LocalSender.error = 'Unavailable'
+
+        dispatch(batch_size=10)
+
+        notification = Notification.objects.first()
+        self.assertEqual(notification.status, Notification.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.last_error, 'Unavailable')
+        self.assertGreater(notification.next_attempt_at,
+                           timezone.now() + timedelta(seconds=5))
+        self.assertEqual(dispatch(batch_size=10), 0)
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        dispatch(batch_size=10)
+
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.FAILED).count(), 2
+        )
+
+    def test_send_notifications_command(self):
+        """Test command drains the outbox"""
+        self.create_assigned_task()
+
+        call_command('send_notifications', '--once')
+
+        self.assertEqual(len(LocalSender.outbox), 2)
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.SENT).count(), 2
+        )
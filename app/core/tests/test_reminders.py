@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import User, Board, Group, Task, Notification
+from core.reminders import fire_reminders
+
+
+@override_settings(REMINDER_MAX_DELAY=3600)
+class ReminderTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@twix.com', password='password', name='Owner'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.owner)
+        self.group.users.add(self.owner, self.member)
+        self.board = Board.objects.create(name='Board', user=self.owner)
+
+    def create_task(self, minutes, **kwargs):
+        return Task.objects.create(
+            name='Task', is_done=False, board=self.board,
+            remind_me=timezone.now() + timedelta(minutes=minutes), **kwargs
+        )
+
+    def get_reminders(self):
+        return Notification.objects.filter(body='Reminder: Task')
+
+    def test_fire_due_reminders(self):
+        """Test due reminders notify the board owner once"""
+        due = self.create_task(-1)
+        self.create_task(10)
+
+        self.assertEqual(fire_reminders(), 1)
+        self.assertEqual(fire_reminders(), 0)
+
+        self.assertEqual(
+            list(self.get_reminders().values_list('user', flat=True)),
+            [self.owner.id]
+        )
+        due.refresh_from_db()
+        self.assertIsNotNone(due.reminder_sent_at)
+
+    def test_assigned_reminders_notify_members(self):
+        """Test reminders of assigned tasks reach every assignee"""
+        self.create_task(-1, group=self.group, is_assigned=True)
+
+        fire_reminders()
+
+        self.assertEqual(
+            set(self.get_reminders().values_list('user', flat=True)),
+            {self.owner.id, self.member.id}
+        )
+
+    def test_stale_reminders_are_skipped(self):
+        """Test reminders overdue past the max delay are not sent"""
+        task = self.create_task(-120)
+
+        self.assertEqual(fire_reminders(), 1)
+
+        self.assertFalse(self.get_reminders().exists())
+        task.refresh_from_db()
+        self.assertIsNotNone(task.reminder_sent_at)
+
+    def test_rescheduling_rearms_reminder(self):
+        """Test changing remind_me fires the reminder again"""
+        task = self.create_task(-1)
+        fire_reminders()
+        task = Task.objects.get(id=task.id)
+
+        task.remind_me = timezone.now()
+        task.save()
+        fire_reminders()
+
+        self.assertEqual(self.get_reminders().count(), 2)
+
+    def test_batches_query_count(self):
+        """Test a batch uses a fixed number of queries"""
+        for _ in range(5):
+            self.create_task(-1, group=self.group, is_assigned=True)
+
+        with self.assertNumQueries(6):
+            self.assertEqual(fire_reminders(batch_size=10), 5)
+
+    def test_send_reminders_command(self):
+        """Test command fires every due reminder"""
+        for _ in range(3):
+            self.create_task(-1)
+
+        call_command('send_reminders', '--once', '--batch-size', '2')
+
+        self.assertEqual(self.get_reminders().count(), 3)
@@ -0,0 +1,135 @@
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Group
+from core.routers import use_replica
+from core.scope import get_group_scope, start_request, finish_request
+
+GROUP_VIEW_URL = reverse('twix:group-view')
+
+
+class GroupScopeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, self.member)
+
+    def test_scope_is_cached_per_request(self):
+        """Test group scope is only queried once per request"""
+        start_request()
+        try:
+            with self.assertNumQueries(2):
+                scope = get_group_scope(self.member)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_group_scope(self.member), scope)
+            self.group.users.remove(self.member)
+            self.assertNotIn(self.group.id,
+                             get_group_scope(self.member).group_ids)
+        finally:
+            finish_request()
+
+        self.assertIn(self.group.id, scope.member_ids)
+        self.assertNotIn(self.group.id, scope.admin_ids)
+        with self.assertNumQueries(2):
+            get_group_scope(self.member)
+
+    @override_settings(GROUP_SCOPE_CACHE={'BACKEND': 'default'})
+    def test_per_process_cache_is_refused(self):
+        """Test scopes are not cached where invalidations cannot reach"""
+        with self.assertRaises(ImproperlyConfigured):
+            get_group_scope(self.member)
+
+    def test_shared_cache_keeps_scope_across_requests(self):
+        """Test a shared backend caches scopes until invalidated"""
+        with tempfile.TemporaryDirectory() as location, override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            }, 'shared': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }},
+            GROUP_SCOPE_CACHE={'BACKEND': 'shared'}
+        ):
+            get_group_scope(self.member)
+            with self.assertNumQueries(0):
+                get_group_scope(self.member)
+
+            self.group.users.remove(self.member)
+
+            self.assertNotIn(self.group.id,
+                             get_group_scope(self.member).group_ids)
+
+    @override_settings(REPLICA_DATABASE='replica')
+    def test_scope_is_read_from_primary(self):
+        """Test cache misses never read a possibly lagging replica"""
+        token = use_replica.set(True)
+        try:
+            with patch.object(connection, 'in_atomic_block', False):
+                scope = get_group_scope(self.member)
+        finally:
+            use_replica.reset(token)
+
+        self.assertIn(self.group.id, scope.member_ids)
+
+    def test_member_changes_invalidate_scope(self):
+        """Test adding, removing and clearing members drop the scope"""
+        get_group_scope(self.member)
+
+        self.group.users.remove(self.member)
+        self.assertNotIn(self.group.id, get_group_scope(self.member).group_ids)
+
+        self.member.twix_groups.add(self.group)
+        self.assertIn(self.group.id, get_group_scope(self.member).group_ids)
+
+        self.group.users.clear()
+        self.assertNotIn(self.group.id, get_group_scope(self.member).group_ids)
+
+    def test_admin_change_invalidates_scope(self):
+        """Test changing admin drops scopes of old and new admin"""
+        self.group.users.clear()
+        get_group_scope(self.admin)
+        get_group_scope(self.member)
+
+        group = Group.objects.get(id=self.group.id)
+        group.admin = self.member
+        group.save()
+
+        self.assertEqual(get_group_scope(self.admin).group_ids,
+                         {self.admin.twix_groups.get().id})
+        self.assertIn(self.group.id, get_group_scope(self.member).admin_ids)
+
+    def test_group_delete_invalidates_scope(self):
+        """Test deleting a group drops scopes of its members"""
+        get_group_scope(self.member)
+
+        self.group.delete()
+
+        self.assertEqual(get_group_scope(self.member).group_ids,
+                         {self.member.twix_groups.get().id})
+
+    def test_view_group_has_no_duplicates(self):
+        """Test groups administered and joined are listed once"""
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get(GROUP_VIEW_URL)
+
+        ids = [group['id'] for group in response.data['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertIn(str(self.group.id), ids)
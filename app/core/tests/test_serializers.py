@@ -0,0 +1,117 @@
+from django.test import TestCase
+
+from rest_framework import serializers
+
+from core.models import User, Board, Group, Task
+from core.serializers import DynamicModelSerializer, Normalizer
+from twix.serializers import TaskSerializer
+from user.serializers import UserSerializer
+
+
+class PlainTaskSerializer(serializers.ModelSerializer):
+    """Task serializer rendered by rest framework itself"""
+
+    class Meta:
+        model = Task
+        fields = ('id', 'name', 'is_done', 'board', 'group', 'due_date')
+
+
+class CompiledTaskSerializer(DynamicModelSerializer):
+    """Same task serializer rendered through the compiled plan"""
+
+    class Meta(PlainTaskSerializer.Meta):
+        pass
+
+
+class DynamicModelSerializerTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.task = Task.objects.create(name='Task', is_done=False,
+                                        board=self.board, group=self.group)
+
+    def test_field_tree_is_cached(self):
+        """Test fields are built once per selection and copied after"""
+        key = (TaskSerializer, (None, ('group', )))
+        TaskSerializer._field_trees.pop(key, None)
+
+        first = TaskSerializer(exclude=['group']).fields
+        cached = TaskSerializer._field_trees[key]
+        second = TaskSerializer(exclude=['group']).fields
+
+        self.assertNotIn('group', first)
+        self.assertEqual(list(first), list(second))
+        self.assertIsNot(first['name'], second['name'])
+        self.assertIsNot(first['name'], cached['name'])
+        self.assertIs(second['name'].parent.__class__, TaskSerializer)
+
+    def test_validators_are_not_shared(self):
+        """Test copies of writable fields own their validators"""
+        first = UserSerializer().fields['email']
+        second = UserSerializer().fields['email']
+
+        self.assertTrue(first.validators)
+        for validator, other in zip(first.validators, second.validators):
+            self.assertIsNot(validator, other)
+
+    def test_selections_are_cached_separately(self):
+        """Test field selections do not leak into each other"""
+        self.assertEqual(list(TaskSerializer(fields=['id', 'name']).fields),
+                         ['id', 'name'])
+        self.assertIn('group', TaskSerializer().fields)
+
+    def test_representation_matches_rest_framework(self):
+        """Test the compiled plan renders like rest framework"""
+        self.task.group = None
+        self.task.save()
+
+        self.assertEqual(CompiledTaskSerializer(self.task).data,
+                         PlainTaskSerializer(self.task).data)
+
+    def test_related_fields_skip_loading(self):
+        """Test primary key fields still render without a query"""
+        task = Task.objects.get(id=self.task.id)
+
+        with self.assertNumQueries(0):
+            data = CompiledTaskSerializer(task).data
+
+        self.assertEqual(data['board'], self.board.id)
+
+
+class NormalizerTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user)
+        self.tasks = [
+            Task.objects.create(name=f'Task {index}', is_done=False,
+                                board=self.board, group=self.group)
+            for index in range(3)
+        ]
+
+    def test_nested_objects_are_included_once(self):
+        """Test rows refer to nested objects rendered once by key"""
+        normalizer = Normalizer()
+        serializer = TaskSerializer(self.tasks, many=True,
+                                    context={'normalizer': normalizer})
+
+        rows = serializer.data
+
+        self.assertEqual({row['board'] for row in rows}, {str(self.board.id)})
+        self.assertEqual({row['group'] for row in rows}, {str(self.group.id)})
+        self.assertEqual(set(normalizer.included),
+                         {'boards', 'groups', 'users'})
+        group = normalizer.included['groups'][str(self.group.id)]
+        self.assertEqual(group['admin'], str(self.user.id))
+        self.assertEqual(group['users'], [str(self.user.id)])
+        self.assertEqual(
+            normalizer.included['users'][str(self.user.id)]['name'], 'User'
+        )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from . import metrics
+
+
+def metrics_view(request):
+    """Expose request metrics in Prometheus text format
+
+    Requires `Authorization: Bearer <METRICS['TOKEN']>`, without a token
+    metrics are only exposed in DEBUG.
+    """
+    token = metrics.get_setting('TOKEN', None)
+    if token is None and not settings.DEBUG:
+        return HttpResponseForbidden()
+    if token is not None and not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(),
+                        content_type='text/plain; version=0.0.4')
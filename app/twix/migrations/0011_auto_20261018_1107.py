@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+def apply_migration(apps, migration):
+    """Remove duplicate assigned tasks before adding constraint"""
+    AssignedTask = apps.get_model('twix', 'AssignedTask')
+    seen = set()
+    duplicates = []
+    for assigned_task_id, task_id, user_id in AssignedTask.objects.order_by(
+        'task_id', 'user_id'
+    ).values_list('id', 'task_id', 'user_id'):
+        if (task_id, user_id) in seen:
+            duplicates.append(assigned_task_id)
+        seen.add((task_id, user_id))
+    AssignedTask.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0010_auto_20261018_1106'),
+    ]
+
+    operations = [
+        migrations.RunPython(apply_migration, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assignedtask',
+            constraint=models.UniqueConstraint(fields=('task', 'user'), name='unique_assigned_task'),
+        ),
+    ]
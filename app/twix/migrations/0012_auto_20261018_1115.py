@@ -0,0 +1,56 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+SCOPE_FIELDS = {
+    'board': {'owner_id': 'user_id', 'board_id': 'id'},
+    'task': {'board_id': 'board_id', 'group_id': 'group_id'},
+    'group': {'owner_id': 'admin_id', 'group_id': 'id'},
+    'assignedtask': {'owner_id': 'user_id', 'group_id': 'group_id'},
+}
+
+
+def apply_migration(apps, migration):
+    """Record existing objects as changes so first sync returns them"""
+    Change = apps.get_model('twix', 'Change')
+    for model_name, fields in SCOPE_FIELDS.items():
+        model = apps.get_model('twix', model_name)
+        Change.objects.bulk_create([
+            Change(model=model_name, object_id=values['id'], **{
+                field: values[attr] for field, attr in fields.items()
+            })
+            for values in model.objects.values(
+                'id', *set(fields.values()) - {'id'}
+            )
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0011_auto_20261018_1107'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('board', 'Board'), ('task', 'Task'), ('group', 'Group'), ('assignedtask', 'Assigned Task')], max_length=12)),
+                ('object_id', models.UUIDField()),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('owner_id', models.UUIDField(blank=True, null=True)),
+                ('board_id', models.UUIDField(blank=True, null=True)),
+                ('group_id', models.UUIDField(blank=True, null=True)),
+            ],
+            options={
+                'default_related_name': 'changes',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['model', 'object_id'], name='change_object_idx'),
+        ),
+        migrations.RunPython(apply_migration, migrations.RunPython.noop),
+    ]
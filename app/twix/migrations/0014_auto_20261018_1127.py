@@ -0,0 +1,25 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0013_auto_20261018_1120'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'is_done', 'due_date'], name='task_board_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'remind_me'], name='task_board_remind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['group', 'is_done'], name='task_group_done_idx'),
+        ),
+    ]
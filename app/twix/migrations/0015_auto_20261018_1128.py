@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0014_auto_20261018_1127'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('remind_me__isnull', False), ('reminder_sent_at__isnull', True)), fields=['remind_me'], name='task_reminder_due_idx'),
+        ),
+    ]
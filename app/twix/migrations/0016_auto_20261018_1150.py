@@ -0,0 +1,72 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, lookup):
+    return Coalesce(Subquery(queryset.filter(**{
+        lookup: OuterRef('pk')
+    }).order_by().values(lookup).annotate(
+        count=Count('pk')
+    ).values('count')), 0)
+
+
+def apply_migration(apps, migration):
+    """Count tasks & open assigned tasks of existing boards and groups"""
+    Task = apps.get_model('twix', 'Task')
+    AssignedTask = apps.get_model('twix', 'AssignedTask')
+    open_assigned_tasks = AssignedTask.objects.filter(is_done=False)
+    for model, task_lookup, assignment_lookup in (
+        (apps.get_model('twix', 'Board'), 'board', 'task__board'),
+        (apps.get_model('twix', 'Group'), 'group', 'group'),
+    ):
+        model.objects.update(
+            task_count=count_of(Task.objects.all(), task_lookup),
+            done_count=count_of(Task.objects.filter(is_done=True),
+                                task_lookup),
+            assigned_open_count=count_of(open_assigned_tasks,
+                                         assignment_lookup)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0015_auto_20261018_1128'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='assigned_open_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='done_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='assigned_open_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='done_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(apply_migration, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.28 on 2026-10-18 12:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twix', '0016_auto_20261018_1150'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='change',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
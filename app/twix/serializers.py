@@ -1,7 +1,15 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
 from rest_framework import serializers
 
-from core.models import Board, Task, Group, User, AssignedTask
-from core.serializers import DynamicModelSerializer
+from core.models import Board, Task, Group, User, AssignedTask, \
+    Notification, Change, CounterDeltas, COUNTER_FIELDS
+from core.serializers import DynamicModelSerializer, \
+    PreloadedPrimaryKeyRelatedField
 from user.serializers import UserSerializer
 
 
@@ -10,23 +18,85 @@ class BoardSerializer(DynamicModelSerializer):
 
     class Meta:
         model = Board
-        fields = ('id', 'name', 'is_personal', 'user')
-        read_only_fields = ()
+        fields = ('id', 'name', 'is_personal', 'user') + COUNTER_FIELDS
+        read_only_fields = COUNTER_FIELDS
+
+
+class GroupSerializer(DynamicModelSerializer):
+    """Serializer for Group model"""
+
+    admin = UserSerializer(read_only=True)
+    admin_id = serializers.PrimaryKeyRelatedField(write_only=True,
+                                                  queryset=User.objects.all())
+    users = UserSerializer(many=True, required=False)
+
+    class Meta:
+        model = Group
+        fields = ('id', 'name', 'admin', 'users', 'admin_id') + COUNTER_FIELDS
+        read_only_fields = COUNTER_FIELDS
+
+    def create(self, validated_data):
+        """Override to link admin"""
+        admin_id = validated_data.pop('admin_id', None)
+        users = validated_data.pop('users', None)
+        group = Group.objects.create(
+            admin=admin_id, **validated_data
+        )
+        if users is not None:
+            group.users.set(users)
+        group.save()
+        return group
+
+
+class GroupMemberIdsSerializer(GroupSerializer):
+    """Serializer for Group model rendering member ids & count"""
+
+    users = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    member_count = serializers.SerializerMethodField()
+
+    class Meta(GroupSerializer.Meta):
+        fields = GroupSerializer.Meta.fields + ('member_count',)
+
+    def get_member_count(self, group):
+        """Count prefetched members"""
+        return len(group.users.all())
+
+
+class GroupWithoutMembersSerializer(GroupSerializer):
+    """Serializer for Group model leaving members to be side-loaded"""
+
+    users = None
+
+    class Meta(GroupSerializer.Meta):
+        fields = tuple(
+            field for field in GroupSerializer.Meta.fields if field != 'users'
+        )
+
+
+def get_included_members(group_ids):
+    """Return member ids of groups and those members, keyed by id"""
+    members = {str(pk): [] for pk in group_ids}
+    users = {}
+    memberships = Group.users.through.objects.filter(
+        group_id__in=group_ids
+    ).select_related('user').order_by('pk')
+    for membership in memberships:
+        user_id = str(membership.user_id)
+        members[str(membership.group_id)].append(user_id)
+        if user_id not in users:
+            users[user_id] = UserSerializer(membership.user).data
+    return {'members': members, 'users': users}
 
 
 class TaskSerializer(DynamicModelSerializer):
     """Serializer for Task model"""
 
-    board = BoardSerializer(read_only=True)
-    board_id = serializers.PrimaryKeyRelatedField(write_only=True,
-                                                  queryset=Board.objects.all())
-    group = serializers.SerializerMethodField('get_group')
-    group_id = serializers.PrimaryKeyRelatedField(write_only=True,
-                                                  queryset=Group.objects.all())
-
-    def get_group(self, obj):
-        """Return associated group"""
-        return GroupSerializer(obj.group, read_only=True).data
+    board = BoardSerializer(read_only=True, exclude=COUNTER_FIELDS)
+    board_id = PreloadedPrimaryKeyRelatedField(write_only=True,
+                                               queryset=Board.objects.all())
+    group = GroupSerializer(read_only=True, exclude=COUNTER_FIELDS)
+    group_id = PreloadedPrimaryKeyRelatedField(write_only=True,
+                                               queryset=Group.objects.all())
 
     class Meta:
         model = Task
@@ -63,16 +133,244 @@ class TaskSerializer(DynamicModelSerializer):
         return instance
 
 
-class AssignedTaskSerializer(serializers.ModelSerializer):
+class TaskGroupMemberIdsSerializer(TaskSerializer):
+    """Serializer for Task model rendering member ids of its group"""
+
+    group = GroupMemberIdsSerializer(read_only=True, exclude=COUNTER_FIELDS)
+
+
+class TaskGroupWithoutMembersSerializer(TaskSerializer):
+    """Serializer for Task model leaving members of its group out"""
+
+    group = GroupWithoutMembersSerializer(read_only=True,
+                                          exclude=COUNTER_FIELDS)
+
+
+def parse_pk(model, value):
+    """Return value as primary key of model or None if invalid"""
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError):
+        return None
+
+
+class TaskBatchSerializer(serializers.Serializer):
+    """Serializer for creating, updating & deleting tasks in one request
+
+    Expects the scoped task queryset as `queryset` in context, tasks are
+    only created on or moved to boards of the requesting user.
+    """
+    create = serializers.ListField(child=serializers.DictField(),
+                                   required=False)
+    update = serializers.ListField(child=serializers.DictField(),
+                                   required=False)
+    delete = serializers.ListField(child=serializers.UUIDField(),
+                                   required=False)
+
+    def validate(self, attrs):
+        """Validate every item, collecting errors per item"""
+        creates = attrs.get('create', [])
+        updates = attrs.get('update', [])
+        deletes = attrs.get('delete', [])
+
+        max_size = getattr(settings, 'TASK_BATCH_SIZE', 100)
+        if len(creates) + len(updates) + len(deletes) > max_size:
+            raise serializers.ValidationError(
+                f'Batch cannot exceed {max_size} items!'
+            )
+
+        update_ids = [parse_pk(Task, item.get('id')) for item in updates]
+        tasks = self.context['queryset'].in_bulk(
+            [pk for pk in update_ids + deletes if pk is not None]
+        )
+
+        items = creates + updates
+        user = self.context['request'].user
+        context = dict(self.context, preloaded={
+            model: queryset.in_bulk({
+                parse_pk(model, item.get(field)) for item in items
+            } - {None})
+            for model, queryset, field in (
+                (Board, Board.objects.filter(user=user), 'board_id'),
+                (Group, Group.objects.all(), 'group_id'),
+            )
+        })
+
+        errors = {'create': [], 'update': [], 'delete': []}
+        validated = {'create': [], 'update': [], 'delete': []}
+        for item in creates:
+            serializer = TaskSerializer(data=item, context=context)
+            serializer.is_valid()
+            errors['create'].append(serializer.errors)
+            validated['create'].append(serializer.validated_data)
+        for pk, item in zip(update_ids, updates):
+            if pk not in tasks:
+                errors['update'].append({'id': ['Not found.']})
+                continue
+            item = {key: value for key, value in item.items() if key != 'id'}
+            serializer = TaskSerializer(tasks[pk], data=item, partial=True,
+                                        context=context)
+            serializer.is_valid()
+            errors['update'].append(serializer.errors)
+            validated['update'].append((tasks[pk], serializer.validated_data))
+        for pk in deletes:
+            if pk not in tasks:
+                errors['delete'].append({'id': ['Not found.']})
+                continue
+            errors['delete'].append({})
+            validated['delete'].append(tasks[pk])
+
+        if any(any(item_errors) for item_errors in errors.values()):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def save(self, **kwargs):
+        """Apply every mutation in one transaction
+
+        Updated & deleted rows are locked first, tasks deleted meanwhile
+        are skipped.
+        """
+        created, updated = [], []
+        deltas = CounterDeltas()
+        with transaction.atomic():
+            stored = {task.pk for task in Task.objects.lock_counted(
+                [task for task, _ in self.validated_data['update']] +
+                self.validated_data['delete']
+            )}
+            for validated_data in self.validated_data['create']:
+                validated_data = dict(validated_data)
+                created.append(Task(
+                    board=validated_data.pop('board_id', None),
+                    group=validated_data.pop('group_id', None),
+                    **validated_data
+                ))
+            Task.objects.bulk_create(created)
+            for task in created:
+                task.count_changes(deltas)
+
+            fields = {'updated_at'}
+            now = timezone.now()
+            for task, validated_data in self.validated_data['update']:
+                if task.pk not in stored:
+                    continue
+                task.updated_at = now
+                for attr, value in validated_data.items():
+                    attr = {'board_id': 'board', 'group_id': 'group'}.get(
+                        attr, attr
+                    )
+                    setattr(task, attr, value)
+                    fields.add(attr)
+                if task.reminder_changed:
+                    task.reminder_sent_at = None
+                    task._loaded_remind_me = task.remind_me
+                    fields.add('reminder_sent_at')
+                updated.append(task)
+            moves = [(task, task.moved_from) for task in updated
+                     if task.moved_from is not None]
+            if updated:
+                Task.objects.bulk_update(updated, fields)
+                AssignedTask.objects.count_moves(updated, deltas)
+                for task in updated:
+                    task.count_changes(deltas)
+
+            deleted = [task.id for task in self.validated_data['delete']
+                       if task.pk in stored]
+            if deleted:
+                for task in self.validated_data['delete']:
+                    if task.pk in stored:
+                        deltas.add_task(*task._loaded_counted, count=-1)
+                AssignedTask.objects.count_open(deleted, deltas, -1)
+                Task.objects.filter(id__in=deleted).delete()
+
+            Change.objects.record_moves(moves)
+            Change.objects.record(created + updated)
+
+            changed = [
+                task for task in created + updated if task.assignment_changed
+            ]
+            if changed:
+                assignments = AssignedTask.objects.reconcile(changed, deltas)
+                Notification.objects.enqueue_assignments(assignments)
+                for task in changed:
+                    task._loaded_assignment = (task.is_assigned,
+                                               task.group_id)
+            deltas.apply()
+
+        self.instance = {
+            'create': created, 'update': updated, 'delete': deleted
+        }
+        return self.instance
+
+
+class GroupMembersSerializer(serializers.Serializer):
+    """Serializer for adding & removing group members in bulk
+
+    Expects the group as `group` in context. Users are resolved together
+    with their membership in one query, only actual changes are applied.
+    """
+    add = serializers.ListField(child=serializers.UUIDField(),
+                                required=False)
+    remove = serializers.ListField(child=serializers.UUIDField(),
+                                   required=False)
+
+    def validate(self, attrs):
+        """Validate every user exists, keeping only actual changes"""
+        add = set(attrs.get('add', []))
+        remove = set(attrs.get('remove', []))
+
+        max_size = getattr(settings, 'GROUP_MEMBER_BATCH_SIZE', 500)
+        if len(add) + len(remove) > max_size:
+            raise serializers.ValidationError(
+                f'Batch cannot exceed {max_size} users!'
+            )
+        if add & remove:
+            raise serializers.ValidationError(
+                'Users cannot be added and removed at once!'
+            )
+
+        memberships = Group.users.through.objects.filter(
+            group_id=self.context['group'].pk, user_id=OuterRef('pk')
+        )
+        is_member = dict(User.objects.filter(id__in=add | remove).annotate(
+            is_member=Exists(memberships)
+        ).values_list('id', 'is_member'))
+        missing = (add | remove) - is_member.keys()
+        if missing:
+            raise serializers.ValidationError({'users': [
+                f'No user with id {pk} found!'
+                for pk in sorted(missing, key=str)
+            ]})
+
+        return {
+            'add': sorted((pk for pk in add if not is_member[pk]), key=str),
+            'remove': sorted((pk for pk in remove if is_member[pk]), key=str),
+        }
+
+    def save(self, **kwargs):
+        """Apply membership changes in one transaction"""
+        group = self.context['group']
+        with transaction.atomic():
+            if self.validated_data['add']:
+                group.users.add(*self.validated_data['add'])
+            if self.validated_data['remove']:
+                group.users.remove(*self.validated_data['remove'])
+        self.instance = group
+        return group
+
+    def to_representation(self, instance):
+        """Return the applied difference"""
+        return {
+            'added': [str(pk) for pk in self.validated_data['add']],
+            'removed': [str(pk) for pk in self.validated_data['remove']],
+        }
+
+
+class AssignedTaskSerializer(DynamicModelSerializer):
     """Serializer for AssignedTask model"""
 
     task = TaskSerializer(read_only=True, exclude=['group', ])
     user = UserSerializer(read_only=True)
-    group = serializers.SerializerMethodField('get_group')
-
-    def get_group(self, obj):
-        """Return associated group"""
-        return GroupSerializer(obj.group, read_only=True).data
+    group = GroupSerializer(read_only=True)
 
     class Meta:
         model = AssignedTask
@@ -80,27 +378,13 @@ class AssignedTaskSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class GroupSerializer(serializers.ModelSerializer):
-    """Serializer for Group model"""
+class AssignedTaskGroupMemberIdsSerializer(AssignedTaskSerializer):
+    """Serializer for AssignedTask model rendering member ids of its group"""
 
-    admin = UserSerializer(read_only=True)
-    admin_id = serializers.PrimaryKeyRelatedField(write_only=True,
-                                                  queryset=User.objects.all())
-    users = UserSerializer(many=True, required=False)
+    group = GroupMemberIdsSerializer(read_only=True)
 
-    class Meta:
-        model = Group
-        fields = ('id', 'name', 'admin', 'users', 'admin_id')
-        read_only_fields = ()
 
-    def create(self, validated_data):
-        """Override to link admin"""
-        admin_id = validated_data.pop('admin_id', None)
-        users = validated_data.pop('users', None)
-        group = Group.objects.create(
-            admin=admin_id, **validated_data
-        )
-        if users is not None:
-            group.users.set(users)
-        group.save()
-        return group
+class AssignedTaskGroupWithoutMembersSerializer(AssignedTaskSerializer):
+    """Serializer for AssignedTask model leaving members of its group out"""
+
+    group = GroupWithoutMembersSerializer(read_only=True)
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+
+def board_url(board):
+    return reverse('twix:board-detail', args=[board.id])
+
+
+class BoardScopeTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@twix.com', password='password', name='Owner'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.owner)
+        self.group.users.add(self.owner, self.member)
+        self.board = Board.objects.create(name='Board', user=self.owner)
+        Task.objects.create(name='Task', is_done=False, board=self.board,
+                            group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_member_reads_board_of_group_tasks(self):
+        """Test members read boards holding tasks of their groups"""
+        response = self.client.get(board_url(self.board))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_member_cannot_change_board(self):
+        """Test only the owner renames or deletes a board"""
+        response = self.client.patch(board_url(self.board),
+                                     {'name': 'Renamed'})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.delete(board_url(self.board))
+        self.assertEqual(response.status_code, 404)
+
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.name, 'Board')
+        self.assertEqual(self.board.tasks.count(), 1)
+
+    def test_owner_changes_board(self):
+        """Test the owner renames a board"""
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.patch(board_url(self.board),
+                                     {'name': 'Renamed'})
+
+        self.assertEqual(response.status_code, 200)
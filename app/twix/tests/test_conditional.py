@@ -0,0 +1,128 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+
+
+def task_detail_url(task_id):
+    return reverse('twix:task-detail', args=[task_id])
+
+
+class ConditionalTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user)
+        self.task = Task.objects.create(name='Task', is_done=False,
+                                        board=self.board, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_detail_not_modified(self):
+        """Test matching ETag returns 304 without serializing"""
+        response = self.client.get(task_detail_url(self.task.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                task_detail_url(self.task.id),
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_modified_by_related_change(self):
+        """Test changing a nested object changes the ETag"""
+        etag = self.client.get(task_detail_url(self.task.id))['ETag']
+
+        self.group.users.add(User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        ))
+        response = self.client.get(task_detail_url(self.task.id),
+                                   HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['group']['users']), 2)
+
+    def test_detail_etag_depends_on_members_mode(self):
+        """Test each members mode of an object has its own ETag"""
+        url = task_detail_url(self.task.id)
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, {'members': 'ids'},
+                                   HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_not_modified(self):
+        """Test matching list ETag returns 304 after one aggregate query"""
+        etag = self.client.get(TASK_VIEW_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(TASK_VIEW_URL,
+                                       HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_modified_by_delete(self):
+        """Test deleting a task changes the list ETag"""
+        Task.objects.create(name='Other', is_done=False, board=self.board,
+                            group=self.group)
+        etag = self.client.get(TASK_VIEW_URL)['ETag']
+
+        self.task.delete()
+        response = self.client.get(TASK_VIEW_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_list_etag_depends_on_user(self):
+        """Test ETags are not shared between users"""
+        etag = self.client.get(TASK_VIEW_URL)['ETag']
+        other = User.objects.create_user(
+            email='other@twix.com', password='password', name='Other'
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.get(TASK_VIEW_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_has_no_last_modified(self):
+        """Test lists only validate by ETag so deletes are not missed"""
+        response = self.client.get(TASK_VIEW_URL)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+        Task.objects.create(name='Other', is_done=False, board=self.board,
+                            group=self.group)
+        self.task.delete()
+        response = self.client.get(
+            TASK_VIEW_URL,
+            HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2090 00:00:00 GMT'
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_modified_by_member_rename(self):
+        """Test renaming a nested group member changes the list ETag"""
+        etag = self.client.get(TASK_VIEW_URL)['ETag']
+
+        self.user.name = 'Renamed'
+        self.user.save()
+        response = self.client.get(TASK_VIEW_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data['results'][0]['group']['admin']['name'], 'Renamed'
+        )
@@ -0,0 +1,240 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+
+
+def group_url(group):
+    return reverse('twix:group-detail', args=[group.id])
+
+
+def members_url(group):
+    return reverse('twix:group-members', args=[group.id])
+
+
+class GroupMembersTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.group.users.add(self.admin, self.member)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_users(self, count):
+        return User.objects.bulk_create([
+            User(email=f'user{index}@twix.com', name=f'User {index}')
+            for index in range(count)
+        ])
+
+    def post_members(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(members_url(self.group), data,
+                                        format='json')
+        return response, len(queries)
+
+    def test_add_members_in_constant_queries(self):
+        """Test adding many users costs as many queries as adding one"""
+        first, second = self.create_users(2)
+        self.post_members({'add': [str(first.id)]})
+        response, one = self.post_members({'add': [str(second.id)]})
+        self.assertEqual(response.status_code, 200)
+
+        users = User.objects.bulk_create([
+            User(email=f'team{index}@twix.com', name=f'Team {index}')
+            for index in range(300)
+        ])
+        response, many = self.post_members({
+            'add': [str(user.id) for user in users]
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['added']), 300)
+        self.assertEqual(self.group.users.count(), 304)
+        self.assertEqual(one, many)
+
+    def test_response_lists_actual_changes(self):
+        """Test existing members & absent users are left out of the diff"""
+        new, outsider = self.create_users(2)
+
+        response, _ = self.post_members({
+            'add': [str(new.id), str(self.member.id)],
+            'remove': [str(self.admin.id), str(outsider.id)],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'added': [str(new.id)], 'removed': [str(self.admin.id)]
+        })
+        self.assertEqual(set(self.group.users.all()), {self.member, new})
+
+    def test_unknown_user_rejects_batch(self):
+        """Test one unknown id leaves the group untouched"""
+        new, = self.create_users(1)
+        unknown = uuid.uuid4()
+
+        response, _ = self.post_members({
+            'add': [str(new.id), str(unknown)]
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['users'],
+                         [f'No user with id {unknown} found!'])
+        self.assertFalse(self.group.users.filter(id=new.id).exists())
+
+    def test_add_and_remove_same_user(self):
+        """Test a user cannot be added and removed at once"""
+        response, _ = self.post_members({
+            'add': [str(self.member.id)], 'remove': [str(self.member.id)]
+        })
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_admin_forbidden(self):
+        """Test only the group admin changes members"""
+        self.client.force_authenticate(self.member)
+
+        response, _ = self.post_members({'remove': [str(self.admin.id)]})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(self.group.users.filter(id=self.admin.id).exists())
+
+    def test_non_admin_cannot_change_group(self):
+        """Test only the group admin updates or deletes the group"""
+        self.client.force_authenticate(self.member)
+
+        response = self.client.patch(group_url(self.group),
+                                     {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.delete(group_url(self.group))
+        self.assertEqual(response.status_code, 403)
+
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.name, 'Team')
+
+    def test_admin_changes_group(self):
+        """Test the group admin updates and deletes the group"""
+        response = self.client.patch(group_url(self.group),
+                                     {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.delete(group_url(self.group))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Group.objects.filter(id=self.group.id).exists())
+
+    def test_single_member_routes(self):
+        """Test legacy add & remove routes still return the whole group"""
+        new, = self.create_users(1)
+
+        response = self.client.post(
+            reverse('twix:group-add', args=[self.group.id]),
+            {'user': str(new.id)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['users']), 3)
+
+        response = self.client.post(
+            reverse('twix:group-remove', args=[self.group.id]),
+            {'user': str(uuid.uuid4())}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, 'No user with given id found!')
+
+
+class GroupMembersModeTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@twix.com', password='password', name='Admin'
+        )
+        self.group = Group.objects.create(name='Team', admin=self.admin)
+        self.members = User.objects.bulk_create([
+            User(email=f'user{index}@twix.com', name=f'User {index}')
+            for index in range(5)
+        ])
+        self.group.users.add(self.admin, *self.members)
+        self.board = Board.objects.create(name='Board', user=self.admin)
+        for index in range(3):
+            Task.objects.create(name=f'Task {index}', board=self.board,
+                                group=self.group, is_done=False)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def member_ids(self):
+        return sorted(str(user.id) for user in [self.admin] + self.members)
+
+    def test_full_mode_is_default(self):
+        """Test groups nest every member unless asked otherwise"""
+        response = self.client.get(TASK_VIEW_URL)
+
+        self.assertEqual(response.status_code, 200)
+        group = response.data['results'][0]['group']
+        self.assertEqual(len(group['users']), 6)
+        self.assertEqual(group['users'][0].keys(), {'id', 'email', 'name'})
+
+    def test_ids_mode(self):
+        """Test groups render member ids & count"""
+        response = self.client.get(TASK_VIEW_URL, {'members': 'ids'})
+
+        self.assertEqual(response.status_code, 200)
+        for task in response.data['results']:
+            self.assertEqual(task['group']['member_count'], 6)
+            self.assertEqual(sorted(map(str, task['group']['users'])),
+                             self.member_ids())
+
+    def test_included_mode(self):
+        """Test members are side-loaded once per response"""
+        response = self.client.get(TASK_VIEW_URL, {'members': 'included'})
+
+        self.assertEqual(response.status_code, 200)
+        for task in response.data['results']:
+            self.assertNotIn('users', task['group'])
+        included = response.data['included']
+        self.assertEqual(sorted(included['members'][str(self.group.id)]),
+                         self.member_ids())
+        self.assertEqual(sorted(included['users']), self.member_ids())
+        self.assertEqual(included['users'][str(self.admin.id)]['name'],
+                         'Admin')
+
+    def test_included_mode_of_group(self):
+        """Test a retrieved group side-loads its own members"""
+        response = self.client.get(
+            reverse('twix:group-detail', args=[self.group.id]),
+            {'members': 'included'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('users', response.data)
+        self.assertEqual(len(response.data['included']['users']), 6)
+
+    def test_unknown_mode(self):
+        """Test an unknown mode is rejected"""
+        response = self.client.get(TASK_VIEW_URL, {'members': 'some'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_members_in_pages(self):
+        """Test members are listed page by page"""
+        url = members_url(self.group)
+
+        response = self.client.get(url, {'page_size': 4})
+        self.assertEqual(response.status_code, 200)
+        ids = [user['id'] for user in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [user['id'] for user in response.data['results']]
+
+        self.assertEqual(sorted(ids), self.member_ids())
+        self.assertIsNone(response.data['next'])
@@ -0,0 +1,116 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+TASK_ASSIGN_VIEW_URL = reverse('twix:task-assign-view')
+NORMALIZED = 'application/vnd.twix.normalized+json'
+
+
+class NormalizedResponseTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.members = User.objects.bulk_create([
+            User(email=f'member{index}@twix.com', name=f'Member {index}')
+            for index in range(20)
+        ])
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user, *self.members)
+        self.tasks = [
+            Task.objects.create(name=f'Task {index}', is_done=False,
+                                board=self.board, group=self.group)
+            for index in range(10)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_is_normalized(self):
+        """Test rows refer to boards & groups side-loaded once"""
+        response = self.client.get(TASK_VIEW_URL, HTTP_ACCEPT=NORMALIZED)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], NORMALIZED)
+        data = json.loads(response.content)
+        self.assertEqual(set(data), {'next', 'previous', 'data', 'included'})
+        self.assertEqual(len(data['data']), 10)
+        self.assertEqual({task['group'] for task in data['data']},
+                         {str(self.group.id)})
+        self.assertEqual(list(data['included']['groups']),
+                         [str(self.group.id)])
+        self.assertEqual(len(data['included']['users']), 21)
+        self.assertEqual(
+            data['included']['boards'][str(self.board.id)]['name'], 'Board'
+        )
+
+    def test_normalized_is_smaller(self):
+        """Test repeated groups no longer repeat their members"""
+        nested = self.client.get(TASK_VIEW_URL)
+        normalized = self.client.get(TASK_VIEW_URL, {'format': 'normalized'})
+
+        self.assertLess(len(normalized.content) * 3, len(nested.content))
+
+    def test_retrieve_is_normalized(self):
+        """Test a single object is returned under data"""
+        response = self.client.get(
+            reverse('twix:task-detail', args=[self.tasks[0].id]),
+            HTTP_ACCEPT=NORMALIZED
+        )
+
+        data = json.loads(response.content)
+        self.assertEqual(data['data']['id'], str(self.tasks[0].id))
+        self.assertIn(str(self.group.id), data['included']['groups'])
+
+    def test_assigned_tasks_are_normalized(self):
+        """Test assigned tasks refer to their task, group & user"""
+        task = Task.objects.get(id=self.tasks[0].id)
+        task.is_assigned = True
+        task.save()
+
+        response = self.client.get(TASK_ASSIGN_VIEW_URL,
+                                   HTTP_ACCEPT=NORMALIZED)
+
+        data = json.loads(response.content)
+        self.assertEqual(len(data['data']), 21)
+        self.assertEqual(list(data['included']['tasks']), [str(task.id)])
+        self.assertEqual({row['user'] for row in data['data']},
+                         set(data['included']['users']))
+
+    def test_members_included_mode(self):
+        """Test side-loaded members are merged into included"""
+        response = self.client.get(TASK_VIEW_URL, {
+            'format': 'normalized', 'members': 'included'
+        })
+
+        data = json.loads(response.content)
+        self.assertNotIn('users', data['included']['groups'][
+            str(self.group.id)
+        ])
+        self.assertEqual(len(data['included']['members'][
+            str(self.group.id)
+        ]), 21)
+        self.assertEqual(len(data['included']['users']), 21)
+
+    def test_validators_differ_per_format(self):
+        """Test formats of the same route get their own ETag"""
+        nested = self.client.get(TASK_VIEW_URL)
+        normalized = self.client.get(TASK_VIEW_URL, HTTP_ACCEPT=NORMALIZED)
+
+        self.assertNotEqual(nested['ETag'], normalized['ETag'])
+        self.assertIn('Accept', normalized['Vary'])
+
+    def test_errors_are_not_wrapped(self):
+        """Test error responses keep their shape"""
+        response = self.client.get(TASK_VIEW_URL, {'members': 'some'},
+                                   HTTP_ACCEPT=NORMALIZED)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('members', json.loads(response.content))
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from unittest.mock import patch
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board
+from core.pagination import CursorPagination
+
+BOARD_VIEW_URL = reverse('twix:board-view')
+USER_LIST_URL = reverse('user:user-list')
+
+
+class PaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        Board.objects.bulk_create([
+            Board(name=f'Board {index}', user=self.user)
+            for index in range(25)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_follow_cursors(self):
+        """Test walking every page returns each board exactly once"""
+        boards = []
+        url = BOARD_VIEW_URL + '?page_size=10'
+        pages = 0
+        while url is not None:
+            response = self.client.get(url)
+            boards += response.data['results']
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len({board['id'] for board in boards}), 25)
+
+    def test_page_size_is_capped(self):
+        """Test requested page size cannot exceed maximum"""
+        with patch.object(CursorPagination, 'max_page_size', 20):
+            response = self.client.get(BOARD_VIEW_URL, {'page_size': 10000})
+
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        """Test invalid cursor is rejected"""
+        response = self.client.get(BOARD_VIEW_URL, {'cursor': 'invalid'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_user_paginated(self):
+        """Test user list is paginated"""
+        for index in range(3):
+            User.objects.create_user(
+                email=f'member{index}@twix.com', password='password',
+                name=f'Member {index}'
+            )
+
+        response = self.client.get(USER_LIST_URL, {'page_size': 2})
+
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
@@ -0,0 +1,246 @@
+from django.urls import reverse
+
+from core.models import User, Task, AssignedTask
+from core.tests.budgets import QueryBudgetTestCase
+
+BOARD_VIEW_URL = reverse('twix:board-view')
+TASK_VIEW_URL = reverse('twix:task-view')
+TASK_BATCH_URL = reverse('twix:task-batch')
+TASK_ASSIGN_VIEW_URL = reverse('twix:task-assign-view')
+SYNC_URL = reverse('twix:sync')
+GROUP_VIEW_URL = reverse('twix:group-view')
+DEVICE_URL = reverse('twix:create_fcm_device')
+
+
+def detail_url(name, obj):
+    return reverse(f'twix:{name}', args=[obj.id])
+
+
+class BoardQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list_boards(self):
+        """Test listing boards"""
+        self.assertBudget('GET', BOARD_VIEW_URL, 2)
+
+    def test_create_board(self):
+        """Test creating a board"""
+        self.assertBudget('POST', BOARD_VIEW_URL, 2, {'name': 'New'},
+                          status=201)
+
+    def test_retrieve_board(self):
+        """Test retrieving a board with thousands of tasks"""
+        self.assertBudget('GET', detail_url('board-detail', self.board), 3)
+
+    def test_update_board(self):
+        """Test renaming a board"""
+        self.assertBudget('PATCH', detail_url('board-detail', self.board), 3,
+                          {'name': 'Renamed'})
+
+    def test_destroy_board(self):
+        """Test deleting a board with thousands of tasks"""
+        self.assertBudget('DELETE', detail_url('board-detail', self.board), 50,
+                          status=204)
+
+
+class TaskQueryBudgetTests(QueryBudgetTestCase):
+
+    def new_task(self, name, **kwargs):
+        return dict(name=name, is_done=False, board_id=str(self.board.id),
+                    group_id=str(self.group.id), **kwargs)
+
+    def test_list_tasks(self):
+        """Test listing a full page of tasks"""
+        self.assertBudget('GET', TASK_VIEW_URL + '?page_size=500', 3)
+
+    def test_list_tasks_with_member_ids(self):
+        """Test listing a full page of tasks with member ids of groups"""
+        self.assertBudget(
+            'GET', TASK_VIEW_URL + '?page_size=500&members=ids', 3
+        )
+
+    def test_list_tasks_with_included_members(self):
+        """Test listing a full page of tasks with side-loaded members"""
+        self.assertBudget(
+            'GET', TASK_VIEW_URL + '?page_size=500&members=included', 3
+        )
+
+    def test_list_tasks_normalized(self):
+        """Test listing a full page of tasks in the normalized format"""
+        self.assertBudget(
+            'GET', TASK_VIEW_URL + '?page_size=500&format=normalized', 3
+        )
+
+    def test_create_task(self):
+        """Test creating a task"""
+        self.assertBudget('POST', TASK_VIEW_URL, 14, self.new_task('New'),
+                          status=201)
+
+    def test_create_assigned_task(self):
+        """Test assigning a new task to 500 members"""
+        self.assertBudget('POST', TASK_VIEW_URL, 30,
+                          self.new_task('New', is_assigned=True), status=201)
+
+    def test_batch_tasks(self):
+        """Test a batch of creates, updates & deletes"""
+        tasks = Task.objects.filter(is_assigned=False)[:20]
+        self.assertBudget('POST', TASK_BATCH_URL, 27, {
+            'create': [self.new_task(f'New {index}') for index in range(10)],
+            'update': [{'id': str(task.id), 'is_done': True}
+                       for task in tasks[:10]],
+            'delete': [str(task.id) for task in tasks[10:]],
+        })
+
+    def test_retrieve_task(self):
+        """Test retrieving a task"""
+        self.assertBudget('GET', detail_url('task-detail', self.task), 2)
+
+    def test_update_task(self):
+        """Test updating an assigned task"""
+        self.assertBudget('PATCH', detail_url('task-detail', self.task), 12,
+                          {'name': 'Renamed'})
+
+    def test_assign_task(self):
+        """Test assigning an existing task to 500 members"""
+        task = Task.objects.filter(is_assigned=False).first()
+        self.assertBudget('PATCH', detail_url('task-detail', task), 34,
+                          {'is_assigned': True})
+
+    def test_destroy_task(self):
+        """Test deleting a task assigned to 500 members"""
+        self.assertBudget('DELETE', detail_url('task-detail', self.task), 14,
+                          status=204)
+
+
+class AssignedTaskQueryBudgetTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super(AssignedTaskQueryBudgetTests, self).setUp()
+        self.assigned_task = AssignedTask.objects.get(task=self.task,
+                                                      user=self.user)
+
+    def test_list_assigned_tasks(self):
+        """Test listing tasks assigned to the user"""
+        self.assertBudget('GET', TASK_ASSIGN_VIEW_URL, 5)
+
+    def test_retrieve_assigned_task(self):
+        """Test retrieving an assigned task"""
+        self.assertBudget(
+            'GET', detail_url('task-assign-detail', self.assigned_task), 2
+        )
+
+    def test_update_assigned_task(self):
+        """Test completing an assigned task"""
+        self.assertBudget(
+            'PATCH', detail_url('task-assign-detail', self.assigned_task), 12,
+            {'is_done': True}
+        )
+
+
+class SyncQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_initial_sync(self):
+        """Test the first page of a full sync"""
+        self.assertBudget('GET', SYNC_URL, 12)
+
+    def test_delta_sync(self):
+        """Test syncing from the latest token"""
+        token = self.client.get(SYNC_URL).data['token']
+        while True:
+            response = self.client.get(SYNC_URL, {'since': token})
+            token = response.data['token']
+            if not response.data['has_more']:
+                break
+        self.assertBudget('GET', f'{SYNC_URL}?since={token}', 5)
+
+
+class GroupQueryBudgetTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super(GroupQueryBudgetTests, self).setUp()
+        self.outsider = User.objects.create_user(
+            email='outsider@twix.com', password='password', name='Outsider'
+        )
+
+    def test_list_groups(self):
+        """Test listing groups of 1 to 500 members"""
+        self.assertBudget('GET', GROUP_VIEW_URL, 5)
+
+    def test_create_group(self):
+        """Test creating a group"""
+        self.assertBudget('POST', GROUP_VIEW_URL, 6, {
+            'name': 'New', 'admin_id': str(self.user.id)
+        }, status=201)
+
+    def test_retrieve_group(self):
+        """Test retrieving a group of 500 members"""
+        self.assertBudget('GET', detail_url('group-detail', self.group), 4)
+
+    def test_list_group_members(self):
+        """Test listing a page of members of a group of 500 members"""
+        self.assertBudget('GET', detail_url('group-members', self.group), 4)
+
+    def test_update_group(self):
+        """Test renaming a group of 500 members"""
+        self.assertBudget('PATCH', detail_url('group-detail', self.group), 9,
+                          {'name': 'Renamed'})
+
+    def test_destroy_group(self):
+        """Test deleting a group of 500 members"""
+        self.assertBudget('DELETE', detail_url('group-detail', self.group), 79,
+                          status=204)
+
+    def test_add_group_member(self):
+        """Test adding a member to a group of 500 members"""
+        self.assertBudget('POST', detail_url('group-add', self.group), 12,
+                          {'user': str(self.outsider.id)})
+
+    def test_remove_group_member(self):
+        """Test removing a member from a group of 500 members"""
+        self.assertBudget('POST', detail_url('group-remove', self.group), 13,
+                          {'user': str(self.members[0].id)})
+
+    def test_update_group_members(self):
+        """Test adding & removing members of a group of 500 members"""
+        self.assertBudget('POST', detail_url('group-members', self.group), 16,
+                          {'add': [str(self.outsider.id)],
+                           'remove': [str(member.id)
+                                      for member in self.members[:100]]})
+
+
+class DeviceQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_create_device(self):
+        """Test registering a device"""
+        self.assertBudget('POST', DEVICE_URL, 3,
+                          {'registration_id': 'token', 'type': 'android'},
+                          status=201)
+
+
+class SmallGroupQueryBudgetTests(QueryBudgetTestCase):
+    """Read budgets must not depend on the number of members or tasks"""
+    member_count = 1
+    task_count = 10
+
+    def test_list_tasks(self):
+        """Test listing a handful of tasks"""
+        self.assertBudget('GET', TASK_VIEW_URL, 3)
+
+    def test_retrieve_task(self):
+        """Test retrieving a task of a single member group"""
+        self.assertBudget('GET', detail_url('task-detail', self.task), 2)
+
+    def test_list_assigned_tasks(self):
+        """Test listing tasks assigned in a single member group"""
+        self.assertBudget('GET', TASK_ASSIGN_VIEW_URL, 5)
+
+    def test_initial_sync(self):
+        """Test the first page of a small full sync"""
+        self.assertBudget('GET', SYNC_URL, 12)
+
+    def test_list_groups(self):
+        """Test listing a single member group"""
+        self.assertBudget('GET', GROUP_VIEW_URL, 5)
+
+    def test_retrieve_group(self):
+        """Test retrieving a single member group"""
+        self.assertBudget('GET', detail_url('group-detail', self.group), 4)
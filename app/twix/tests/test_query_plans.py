@@ -0,0 +1,66 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+TASK_ASSIGN_VIEW_URL = reverse('twix:task-assign-view')
+GROUP_VIEW_URL = reverse('twix:group-view')
+
+
+class QueryPlanTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_tasks(self, count, members):
+        """Create tasks assigned to a group with given number of members"""
+        group = Group.objects.create(name='Team', admin=self.user)
+        group.users.add(self.user, *(
+            User.objects.create_user(
+                email=f'member{index}@{group.id}.com', password='password',
+                name=f'Member {index}'
+            )
+            for index in range(members)
+        ))
+        for index in range(count):
+            Task.objects.create(
+                name=f'Task {index}', is_done=False, board=self.board,
+                group=group, is_assigned=True
+            )
+
+    def assertConstantQueries(self, url, num):
+        """Assert query count of url does not grow with data size"""
+        self.create_tasks(count=1, members=1)
+        with self.assertNumQueries(num):
+            self.client.get(url)
+
+        self.create_tasks(count=10, members=5)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        return response
+
+    def test_view_task_queries(self):
+        """Test listing tasks uses a fixed number of queries"""
+        response = self.assertConstantQueries(TASK_VIEW_URL, 3)
+
+        tasks = response.data['results']
+        self.assertEqual(len(tasks), 11)
+        self.assertEqual(
+            max(len(task['group']['users']) for task in tasks), 6
+        )
+
+    def test_view_assigned_task_queries(self):
+        """Test listing assigned tasks uses a fixed number of queries"""
+        self.assertConstantQueries(TASK_ASSIGN_VIEW_URL, 5)
+
+    def test_view_group_queries(self):
+        """Test listing groups uses a fixed number of queries"""
+        self.assertConstantQueries(GROUP_VIEW_URL, 5)
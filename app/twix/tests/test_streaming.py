@@ -0,0 +1,84 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from unittest.mock import patch
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+from twix.views import TaskViewSet
+
+TASK_VIEW_URL = reverse('twix:task-view')
+
+
+class StreamingTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        board = Board.objects.create(name='Board', user=self.user)
+        group = Group.objects.create(name='Team', admin=self.user)
+        group.users.add(self.user)
+        for index in range(7):
+            Task.objects.create(
+                name=f'Task {index}', is_done=False, board=board, group=group
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_stream_json_array(self):
+        """Test stream parameter returns the full list as a JSON array"""
+        response = self.client.get(TASK_VIEW_URL, {'stream': 1})
+
+        self.assertTrue(response.streaming)
+        tasks = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(tasks), 7)
+        self.assertEqual(tasks[0]['group']['users'][0]['id'],
+                         str(self.user.id))
+
+    def test_stream_ndjson(self):
+        """Test accepting ndjson streams one task per line"""
+        response = self.client.get(TASK_VIEW_URL,
+                                   HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(
+            {json.loads(line)['name'] for line in lines},
+            {f'Task {index}' for index in range(7)}
+        )
+
+    def test_stream_rejects_included_members(self):
+        """Test side-loaded members are rejected instead of dropped"""
+        response = self.client.get(TASK_VIEW_URL,
+                                   {'stream': 1, 'members': 'included'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(TASK_VIEW_URL, {'members': 'included'},
+                                   HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(TASK_VIEW_URL,
+                                   {'stream': 1, 'members': 'ids'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_stream_rejects_ordering(self):
+        """Test orderings are rejected instead of silently ignored"""
+        response = self.client.get(TASK_VIEW_URL,
+                                   {'stream': 1, 'ordering': '-name'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+    def test_stream_chunks_keep_eager_loading(self):
+        """Test each streamed chunk costs a fixed number of queries"""
+        with patch.object(TaskViewSet, 'stream_chunk_size', 3):
+            response = self.client.get(TASK_VIEW_URL, {'stream': 1})
+            with self.assertNumQueries(6):
+                tasks = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(len(tasks), 7)
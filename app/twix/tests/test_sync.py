@@ -0,0 +1,254 @@
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task, Change
+
+SYNC_URL = reverse('twix:sync')
+
+
+@override_settings(CHANGE_COMMIT_GRACE=0)
+class SyncTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user)
+        self.task = Task.objects.create(name='Task', is_done=False,
+                                        board=self.board, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=None):
+        params = {} if since is None else {'since': since}
+        response = self.client.get(SYNC_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        """Test syncing without token returns every object in scope"""
+        data = self.sync()
+
+        self.assertEqual([board['id'] for board in data['boards']],
+                         [str(self.board.id)])
+        self.assertEqual([task['id'] for task in data['tasks']],
+                         [str(self.task.id)])
+        self.assertEqual(len(data['groups']), 2)
+        self.assertFalse(data['has_more'])
+
+    def test_sync_returns_only_changes(self):
+        """Test syncing with token returns objects changed since"""
+        token = self.sync()['token']
+        self.assertEqual(self.sync(token)['tasks'], [])
+
+        self.task.is_done = True
+        self.task.save()
+        data = self.sync(token)
+
+        self.assertEqual(len(data['tasks']), 1)
+        self.assertTrue(data['tasks'][0]['is_done'])
+        self.assertEqual(
+            [board['done_count'] for board in data['boards']], [1]
+        )
+
+    def test_sync_returns_tombstones(self):
+        """Test deleted objects are reported"""
+        token = self.sync()['token']
+        task_id = self.task.id
+
+        self.task.delete()
+        data = self.sync(token)
+
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['deleted']['tasks'], [task_id])
+
+    def test_sync_returns_cascaded_tombstones(self):
+        """Test tasks deleted with their board are logged once"""
+        token = self.sync()['token']
+        board_id, task_id = self.board.id, self.task.id
+
+        self.board.delete()
+        data = self.sync(token)
+
+        self.assertEqual(data['deleted']['boards'], [board_id])
+        self.assertEqual(Change.objects.filter(
+            object_id=task_id, is_deleted=True
+        ).count(), 1)
+
+    def test_rolled_back_board_delete_keeps_task_tombstones(self):
+        """Test a failed board delete does not hide later task deletes"""
+        def fail(sender, instance, **kwargs):
+            raise RuntimeError('Delete failed')
+
+        pre_delete.connect(fail, sender=Board)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.board.delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Board)
+        token = self.sync()['token']
+        task_id = self.task.id
+
+        self.task.delete()
+
+        self.assertEqual(self.sync(token)['deleted']['tasks'], [task_id])
+
+    def test_sync_reports_assignment_changes(self):
+        """Test assigned tasks created by fan-out are reported"""
+        token = self.sync()['token']
+
+        self.task.is_assigned = True
+        self.task.save()
+        token_data = self.sync(token)
+        self.assertEqual(len(token_data['assigned_tasks']), 1)
+
+        self.task.is_assigned = False
+        self.task.save()
+        data = self.sync(token_data['token'])
+        self.assertEqual(len(data['deleted']['assigned_tasks']), 1)
+
+    def test_sync_hides_other_users_changes(self):
+        """Test changes out of scope are not returned"""
+        other = User.objects.create_user(
+            email='other@twix.com', password='password', name='Other'
+        )
+        self.client.force_authenticate(other)
+
+        data = self.sync()
+
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['boards'], [])
+        self.assertEqual(len(data['groups']), 1)
+
+    def test_sync_pages(self):
+        """Test changes beyond page size are returned on the next call"""
+        tasks = []
+        with self.settings(SYNC_PAGE_SIZE=2):
+            data = self.sync()
+            self.assertTrue(data['has_more'])
+            tasks += data['tasks']
+            while data['has_more']:
+                data = self.sync(data['token'])
+                tasks += data['tasks']
+
+        self.assertEqual([task['id'] for task in tasks], [str(self.task.id)])
+
+    @override_settings(CHANGE_COMMIT_GRACE=60)
+    def test_sync_returns_late_commits(self):
+        """Test changes committed after a higher id are still returned"""
+        self.task.name = 'Late'
+        self.task.save()
+        late = Change.objects.latest('id')
+        late.delete()
+        Task.objects.create(name='Other', is_done=False, board=self.board,
+                            group=self.group)
+        token = self.sync()['token']
+
+        late.save(force_insert=True)
+        data = self.sync(token)
+
+        self.assertIn(str(self.task.id),
+                      [task['id'] for task in data['tasks']])
+
+    def test_sync_returns_removed_member_tombstone(self):
+        """Test members removed from a group are told so"""
+        member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group.users.add(member)
+        self.client.force_authenticate(member)
+        token = self.sync()['token']
+
+        self.group.users.remove(member)
+        data = self.sync(token)
+
+        self.assertEqual(data['groups'], [])
+        self.assertEqual(data['deleted']['groups'], [self.group.id])
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.sync(token)['deleted']['groups'], [])
+
+    def test_sync_shows_group_tasks(self):
+        """Test tasks within the group scope are synced like streamed"""
+        member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group.users.add(member)
+        self.client.force_authenticate(member)
+
+        data = self.sync()
+
+        self.assertEqual([task['id'] for task in data['tasks']],
+                         [str(self.task.id)])
+
+    def test_sync_reports_task_moved_out_of_group(self):
+        """Test a task moved to another group is deleted for old members"""
+        member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.group.users.add(member)
+        other_group = Group.objects.create(name='Other', admin=self.user)
+        self.client.force_authenticate(member)
+        member_token = self.sync()['token']
+        self.client.force_authenticate(self.user)
+        owner_token = self.sync()['token']
+
+        self.task.group = other_group
+        self.task.save()
+
+        self.client.force_authenticate(member)
+        data = self.sync(member_token)
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['deleted']['tasks'], [self.task.id])
+        self.client.force_authenticate(self.user)
+        data = self.sync(owner_token)
+        self.assertEqual([task['id'] for task in data['tasks']],
+                         [str(self.task.id)])
+        self.assertEqual(data['deleted']['tasks'], [])
+
+        call_command('compact_changes')
+
+        self.client.force_authenticate(member)
+        self.assertEqual(self.sync(member_token)['deleted']['tasks'],
+                         [self.task.id])
+
+    def test_sync_reports_tasks_of_deleted_group(self):
+        """Test tasks of a deleted group are synced without their group"""
+        token = self.sync()['token']
+
+        self.group.delete()
+
+        data = self.sync(token)
+        self.assertEqual([task['id'] for task in data['tasks']],
+                         [str(self.task.id)])
+        self.assertIsNone(data['tasks'][0]['group'])
+        self.assertEqual(data['deleted']['tasks'], [])
+
+    def test_invalid_token(self):
+        """Test invalid token is rejected"""
+        response = self.client.get(SYNC_URL, {'since': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(SYNC_URL, {'since': '5:2'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_compact_changes_keeps_latest(self):
+        """Test compacting the log does not change sync results"""
+        for name in ('First', 'Second', 'Third'):
+            self.task.name = name
+            self.task.save()
+        before = self.sync()
+
+        call_command('compact_changes')
+
+        after = self.sync()
+        self.assertEqual(after['tasks'], before['tasks'])
+        self.assertEqual(
+            Change.objects.filter(object_id=self.task.id).count(), 1
+        )
@@ -0,0 +1,150 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task, AssignedTask
+
+TASK_BATCH_URL = reverse('twix:task-batch')
+
+
+class TaskBatchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.member = User.objects.create_user(
+            email='member@twix.com', password='password', name='Member'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.group.users.add(self.user, self.member)
+        self.tasks = [
+            Task.objects.create(name=f'Task {index}', is_done=False,
+                                board=self.board, group=self.group)
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def new_task(self, name, **kwargs):
+        kwargs.setdefault('group_id', str(self.group.id))
+        return dict(name=name, is_done=False, board_id=str(self.board.id),
+                    **kwargs)
+
+    def test_batch_applies_every_mutation(self):
+        """Test creates, updates and deletes are applied together"""
+        response = self.client.post(TASK_BATCH_URL, {
+            'create': [self.new_task('New 1'), self.new_task('New 2')],
+            'update': [
+                {'id': str(self.tasks[0].id), 'is_done': True},
+                {'id': str(self.tasks[1].id), 'is_assigned': True},
+            ],
+            'delete': [str(self.tasks[2].id)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['data']['name'] for item in response.data['create']],
+            ['New 1', 'New 2']
+        )
+        self.assertTrue(response.data['update'][0]['data']['is_done'])
+        self.assertEqual(Task.objects.count(), 4)
+        self.assertFalse(Task.objects.filter(id=self.tasks[2].id).exists())
+        self.assertEqual(
+            AssignedTask.objects.filter(task=self.tasks[1]).count(), 2
+        )
+
+    def test_batch_is_all_or_nothing(self):
+        """Test one invalid item rejects the whole batch"""
+        response = self.client.post(TASK_BATCH_URL, {
+            'create': [self.new_task('New'), {'name': 'Invalid'}],
+            'update': [{'id': str(self.tasks[0].id), 'is_done': True}],
+            'delete': [str(self.member.id)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertIn('is_done', response.data['create'][1])
+        self.assertEqual(response.data['delete'][0], {'id': ['Not found.']})
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertFalse(Task.objects.filter(is_done=True).exists())
+
+    def test_batch_cannot_touch_other_users_tasks(self):
+        """Test tasks out of scope are not found"""
+        other = User.objects.create_user(
+            email='other@twix.com', password='password', name='Other'
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.post(TASK_BATCH_URL, {
+            'update': [{'id': str(self.tasks[0].id), 'is_done': True}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['update'][0], {'id': ['Not found.']})
+
+    def test_batch_cannot_use_other_users_boards(self):
+        """Test tasks are not created on or moved to boards of others"""
+        other = User.objects.create_user(
+            email='other@twix.com', password='password', name='Other'
+        )
+        other_board = Board.objects.create(name='Other', user=other)
+
+        response = self.client.post(TASK_BATCH_URL, {
+            'create': [dict(self.new_task('New'),
+                            board_id=str(other_board.id))],
+            'update': [{'id': str(self.tasks[0].id),
+                        'board_id': str(other_board.id)}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('board_id', response.data['create'][0])
+        self.assertIn('board_id', response.data['update'][0])
+        self.assertFalse(other_board.tasks.exists())
+
+    def test_batch_renders_saved_relations(self):
+        """Test moved and created tasks render their new relations"""
+        other_group = Group.objects.create(name='Other', admin=self.member)
+        other_group.users.add(self.member)
+
+        response = self.client.post(TASK_BATCH_URL, {
+            'create': [self.new_task('New', group_id=str(other_group.id))],
+            'update': [{'id': str(self.tasks[0].id),
+                        'group_id': str(other_group.id)},
+                       {'id': str(self.tasks[1].id), 'is_done': True}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        groups = [item['data']['group'] for item in
+                  response.data['create'] + response.data['update']]
+        self.assertEqual([group['name'] for group in groups],
+                         ['Other', 'Other', 'Team'])
+        self.assertEqual([len(group['users']) for group in groups],
+                         [1, 1, 2])
+
+    def test_batch_size_is_limited(self):
+        """Test batches larger than the limit are rejected"""
+        with self.settings(TASK_BATCH_SIZE=2):
+            response = self.client.post(TASK_BATCH_URL, {
+                'delete': [str(task.id) for task in self.tasks],
+            }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_batch_query_count_is_constant(self):
+        """Test queries do not grow with number of items"""
+        def batch(count):
+            return {
+                'create': [self.new_task(f'New {index}')
+                           for index in range(count)],
+                'update': [{'id': str(task.id), 'is_done': True}
+                           for task in self.tasks[:count]],
+            }
+
+        with self.assertNumQueries(18):
+            self.client.post(TASK_BATCH_URL, batch(1), format='json')
+        with self.assertNumQueries(18):
+            self.client.post(TASK_BATCH_URL, batch(3), format='json')
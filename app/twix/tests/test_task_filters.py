@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group, Task
+
+TASK_VIEW_URL = reverse('twix:task-view')
+
+
+class TaskFilterTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.board = Board.objects.create(name='Board', user=self.user)
+        self.other_board = Board.objects.create(name='Other', user=self.user)
+        self.group = Group.objects.create(name='Team', admin=self.user)
+        self.today = date(2026, 1, 10)
+        Task.objects.bulk_create([
+            Task(name=f'Task {index}', is_done=index % 2 == 0,
+                 board=self.board if index < 6 else self.other_board,
+                 group=self.group if index < 3 else None,
+                 due_date=self.today + timedelta(days=index)
+                 if index % 3 else None)
+            for index in range(9)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_names(self, query):
+        """Return names of every task listed for query"""
+        names = []
+        url = f'{TASK_VIEW_URL}?{query}'
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            names += [task['name'] for task in response.data['results']]
+            url = response.data['next']
+        return names
+
+    def test_filter_fields(self):
+        """Test tasks are filtered by board, group, status & due date"""
+        self.assertEqual(len(self.get_names(f'board={self.board.id}')), 6)
+        self.assertEqual(len(self.get_names(f'group={self.group.id}')), 3)
+        self.assertEqual(
+            sorted(self.get_names(
+                f'board={self.board.id}&is_done=false'
+                f'&due_date__gte={self.today + timedelta(days=2)}'
+            )),
+            ['Task 5']
+        )
+
+    def test_invalid_filter(self):
+        """Test unparsable filters are rejected"""
+        response = self.client.get(TASK_VIEW_URL + '?due_date__gte=soon')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('due_date__gte', response.data)
+
+    def test_order_by_nullable_field(self):
+        """Test ordering by due date pages through nulls placed last"""
+        names = self.get_names('ordering=due_date&page_size=2')
+
+        self.assertEqual(names[:6], [
+            'Task 1', 'Task 2', 'Task 4', 'Task 5', 'Task 7', 'Task 8'
+        ])
+        self.assertEqual(sorted(names[6:]), ['Task 0', 'Task 3', 'Task 6'])
+
+    def test_order_descending(self):
+        """Test descending order keeps missing due dates last"""
+        names = self.get_names('ordering=-due_date&page_size=4')
+
+        self.assertEqual(names[:6], [
+            'Task 8', 'Task 7', 'Task 5', 'Task 4', 'Task 2', 'Task 1'
+        ])
+        self.assertEqual(len(names), 9)
@@ -46,6 +46,17 @@ router.routes += [
         initkwargs={'suffix': 'View'}
     ),
 
+    # Task Batch Route
+    Route(
+        url=r'^twix{trailing_slash}task{trailing_slash}batch{trailing_slash}$',
+        mapping={
+            'post': 'batch_task'
+        },
+        name='task-batch',
+        detail=False,
+        initkwargs={'suffix': 'Batch'}
+    ),
+
     # Task Detail Route
     Route(
         url=r'^twix{trailing_slash}task{trailing_slash}{lookup}'
@@ -85,6 +96,17 @@ router.routes += [
         initkwargs={'suffix': 'Detail'}
     ),
 
+    # Sync Route
+    Route(
+        url=r'^twix{trailing_slash}sync{trailing_slash}$',
+        mapping={
+            'get': 'sync'
+        },
+        name='sync',
+        detail=False,
+        initkwargs={'suffix': 'Sync'}
+    ),
+
     # Group View Route
     Route(
         url=r'^twix{trailing_slash}group{trailing_slash}$',
@@ -134,6 +156,19 @@ router.routes += [
         detail=True,
         initkwargs={'suffix': 'Remove'}
     ),
+
+    # Group Members Route
+    Route(
+        url=r'^twix{trailing_slash}group{trailing_slash}{lookup}'
+            r'{trailing_slash}members{trailing_slash}$',
+        mapping={
+            'get': 'view_group_members_by_id',
+            'post': 'update_group_members_by_id'
+        },
+        name='group-members',
+        detail=True,
+        initkwargs={'suffix': 'Members'}
+    ),
 ]
 
 router.register('twix', views.BoardViewSet)
@@ -144,6 +179,7 @@ router.register('twix', views.GroupViewSet)
 router.register('twix', views.GroupDetailViewSet)
 router.register('twix', views.AssignedTaskViewSet)
 router.register('twix', views.AssignedTaskDetailViewSet)
+router.register('twix', views.SyncViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,22 +1,112 @@
+from django.conf import settings
+from django.db.models import Q
+
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import UUIDField, BooleanField, DateField, \
+    DateTimeField
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
 
-from core.models import Board, Task, Group, User, AssignedTask
+from core.authentication import CachedTokenAuthentication
+from core.events import EventScope
+from core.filters import QueryParamFilter, NullsLastOrderingFilter
+from core.models import Board, Task, Group, AssignedTask, Change
+from core.mixins import ConditionalMixin, NormalizedResponseMixin, \
+    QueryPlanMixin, StreamingListMixin
 from core.permissions import IsGroupAdmin, check_permission, \
     check_object_permission
+from core.scope import get_group_scope
+from core.serializers import apply_query_plan, prefetch_query_plan
 
 from fcm_django.api.rest_framework import FCMDeviceAuthorizedViewSet
 
+from user.serializers import UserSerializer
+
 from . import serializers
 
 
-class BoardViewSet(viewsets.GenericViewSet,
+class GroupMembersModeMixin:
+    """Select how groups render their members with `?members=`
+
+    `full` nests every member, `ids` renders member ids & count and
+    `included` leaves members out of rows, side-loading them once per
+    response under `included`, which streamed lists cannot carry. Only
+    read requests are affected.
+    """
+    members_serializer_classes = {}
+
+    group_field = 'group'
+
+    def initial(self, request, *args, **kwargs):
+        """Validate the requested members mode"""
+        super(GroupMembersModeMixin, self).initial(request, *args, **kwargs)
+        self.members_mode = 'full'
+        if request.method == 'GET':
+            mode = request.query_params.get('members', 'full')
+            if mode != 'full' and mode not in self.members_serializer_classes:
+                raise ValidationError(
+                    {'members': [f'Unknown members mode {mode}!']}
+                )
+            self.members_mode = mode
+
+    def list(self, request, *args, **kwargs):
+        """Reject side-loading members of streamed lists"""
+        wants_stream = getattr(self, 'wants_stream', None)
+        if self.members_mode == 'included' and wants_stream is not None \
+                and wants_stream(request):
+            raise ValidationError({'members': [
+                'Members cannot be included in streamed lists!'
+            ]})
+        return super(GroupMembersModeMixin, self).list(
+            request, *args, **kwargs
+        )
+
+    def get_serializer_class(self):
+        """Swap the default serializer for one of the members mode"""
+        serializer_class = super(GroupMembersModeMixin,
+                                 self).get_serializer_class()
+        if serializer_class is not self.serializer_class:
+            return serializer_class
+        return self.members_serializer_classes.get(
+            getattr(self, 'members_mode', 'full'), serializer_class
+        )
+
+    def get_rendered_group_ids(self, data):
+        """Return ids of groups rendered in a page or a single object"""
+        rows = data['results'] if 'results' in data else [data]
+        group_ids = set()
+        for row in rows:
+            group = row.get(self.group_field) if self.group_field else row
+            if isinstance(group, dict):
+                group_ids.add(group['id'])
+            elif group is not None:
+                # Normalized rows refer to their group by key
+                group_ids.add(group)
+        return group_ids
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Side-load members of rendered groups in `included` mode"""
+        if getattr(self, 'members_mode', 'full') == 'included' and \
+                self.get_serializer_class() is \
+                self.members_serializer_classes['included'] and \
+                response.status_code == status.HTTP_200_OK and \
+                isinstance(getattr(response, 'data', None), dict):
+            response.data['included'] = serializers.get_included_members(
+                self.get_rendered_group_ids(response.data)
+            )
+        return super(GroupMembersModeMixin, self).finalize_response(
+            request, response, *args, **kwargs
+        )
+
+
+class BoardViewSet(ConditionalMixin, QueryPlanMixin,
+                   viewsets.GenericViewSet,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin):
     """View set for Board model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
@@ -33,24 +123,22 @@ class BoardViewSet(viewsets.GenericViewSet,
         return queryset
 
     def view_board(self, request, *args, **kwargs):
-        """Return associated boards"""
-        serializer = self.get_serializer(
-            self.get_queryset(), many=True
-        )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Wrapper around list method for view set distinction"""
+        return self.list(request, *args, **kwargs)
 
     def create_board(self, request, *args, **kwargs):
         """Wrapper around create method for view set distinction"""
         return self.create(request, *args, **kwargs)
 
 
-class BoardDetailViewSet(viewsets.GenericViewSet,
+class BoardDetailViewSet(ConditionalMixin, QueryPlanMixin,
+                         viewsets.GenericViewSet,
                          mixins.RetrieveModelMixin,
                          mixins.UpdateModelMixin,
                          mixins.DestroyModelMixin):
     """Detail view set for Board model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
@@ -59,10 +147,20 @@ class BoardDetailViewSet(viewsets.GenericViewSet,
     queryset = Board.objects.all()
 
     def get_queryset(self):
-        """Enforce scope"""
+        """Enforce scope
+
+        Members of a group read boards holding tasks of the group, only
+        owners change or delete them.
+        """
         user = self.request.user
-        queryset = super(BoardDetailViewSet, self).get_queryset().filter(
-            twix_groups__users__in=[user, ]
+        queryset = super(BoardDetailViewSet, self).get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset.filter(user=user)
+        scope = get_group_scope(user)
+        queryset = queryset.filter(
+            Q(user=user) | Q(id__in=Task.objects.filter(
+                group_id__in=scope.member_ids
+            ).values('board_id'))
         ).all()
         return queryset
 
@@ -84,18 +182,44 @@ class BoardDetailViewSet(viewsets.GenericViewSet,
         return self.destroy(request, *args, **kwargs)
 
 
-class TaskViewSet(viewsets.GenericViewSet,
+class TaskViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                  ConditionalMixin, StreamingListMixin, QueryPlanMixin,
+                  viewsets.GenericViewSet,
+                  mixins.ListModelMixin,
                   mixins.CreateModelMixin):
     """View set for Task model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.TaskSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.TaskGroupMemberIdsSerializer,
+        'included': serializers.TaskGroupWithoutMembersSerializer,
+    }
+
     queryset = Task.objects.all()
 
+    filter_backends = [QueryParamFilter, NullsLastOrderingFilter, ]
+
+    filter_fields = {
+        'board': ('board_id', UUIDField()),
+        'group': ('group_id', UUIDField()),
+        'is_done': ('is_done', BooleanField()),
+        'is_assigned': ('is_assigned', BooleanField()),
+        'due_date__gte': ('due_date__gte', DateField()),
+        'due_date__lte': ('due_date__lte', DateField()),
+        'remind_me__gte': ('remind_me__gte', DateTimeField()),
+        'remind_me__lte': ('remind_me__lte', DateTimeField()),
+    }
+
+    ordering_fields = ('name', 'is_done', 'due_date', 'remind_me',
+                       'updated_at')
+
+    ordering = ('id', )
+
     def get_queryset(self):
         """Enforce scope"""
         user = self.request.user
@@ -105,29 +229,64 @@ class TaskViewSet(viewsets.GenericViewSet,
         return queryset
 
     def view_task(self, request, *args, **kwargs):
-        """Return associated tasks"""
-        serializer = self.get_serializer(
-            self.get_queryset(), many=True
-        )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Wrapper around list method for view set distinction"""
+        return self.list(request, *args, **kwargs)
 
     def create_task(self, request, *args, **kwargs):
         """Wrapper around create method for view set distinction"""
         return self.create(request, *args, **kwargs)
 
-
-class TaskDetailViewSet(viewsets.GenericViewSet,
+    def batch_task(self, request, *args, **kwargs):
+        """Create, update & delete tasks in one transaction"""
+        serializer = serializers.TaskBatchSerializer(
+            data=request.data,
+            context=dict(self.get_serializer_context(),
+                         queryset=self.get_queryset())
+        )
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+
+        prefetch_query_plan(result['create'] + result['update'],
+                            self.get_serializer())
+        data = {
+            action: self.get_serializer(result[action], many=True).data
+            for action in ('create', 'update')
+        }
+        return Response({
+            'create': [
+                {'status': status.HTTP_201_CREATED, 'data': item}
+                for item in data['create']
+            ],
+            'update': [
+                {'status': status.HTTP_200_OK, 'data': item}
+                for item in data['update']
+            ],
+            'delete': [
+                {'status': status.HTTP_204_NO_CONTENT, 'id': task_id}
+                for task_id in result['delete']
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class TaskDetailViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                        ConditionalMixin, QueryPlanMixin,
+                        viewsets.GenericViewSet,
                         mixins.RetrieveModelMixin,
                         mixins.UpdateModelMixin,
                         mixins.DestroyModelMixin):
     """Detail view set for Task model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.TaskSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.TaskGroupMemberIdsSerializer,
+        'included': serializers.TaskGroupWithoutMembersSerializer,
+    }
+
     queryset = Task.objects.all()
 
     def get_queryset(self):
@@ -156,47 +315,57 @@ class TaskDetailViewSet(viewsets.GenericViewSet,
         return self.destroy(request, *args, **kwargs)
 
 
-class AssignedTaskViewSet(viewsets.GenericViewSet):
+class AssignedTaskViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                          ConditionalMixin, StreamingListMixin, QueryPlanMixin,
+                          viewsets.GenericViewSet,
+                          mixins.ListModelMixin):
     """View set for Assigned Task model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.AssignedTaskSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.AssignedTaskGroupMemberIdsSerializer,
+        'included': serializers.AssignedTaskGroupWithoutMembersSerializer,
+    }
+
     queryset = AssignedTask.objects.all()
 
     def get_queryset(self):
         """Enforce scope"""
         user = self.request.user
-        queryset = super(AssignedTaskViewSet, self).get_queryset()
-        queryset = queryset.filter(
-            group__admin=user
-        ) | queryset.filter(
-            user=user
+        scope = get_group_scope(user)
+        queryset = super(AssignedTaskViewSet, self).get_queryset().filter(
+            Q(group_id__in=scope.admin_ids) | Q(user=user)
         )
         return queryset.all()
 
     def view_assigned_task(self, request, *args, **kwargs):
-        """View all assigned tasks"""
-        serializer = self.get_serializer(
-            self.get_queryset(), many=True
-        )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Wrapper around list method for view set distinction"""
+        return self.list(request, *args, **kwargs)
 
 
-class AssignedTaskDetailViewSet(viewsets.GenericViewSet,
+class AssignedTaskDetailViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                                ConditionalMixin, QueryPlanMixin,
+                                viewsets.GenericViewSet,
                                 mixins.RetrieveModelMixin,
                                 mixins.UpdateModelMixin):
     """Detail view set for Assigned Task model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.AssignedTaskSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.AssignedTaskGroupMemberIdsSerializer,
+        'included': serializers.AssignedTaskGroupWithoutMembersSerializer,
+    }
+
     queryset = AssignedTask.objects.all()
 
     def get_queryset(self):
@@ -223,64 +392,74 @@ class AssignedTaskDetailViewSet(viewsets.GenericViewSet,
                                                              **kwargs)
 
 
-class GroupViewSet(viewsets.GenericViewSet,
+class GroupViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                   ConditionalMixin, QueryPlanMixin,
+                   viewsets.GenericViewSet,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin):
     """View set for Group model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.GroupSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.GroupMemberIdsSerializer,
+        'included': serializers.GroupWithoutMembersSerializer,
+    }
+
+    group_field = None
+
     queryset = Group.objects.all()
 
     def get_queryset(self):
         """Enforce scope"""
         user = self.request.user
         queryset = super(GroupViewSet, self).get_queryset().filter(
-            users__in=[user, ]
-        ) | super(GroupViewSet, self).get_queryset().filter(
-            admin=user
-        )
-        queryset = queryset.all()
+            id__in=get_group_scope(user).group_ids
+        ).all()
         return queryset
 
     def view_group(self, request, *args, **kwargs):
-        """Return associated groups"""
-        serializer = self.get_serializer(
-            self.get_queryset(), many=True
-        )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Wrapper around list method for view set distinction"""
+        return self.list(request, *args, **kwargs)
 
     def create_group(self, request, *args, **kwargs):
         """Wrapper around create method for view set distinction"""
         return self.create(request, *args, **kwargs)
 
 
-class GroupDetailViewSet(viewsets.GenericViewSet,
+class GroupDetailViewSet(GroupMembersModeMixin, NormalizedResponseMixin,
+                         ConditionalMixin, QueryPlanMixin,
+                         viewsets.GenericViewSet,
                          mixins.RetrieveModelMixin,
                          mixins.UpdateModelMixin,
                          mixins.DestroyModelMixin):
     """Detail view set for Group model"""
 
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
     serializer_class = serializers.GroupSerializer
 
+    members_serializer_classes = {
+        'ids': serializers.GroupMemberIdsSerializer,
+        'included': serializers.GroupWithoutMembersSerializer,
+    }
+
+    group_field = None
+
     queryset = Group.objects.all()
 
     def get_queryset(self):
         """Enforce scope"""
         user = self.request.user
         queryset = super(GroupDetailViewSet, self).get_queryset().filter(
-            users__in=[user, ]
-        ) | super(GroupDetailViewSet, self).get_queryset().filter(
-            admin=user
-        )
-        queryset = queryset.all()
+            id__in=get_group_scope(user).group_ids
+        ).all()
         return queryset
 
     def view_group_by_id(self, request, *args, **kwargs):
@@ -289,7 +468,7 @@ class GroupDetailViewSet(viewsets.GenericViewSet,
 
     def update_group_by_id(self, request, *args, **kwargs):
         """Wrapper around update method for view set distinction"""
-        check_object_permission(request, self, self.get_object())
+        check_object_permission(IsGroupAdmin, request, self, self.get_object())
         return self.update(request, *args, **kwargs)
 
     def update(self, request, *args, **kwargs):
@@ -299,55 +478,159 @@ class GroupDetailViewSet(viewsets.GenericViewSet,
 
     def destroy_group_by_id(self, request, *args, **kwargs):
         """Wrapper around destroy method for view set distinction"""
-        check_object_permission(request, self, self.get_object())
+        check_object_permission(IsGroupAdmin, request, self, self.get_object())
         return self.destroy(request, *args, **kwargs)
 
+    def get_serializer_class(self):
+        """Serialize members & membership changes without loading members"""
+        if self.action == 'update_group_members_by_id':
+            return serializers.GroupMembersSerializer
+        if self.action == 'view_group_members_by_id':
+            return UserSerializer
+        return super(GroupDetailViewSet, self).get_serializer_class()
+
+    def get_members_serializer(self, group, data):
+        """Return serializer of membership changes of group"""
+        return serializers.GroupMembersSerializer(
+            data=data, context=dict(self.get_serializer_context(), group=group)
+        )
+
+    def view_group_members_by_id(self, request, *args, **kwargs):
+        """List members of a group page by page"""
+        group = self.get_object()
+        page = self.paginate_queryset(group.users.all())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def update_group_members_by_id(self, request, *args, **kwargs):
+        """Add & remove group members in bulk, returning the difference"""
+        group = self.get_object()
+        check_object_permission(IsGroupAdmin, request, self, group)
+        serializer = self.get_members_serializer(group, request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def change_group_member(self, request, action):
+        """Add or remove a single member, returning the whole group"""
+        group = self.get_object()
+        check_object_permission(IsGroupAdmin, request, self, group)
+        user_id = request.data.get('user')
+        if user_id is None:
+            return Response('User id required!',
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_members_serializer(group, {action: [user_id]})
+        if not serializer.is_valid():
+            return Response('No user with given id found!',
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(self.get_serializer(group).data,
+                        status=status.HTTP_200_OK)
+
     def add_group_member_by_id(self, request, *args, **kwargs):
         """Add action for group member"""
-        check_object_permission(IsGroupAdmin, request, self, self.get_object())
-        err_msg = 'User id required!'
-        user_id = request.data.get('user')
-        if user_id is not None:
-            err_msg = 'No user with given id found!'
-            user_exists = User.objects.filter(
-                id=user_id
-            ).exists()
-            if user_exists:
-                user = User.objects.filter(
-                    id=user_id
-                ).first()
-                group = self.get_object()
-                group.users.add(user)
-                group.save()
-                return Response(
-                    self.get_serializer(group).data,
-                    status=status.HTTP_200_OK
-                )
-        return Response(err_msg, status=status.HTTP_400_BAD_REQUEST)
+        return self.change_group_member(request, 'add')
 
     def remove_group_member_by_id(self, request, *args, **kwargs):
         """Delete action for group member"""
-        check_object_permission(IsGroupAdmin, request, self, self.get_object())
-        err_msg = 'User id required!'
-        user_id = request.data.get('user')
-        if user_id is not None:
-            err_msg = 'No user with given id found!'
-            user_exists = User.objects.filter(
-                id=user_id
-            ).exists()
-            if user_exists:
-                user = User.objects.filter(
-                    id=user_id
-                ).first()
-                group = self.get_object()
-                group.users.remove(user)
-                group.save()
-                return Response(
-                    self.get_serializer(group).data,
-                    status=status.HTTP_200_OK
-                )
-        return Response(err_msg, status=status.HTTP_400_BAD_REQUEST)
+        return self.change_group_member(request, 'remove')
+
+
+class SyncViewSet(viewsets.GenericViewSet):
+    """View set for delta sync of boards, tasks, groups & assigned tasks"""
+
+    authentication_classes = [CachedTokenAuthentication, ]
+
+    permission_classes = [IsAuthenticated, ]
+
+    queryset = Change.objects.all()
+
+    sync_models = (
+        ('board', 'boards', serializers.BoardSerializer),
+        ('task', 'tasks', serializers.TaskSerializer),
+        ('group', 'groups', serializers.GroupSerializer),
+        ('assignedtask', 'assigned_tasks',
+         serializers.AssignedTaskSerializer),
+    )
+
+    def get_querysets(self, event_scope):
+        """Return visible objects of every model, matching visible changes"""
+        user = event_scope.user
+        scope = event_scope.group_scope
+        return {
+            'board': Board.objects.filter(user=user),
+            'task': Task.objects.filter(
+                Q(board__user=user) | Q(group_id__in=scope.group_ids)
+            ),
+            'group': Group.objects.filter(id__in=scope.group_ids),
+            'assignedtask': AssignedTask.objects.filter(
+                Q(group_id__in=scope.admin_ids) | Q(user=user)
+            ),
+        }
+
+    def sync(self, request, *args, **kwargs):
+        """Return objects changed & deleted since the given token
+
+        Tokens hold the settled id and the last id sent. Changes between
+        both are sent again, as ids are taken before their transaction
+        commits & lower ids may show up late.
+        """
+        settled, _, last = request.GET.get('since', '0').partition(':')
+        try:
+            settled = int(settled)
+            last = int(last) if last else settled
+        except ValueError:
+            return Response('Invalid sync token!',
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= settled <= last:
+            return Response('Invalid sync token!',
+                            status=status.HTTP_400_BAD_REQUEST)
+        page_size = getattr(settings, 'SYNC_PAGE_SIZE', 500)
+        event_scope = EventScope(request.user)
+        querysets = self.get_querysets(event_scope)
+
+        visible = self.get_queryset().filter(event_scope.get_filter())
+        changes = list(visible.filter(id__gt=last).order_by('id')[
+            :page_size + 1
+        ])
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        pending = settled < last
+        if changes:
+            last = changes[-1].id
+        if pending:
+            changes = list(visible.filter(
+                id__gt=settled, id__lte=last
+            ).order_by('id'))
+        settled = max(settled, Change.objects.settled_id(last))
+
+        latest = {}
+        for change in changes:
+            latest[(change.model, change.object_id)] = change
+
+        data = {
+            'token': str(last) if settled == last else f'{settled}:{last}',
+            'has_more': has_more,
+            'deleted': {},
+        }
+        for model, key, serializer_class in self.sync_models:
+            model_changes = [
+                change for (change_model, _), change in latest.items()
+                if change_model == model
+            ]
+            queryset = apply_query_plan(querysets[model], serializer_class())
+            data[key] = serializer_class(
+                queryset.filter(id__in=[
+                    change.object_id for change in model_changes
+                    if not change.is_deleted
+                ]), many=True, context=self.get_serializer_context()
+            ).data
+            data['deleted'][key] = [
+                change.object_id for change in model_changes
+                if change.is_deleted
+            ]
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class FCMDeviceCustomAuthViewSet(FCMDeviceAuthorizedViewSet):
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
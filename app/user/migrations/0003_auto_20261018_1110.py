@@ -0,0 +1,39 @@
+# Generated by Django 2.2.28 on 2026-10-18 11:10
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('user_email_trgm_idx', 'email'),
+    ('user_name_trgm_idx', 'name'),
+)
+
+
+def apply_migration(apps, schema_editor):
+    """Create trigram indexes for user search on PostgreSQL"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON user_user '
+            f'USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def revert_migration(apps, schema_editor):
+    """Drop trigram indexes for user search on PostgreSQL"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_auto_20191019_1503'),
+    ]
+
+    operations = [
+        migrations.RunPython(apply_migration, revert_migration),
+    ]
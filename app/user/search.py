@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.models import Case, When, Q, IntegerField
+
+
+def search_users(queryset, term, limit=None):
+    """Return users matching term on email or name, best matches first
+
+    Both prefix and substring matches compare UPPER(col), so on PostgreSQL
+    they are served by the trigram GIN indexes on UPPER(email) & UPPER(name).
+    Substring matches need at least three characters, the size of a trigram.
+    """
+    max_limit = getattr(settings, 'USER_SEARCH_LIMIT', 50)
+    limit = max_limit if limit is None else max(1, min(limit, max_limit))
+    term = term.strip()
+
+    matches = Q(email__istartswith=term) | Q(name__istartswith=term)
+    if len(term) >= 3:
+        matches |= Q(email__icontains=term) | Q(name__icontains=term)
+
+    rank = Case(
+        When(email__iexact=term, then=0),
+        When(email__istartswith=term, then=1),
+        When(name__istartswith=term, then=2),
+        default=3,
+        output_field=IntegerField()
+    )
+
+    return queryset.filter(matches).annotate(
+        search_rank=rank
+    ).order_by('search_rank', 'email')[:limit]
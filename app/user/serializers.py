@@ -3,9 +3,10 @@ from django.contrib.auth import authenticate
 from rest_framework import serializers
 
 from core.models import User
+from core.serializers import DynamicModelSerializer
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicModelSerializer):
     """Serializer for User model"""
     password = serializers.CharField(
         style={'input_type': 'password', },
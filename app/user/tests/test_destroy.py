@@ -0,0 +1,32 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User, Board, Group
+
+USER_VIEW_URL = reverse('user:user-view')
+
+
+class DestroyUserTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        self.other = User.objects.create_user(
+            email='other@twix.com', password='password', name='Other'
+        )
+        Board.objects.create(name='Board', user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_destroy_logged_in_user(self):
+        """Test DELETE removes the logged in user and what they own"""
+        response = self.client.delete(USER_VIEW_URL)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertFalse(Board.objects.filter(user_id=self.user.id).exists())
+        self.assertFalse(Group.objects.filter(admin_id=self.user.id).exists())
+        self.assertTrue(User.objects.filter(id=self.other.id).exists())
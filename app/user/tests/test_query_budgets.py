@@ -0,0 +1,53 @@
+from django.contrib.auth.models import Group as AuthGroup
+from django.urls import reverse
+
+from core.models import User
+from core.tests.budgets import QueryBudgetTestCase
+
+USER_VIEW_URL = reverse('user:user-view')
+USER_LIST_URL = reverse('user:user-list')
+AUTH_TOKEN_URL = reverse('user:auth-token')
+
+
+class UserQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_retrieve_user(self):
+        """Test retrieving the logged in user"""
+        self.assertBudget('GET', USER_VIEW_URL, 0)
+
+    def test_create_user(self):
+        """Test signing up a user with the app token"""
+        register = User.objects.create_user(
+            email='register@twix.com', password='password', name='Register'
+        )
+        register.groups.add(AuthGroup.objects.get_or_create(
+            name='App Token'
+        )[0])
+        self.client.force_authenticate(register)
+        self.assertBudget('POST', USER_VIEW_URL, 12, {
+            'email': 'new@twix.com', 'password': 'password', 'name': 'New'
+        }, status=201)
+
+    def test_update_user(self):
+        """Test renaming the logged in user"""
+        self.assertBudget('PATCH', USER_VIEW_URL, 5, {'name': 'Renamed'})
+
+    def test_destroy_user(self):
+        """Test deleting a user owning thousands of tasks"""
+        self.client.force_authenticate(User.objects.get(id=self.user.id))
+        self.assertBudget('DELETE', USER_VIEW_URL, 127, status=204)
+
+    def test_list_users(self):
+        """Test listing a page of users"""
+        self.assertBudget('GET', USER_LIST_URL, 1)
+
+    def test_search_users(self):
+        """Test searching users"""
+        self.assertBudget('GET', USER_LIST_URL + '?search=member1', 1)
+
+    def test_obtain_token(self):
+        """Test obtaining an auth token"""
+        self.client.force_authenticate(None)
+        self.assertBudget('POST', AUTH_TOKEN_URL, 5, {
+            'email': 'user@twix.com', 'password': 'password'
+        })
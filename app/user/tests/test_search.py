@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import User
+
+USER_LIST_URL = reverse('user:user-list')
+
+
+class UserSearchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@twix.com', password='password', name='User'
+        )
+        for email, name in [
+            ('alice@twix.com', 'Alice Smith'),
+            ('bob@twix.com', 'Bob Alison'),
+            ('malice@twix.com', 'Mal'),
+            ('carol@twix.com', 'Carol'),
+        ]:
+            User.objects.create_user(email=email, password='password',
+                                     name=name)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get(USER_LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [user['email'] for user in response.data]
+
+    def test_search_ranks_prefix_matches_first(self):
+        """Test email prefix beats name prefix beats substring"""
+        self.assertEqual(
+            self.search(email='ali'),
+            ['alice@twix.com', 'bob@twix.com', 'malice@twix.com']
+        )
+
+    def test_search_short_term_matches_prefix_only(self):
+        """Test terms shorter than a trigram only match prefixes"""
+        self.assertEqual(self.search(search='al'), ['alice@twix.com'])
+
+    def test_search_is_not_a_regex(self):
+        """Test regex metacharacters are matched literally"""
+        self.assertEqual(self.search(email='.*'), [])
+
+    def test_search_limit(self):
+        """Test number of results can be limited"""
+        self.assertEqual(self.search(email='ali', limit=1),
+                         ['alice@twix.com'])
+
+    def test_search_rejects_invalid_limit(self):
+        """Test limits below one or not numbers are rejected"""
+        for limit in ('-1', '0', 'many'):
+            response = self.client.get(USER_LIST_URL,
+                                       {'search': 'b', 'limit': limit})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('limit', response.data)
+
+    def test_search_excludes_requesting_user(self):
+        """Test the requesting user is not returned"""
+        self.assertEqual(self.search(email='user'), [])
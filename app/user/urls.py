@@ -15,7 +15,7 @@ router.routes += [
             'get': 'view_user',
             'post': 'create_user',
             'patch': 'update_user',
-            'delete': 'delete_user'
+            'delete': 'destroy_user'
         },
         name='user-view',
         detail=False,
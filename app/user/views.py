@@ -1,15 +1,18 @@
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from core.authentication import CachedTokenAuthentication
 from core.models import User
 from core.permissions import check_permission, IsAppToken
 
 from . import serializers
+from .search import search_users
 
 
 class UserViewSet(viewsets.GenericViewSet,
@@ -17,7 +20,7 @@ class UserViewSet(viewsets.GenericViewSet,
                   mixins.UpdateModelMixin,
                   mixins.DestroyModelMixin):
     """View set for User model"""
-    authentication_classes = [TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
 
     permission_classes = [IsAuthenticated, ]
 
@@ -59,18 +62,28 @@ class UserViewSet(viewsets.GenericViewSet,
         return self.destroy(request, *args, **kwargs)
 
     def list_user(self, request, *args, **kwargs):
-        """List all users"""
+        """List all users, or the best matches for a search term"""
         queryset = self.get_queryset()
         queryset = queryset.exclude(id=request.user.id).all()
-        email = request.GET.get('email', None)
-        if email is not None:
-            queryset = queryset.filter(
-                email__regex=rf'{email}'
-            ).all()
+        term = request.GET.get('search', request.GET.get('email', None))
+        if term:
+            limit = None
+            if 'limit' in request.GET:
+                try:
+                    limit = IntegerField(min_value=1).run_validation(
+                        request.GET['limit']
+                    )
+                except ValidationError as error:
+                    raise ValidationError({'limit': error.detail})
+            serializer = self.get_serializer(
+                search_users(queryset, term, limit), many=True
+            )
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        page = self.paginate_queryset(queryset)
         serializer = self.get_serializer(
-            queryset, many=True
+            page, many=True
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_paginated_response(serializer.data)
 
 
 class AuthTokenViewSet(ObtainAuthToken):